@@ -6,9 +6,11 @@ import plotly.graph_objects as go
 import logging
 import os
 import json
+import time
 
 from dash import Dash, dcc, html
 from dash.dependencies import Input, Output, State # State might be needed by pages
+from flask import jsonify, request, g, Response, abort
 
 from src.config import AppConfig
 try:
@@ -46,11 +48,40 @@ except ImportError as e:
     BertLabelledTopicCommunityStats, AILabelledTopicCommunityStats, AnalysisNgramCommunityStats = AppMockDBClassShared, AppMockDBClassShared, AppMockDBClassShared
 
 from src.utils.ternary_data_utils import load_data_for_ternary, calculate_base_ternary_attributes
+from src.utils.callback_cache import CallbackResultCache
+from src.utils.data_snapshot import DataSnapshot, DataSnapshotHolder, DataReloader, compute_database_version
+from src.utils.shared_disk_cache import SqliteDiskCache
+from src.utils.shared_frames import share_frames
+from src.utils import perf_metrics
+from src.utils.query_profiler import install_slow_query_logger
+from src.utils.request_profiler import ProfileRingBuffer, install_request_profiler, verify_profile_signature, PROFILE_SIGNATURE_HEADER
 from src.pages import item_plot_page, centroid_plot_page
 
 logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# --- PERFORMANCE METRICS ---
+# Per-stage callback timings and response sizes, served in Prometheus text format at
+# {URL_BASE_PATHNAME}metrics. Off by default; when off every timer is a no-op.
+PERF_METRICS_ENABLED = os.getenv("PERF_METRICS_ENABLED", "False").lower() == "true"
+perf_metrics.configure(PERF_METRICS_ENABLED)
+
+# --- SLOW QUERY LOG ---
+# Statements on the analysis DB slower than this many milliseconds are logged at WARNING with their
+# EXPLAIN QUERY PLAN. 0 disables the hooks. For a ranked report of all views against a DB, run
+# `python -m src.utils.query_profiler --db <path>`.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 0))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+if SLOW_QUERY_THRESHOLD_MS > 0 and engine is not None:
+    install_slow_query_logger(engine, SLOW_QUERY_THRESHOLD_MS, explain=SLOW_QUERY_EXPLAIN)
+
+# --- SCHEMA UPGRADES ---
+# CREATE VIEW IF NOT EXISTS never replaces an existing view, so databases built before the view
+# rewrites need an explicit upgrade. The app never writes the schema; upgrade a DB offline, before
+# it is published:
+#   python -m src.utils.ngram_frequency_utils --db <path>         (FrequencyDistributionOfNgrams)
+#   python -m src.utils.ngram_sample_aggregate_utils --db <path>  (sample sentence aggregate, its triggers and the review views)
+
 SHARED_DATA_CONFIGS = {
     'bert': { 'model_class': BertLabelledTopicCommunityStats, 'id_col': 'topic_id', 'label_col': 'topic_short_description', 'us_count_col': 'count_A', 'russia_count_col': 'count_G', 'middle_count_col': 'count_BCDE', 'entity_type_label': "BERT Topic"},
     'ai': { 'model_class': AILabelledTopicCommunityStats, 'id_col': 'topic_id', 'label_col': 'topic_short_description', 'us_count_col': 'count_A', 'russia_count_col': 'count_G', 'middle_count_col': 'count_BCDE', 'entity_type_label': "AI Topic"},
@@ -107,88 +138,193 @@ CENTROID_PLOT_PAGE_SPECIFIC_CONFIGS = {
 
 logger.info(f"--- Main App: Initializing Data ---")
 item_plot_current_data_config_dict = SHARED_DATA_CONFIGS.get(ITEM_PLOT_DATA_SOURCE_KEY)
-df_item_plot_with_base_attributes = pd.DataFrame()
-item_plot_global_tm_min, item_plot_global_tm_max = 0.0, 1.0
-if not item_plot_current_data_config_dict: logger.error(f"Config for ITEM_PLOT_DATA_SOURCE_KEY '{ITEM_PLOT_DATA_SOURCE_KEY}' not found.")
-else:
-    mock_db_class_to_use = AppMockDBClassShared if SessionLocal is None else None
-    df_full_item_plot = load_data_for_ternary(ITEM_PLOT_DATA_SOURCE_KEY, item_plot_current_data_config_dict, ITEM_PLOT_MODEL_ID_TO_ANALYZE, SessionLocal, engine, mock_db_class_to_use)
-    if df_full_item_plot is None or df_full_item_plot.empty: logger.error(f"No data loaded for Item Plot (Source: {ITEM_PLOT_DATA_SOURCE_KEY}).")
+centroid_plot_current_data_config_dict = SHARED_DATA_CONFIGS.get(CENTROID_PLOT_DATA_SOURCE_KEY)
+
+# With SHARED_DATA_DIR set, the numeric columns of the page datasets are written once as .npy files
+# and replaced by read-only memory-mapped views. Under gunicorn with preload_app (see gunicorn.conf.py)
+# this happens once in the master and every forked worker reads the same pages (opt in there with
+# SHARED_FRAMES=True). Off by default: every process then keeps its own copy.
+SHARED_DATA_DIR = os.getenv("SHARED_DATA_DIR", "")
+
+@perf_metrics.timed('build_data_snapshot')
+def build_data_snapshot(data_version):
+    """Loads the datasets for both pages into a new immutable DataSnapshot.
+    Runs once at startup and again in the data reloader thread whenever the DB changes."""
+    logger.info(f"Building data snapshot for data version {data_version}...")
+    stages = perf_metrics.stage_recorder('build_data_snapshot')
+    df_item_plot_with_base_attributes = pd.DataFrame()
+    item_plot_global_tm_min, item_plot_global_tm_max = 0.0, 1.0
+    if not item_plot_current_data_config_dict: logger.error(f"Config for ITEM_PLOT_DATA_SOURCE_KEY '{ITEM_PLOT_DATA_SOURCE_KEY}' not found.")
     else:
-        df_item_plot_with_base_attributes = calculate_base_ternary_attributes(df_full_item_plot.copy(), item_plot_current_data_config_dict)
-        if ITEM_PLOT_ITEMS_TO_DISPLAY and not df_item_plot_with_base_attributes.empty:
-            id_col_name = item_plot_current_data_config_dict.get('id_col')
-            if id_col_name and id_col_name in df_item_plot_with_base_attributes.columns:
-                initial_rows = len(df_item_plot_with_base_attributes)
-                ids_to_check = ITEM_PLOT_ITEMS_TO_DISPLAY
-                try:
-                    if df_item_plot_with_base_attributes[id_col_name].notna().any():
-                        if pd.api.types.is_numeric_dtype(df_item_plot_with_base_attributes[id_col_name].dropna()):
-                            if any(isinstance(x, str) for x in ITEM_PLOT_ITEMS_TO_DISPLAY): ids_to_check = [str(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]; df_item_plot_with_base_attributes[id_col_name] = df_item_plot_with_base_attributes[id_col_name].astype(str)
-                            else: id_col_actual_type = type(df_item_plot_with_base_attributes[id_col_name].dropna().iloc[0]); ids_to_check = [id_col_actual_type(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]
-                        else:
-                            ids_to_check = [str(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]
-                            if any(isinstance(x, str) for x in ids_to_check): df_item_plot_with_base_attributes[id_col_name] = df_item_plot_with_base_attributes[id_col_name].astype(str)
-                except Exception as e_type_conv:
-                    logger.warning(f"Type conversion for ITEM_PLOT_ITEMS_TO_DISPLAY failed: {e_type_conv}."); ids_to_check = [str(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]
-                    if id_col_name in df_item_plot_with_base_attributes.columns: df_item_plot_with_base_attributes[id_col_name] = df_item_plot_with_base_attributes[id_col_name].astype(str)
-                df_item_plot_with_base_attributes = df_item_plot_with_base_attributes[df_item_plot_with_base_attributes[id_col_name].isin(ids_to_check)]
-                if df_item_plot_with_base_attributes.empty and initial_rows > 0: logger.warning(f"No items matched ITEM_PLOT_ITEMS_TO_DISPLAY.")
-        if not df_item_plot_with_base_attributes.empty and 'TotalMentions' in df_item_plot_with_base_attributes.columns and df_item_plot_with_base_attributes['TotalMentions'].notna().any():
-            valid_mentions = pd.to_numeric(df_item_plot_with_base_attributes['TotalMentions'], errors='coerce').dropna()
-            if not valid_mentions.empty:
-                item_plot_global_tm_min, item_plot_global_tm_max = valid_mentions.min(), valid_mentions.max()
-                if item_plot_global_tm_min == item_plot_global_tm_max: item_plot_global_tm_min = max(0, item_plot_global_tm_min - 0.5) if item_plot_global_tm_min is not None else 0.0; item_plot_global_tm_max = (item_plot_global_tm_max + 0.5) if item_plot_global_tm_max is not None else 1.0
-        logger.info(f"Item Plot Global TotalMentions: min={item_plot_global_tm_min}, max={item_plot_global_tm_max}")
+        mock_db_class_to_use = AppMockDBClassShared if SessionLocal is None else None
+        df_full_item_plot = load_data_for_ternary(ITEM_PLOT_DATA_SOURCE_KEY, item_plot_current_data_config_dict, ITEM_PLOT_MODEL_ID_TO_ANALYZE, SessionLocal, engine, mock_db_class_to_use)
+        stages.mark('load')
+        if df_full_item_plot is None or df_full_item_plot.empty: logger.error(f"No data loaded for Item Plot (Source: {ITEM_PLOT_DATA_SOURCE_KEY}).")
+        else:
+            df_item_plot_with_base_attributes = calculate_base_ternary_attributes(df_full_item_plot.copy(), item_plot_current_data_config_dict)
+            stages.mark('base_attributes')
+            if ITEM_PLOT_ITEMS_TO_DISPLAY and not df_item_plot_with_base_attributes.empty:
+                id_col_name = item_plot_current_data_config_dict.get('id_col')
+                if id_col_name and id_col_name in df_item_plot_with_base_attributes.columns:
+                    initial_rows = len(df_item_plot_with_base_attributes)
+                    ids_to_check = ITEM_PLOT_ITEMS_TO_DISPLAY
+                    try:
+                        if df_item_plot_with_base_attributes[id_col_name].notna().any():
+                            if pd.api.types.is_numeric_dtype(df_item_plot_with_base_attributes[id_col_name].dropna()):
+                                if any(isinstance(x, str) for x in ITEM_PLOT_ITEMS_TO_DISPLAY): ids_to_check = [str(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]; df_item_plot_with_base_attributes[id_col_name] = df_item_plot_with_base_attributes[id_col_name].astype(str)
+                                else: id_col_actual_type = type(df_item_plot_with_base_attributes[id_col_name].dropna().iloc[0]); ids_to_check = [id_col_actual_type(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]
+                            else:
+                                ids_to_check = [str(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]
+                                if any(isinstance(x, str) for x in ids_to_check): df_item_plot_with_base_attributes[id_col_name] = df_item_plot_with_base_attributes[id_col_name].astype(str)
+                    except Exception as e_type_conv:
+                        logger.warning(f"Type conversion for ITEM_PLOT_ITEMS_TO_DISPLAY failed: {e_type_conv}."); ids_to_check = [str(x) for x in ITEM_PLOT_ITEMS_TO_DISPLAY]
+                        if id_col_name in df_item_plot_with_base_attributes.columns: df_item_plot_with_base_attributes[id_col_name] = df_item_plot_with_base_attributes[id_col_name].astype(str)
+                    df_item_plot_with_base_attributes = df_item_plot_with_base_attributes[df_item_plot_with_base_attributes[id_col_name].isin(ids_to_check)]
+                    if df_item_plot_with_base_attributes.empty and initial_rows > 0: logger.warning(f"No items matched ITEM_PLOT_ITEMS_TO_DISPLAY.")
+            if not df_item_plot_with_base_attributes.empty and 'TotalMentions' in df_item_plot_with_base_attributes.columns and df_item_plot_with_base_attributes['TotalMentions'].notna().any():
+                valid_mentions = pd.to_numeric(df_item_plot_with_base_attributes['TotalMentions'], errors='coerce').dropna()
+                if not valid_mentions.empty:
+                    item_plot_global_tm_min, item_plot_global_tm_max = valid_mentions.min(), valid_mentions.max()
+                    if item_plot_global_tm_min == item_plot_global_tm_max: item_plot_global_tm_min = max(0, item_plot_global_tm_min - 0.5) if item_plot_global_tm_min is not None else 0.0; item_plot_global_tm_max = (item_plot_global_tm_max + 0.5) if item_plot_global_tm_max is not None else 1.0
+            logger.info(f"Item Plot Global TotalMentions: min={item_plot_global_tm_min}, max={item_plot_global_tm_max}")
 
-centroid_plot_current_data_config_dict = SHARED_DATA_CONFIGS.get(CENTROID_PLOT_DATA_SOURCE_KEY)
-df_centroid_plot_base_items_loaded = pd.DataFrame()
-df_country_ngram_weights_loaded = pd.DataFrame()
-df_country_table_info_loaded = pd.DataFrame()
-country_dropdown_options_for_centroid_plot = []
-if not centroid_plot_current_data_config_dict: logger.error(f"Config for CENTROID_PLOT_DATA_SOURCE_KEY '{CENTROID_PLOT_DATA_SOURCE_KEY}' not found.")
-else:
-    mock_db_class_to_use = AppMockDBClassShared if SessionLocal is None else None
-    _df_full_centroid_plot = load_data_for_ternary(CENTROID_PLOT_DATA_SOURCE_KEY, centroid_plot_current_data_config_dict, CENTROID_PLOT_MODEL_ID_TO_ANALYZE, SessionLocal, engine, mock_db_class_to_use)
-    if _df_full_centroid_plot is None or _df_full_centroid_plot.empty: logger.error(f"No data loaded for Centroid Plot (Source: {CENTROID_PLOT_DATA_SOURCE_KEY}).")
-    else: df_centroid_plot_base_items_loaded = _df_full_centroid_plot.copy()
-    if engine is not None:
+    df_centroid_plot_base_items_loaded = pd.DataFrame()
+    df_country_ngram_weights_loaded = pd.DataFrame()
+    df_country_table_info_loaded = pd.DataFrame()
+    country_dropdown_options_for_centroid_plot = []
+    if not centroid_plot_current_data_config_dict: logger.error(f"Config for CENTROID_PLOT_DATA_SOURCE_KEY '{CENTROID_PLOT_DATA_SOURCE_KEY}' not found.")
+    else:
+        mock_db_class_to_use = AppMockDBClassShared if SessionLocal is None else None
+        _df_full_centroid_plot = load_data_for_ternary(CENTROID_PLOT_DATA_SOURCE_KEY, centroid_plot_current_data_config_dict, CENTROID_PLOT_MODEL_ID_TO_ANALYZE, SessionLocal, engine, mock_db_class_to_use)
+        if _df_full_centroid_plot is None or _df_full_centroid_plot.empty: logger.error(f"No data loaded for Centroid Plot (Source: {CENTROID_PLOT_DATA_SOURCE_KEY}).")
+        else: df_centroid_plot_base_items_loaded = _df_full_centroid_plot.copy()
+        if engine is not None:
+            try:
+                item_id_col_for_sql = centroid_plot_current_data_config_dict.get('id_col', 'ngram_id')
+                sql_view_item_id_col_name = 'ngram_id' if CENTROID_PLOT_DATA_SOURCE_KEY == 'ngrams' else item_id_col_for_sql
+                sql_query_country_weights = f"SELECT country_speaker, \"{sql_view_item_id_col_name}\" AS \"{item_id_col_for_sql}\", count_sentences_for_ngram_by_country FROM vw_country_ngram_sentence_counts"
+                df_country_ngram_weights_loaded = pd.read_sql_query(sql_query_country_weights, engine)
+                sql_query_country_info = "SELECT id, merge_name, cpm_community_after_10_CPM_0_53 FROM country"
+                df_country_table_info_loaded = pd.read_sql_query(sql_query_country_info, engine)
+                logger.info(f"Centroid Plot: Loaded {len(df_country_ngram_weights_loaded)} country weights, {len(df_country_table_info_loaded)} country info.")
+                if not df_country_table_info_loaded.empty and 'id' in df_country_table_info_loaded.columns and 'merge_name' in df_country_table_info_loaded.columns and not df_country_ngram_weights_loaded.empty:
+
+                    if 'country_speaker' in df_country_ngram_weights_loaded.columns and 'count_sentences_for_ngram_by_country' in df_country_ngram_weights_loaded.columns:
+                        country_total_mentions = df_country_ngram_weights_loaded.groupby('country_speaker')['count_sentences_for_ngram_by_country'].sum().reset_index()
+                        country_total_mentions.rename(columns={'country_speaker': 'id', 'count_sentences_for_ngram_by_country': 'total_mentions_for_country'}, inplace=True)
+
+                        temp_country_info_for_dropdown = pd.merge(
+                            df_country_table_info_loaded.dropna(subset=['id', 'merge_name']),
+                            country_total_mentions,
+                            on='id',
+                            how='left' 
+                        )
+                        temp_country_info_for_dropdown['total_mentions_for_country'].fillna(0, inplace=True)
+                        temp_country_info_for_dropdown.sort_values(by='merge_name', inplace=True)
+
+                        country_dropdown_options_for_centroid_plot = [
+                            {'label': row['merge_name'], 'value': row['id'], 'disabled': row['total_mentions_for_country'] < 1}
+                            for index, row in temp_country_info_for_dropdown.iterrows()
+                        ]
+                        logger.info(f"Created {len(country_dropdown_options_for_centroid_plot)} country dropdown options with disabled status.")
+                    else:
+                        logger.warning("Required columns for country total mentions missing in df_country_ngram_weights_loaded. Cannot set disabled status for dropdown.")
+                        if not df_country_table_info_loaded.empty and 'id' in df_country_table_info_loaded.columns and 'merge_name' in df_country_table_info_loaded.columns:
+                            temp_country_info = df_country_table_info_loaded.dropna(subset=['id', 'merge_name']).sort_values(by='merge_name')
+                            country_dropdown_options_for_centroid_plot = [{'label': row['merge_name'], 'value': row['id']} for index, row in temp_country_info.iterrows()]
+
+                else: logger.warning("Country info table empty or missing key columns for dropdown.")
+            except Exception as e: logger.error(f"Centroid Plot: Failed to pre-load country data/create dropdown: {e}", exc_info=True)
+
+    # With SHARED_DATA_DIR set, the numeric columns are replaced by read-only memory-mapped views (see above).
+    if SHARED_DATA_DIR:
         try:
-            item_id_col_for_sql = centroid_plot_current_data_config_dict.get('id_col', 'ngram_id')
-            sql_view_item_id_col_name = 'ngram_id' if CENTROID_PLOT_DATA_SOURCE_KEY == 'ngrams' else item_id_col_for_sql
-            sql_query_country_weights = f"SELECT country_speaker, \"{sql_view_item_id_col_name}\" AS \"{item_id_col_for_sql}\", count_sentences_for_ngram_by_country FROM vw_country_ngram_sentence_counts"
-            df_country_ngram_weights_loaded = pd.read_sql_query(sql_query_country_weights, engine)
-            sql_query_country_info = "SELECT id, merge_name, cpm_community_after_10_CPM_0_53 FROM country"
-            df_country_table_info_loaded = pd.read_sql_query(sql_query_country_info, engine)
-            logger.info(f"Centroid Plot: Loaded {len(df_country_ngram_weights_loaded)} country weights, {len(df_country_table_info_loaded)} country info.")
-            if not df_country_table_info_loaded.empty and 'id' in df_country_table_info_loaded.columns and 'merge_name' in df_country_table_info_loaded.columns and not df_country_ngram_weights_loaded.empty:
-                
-                if 'country_speaker' in df_country_ngram_weights_loaded.columns and 'count_sentences_for_ngram_by_country' in df_country_ngram_weights_loaded.columns:
-                    country_total_mentions = df_country_ngram_weights_loaded.groupby('country_speaker')['count_sentences_for_ngram_by_country'].sum().reset_index()
-                    country_total_mentions.rename(columns={'country_speaker': 'id', 'count_sentences_for_ngram_by_country': 'total_mentions_for_country'}, inplace=True)
-                    
-                    temp_country_info_for_dropdown = pd.merge(
-                        df_country_table_info_loaded.dropna(subset=['id', 'merge_name']),
-                        country_total_mentions,
-                        on='id',
-                        how='left' 
-                    )
-                    temp_country_info_for_dropdown['total_mentions_for_country'].fillna(0, inplace=True)
-                    temp_country_info_for_dropdown.sort_values(by='merge_name', inplace=True)
-
-                    country_dropdown_options_for_centroid_plot = [
-                        {'label': row['merge_name'], 'value': row['id'], 'disabled': row['total_mentions_for_country'] < 1}
-                        for index, row in temp_country_info_for_dropdown.iterrows()
-                    ]
-                    logger.info(f"Created {len(country_dropdown_options_for_centroid_plot)} country dropdown options with disabled status.")
-                else:
-                    logger.warning("Required columns for country total mentions missing in df_country_ngram_weights_loaded. Cannot set disabled status for dropdown.")
-                    if not df_country_table_info_loaded.empty and 'id' in df_country_table_info_loaded.columns and 'merge_name' in df_country_table_info_loaded.columns:
-                        temp_country_info = df_country_table_info_loaded.dropna(subset=['id', 'merge_name']).sort_values(by='merge_name')
-                        country_dropdown_options_for_centroid_plot = [{'label': row['merge_name'], 'value': row['id']} for index, row in temp_country_info.iterrows()]
-
-            else: logger.warning("Country info table empty or missing key columns for dropdown.")
-        except Exception as e: logger.error(f"Centroid Plot: Failed to pre-load country data/create dropdown: {e}", exc_info=True)
+            _shared_data_version = "|".join(str(v) for v in (
+                data_version, ITEM_PLOT_DATA_SOURCE_KEY, ITEM_PLOT_MODEL_ID_TO_ANALYZE,
+                ITEM_PLOT_ITEMS_TO_DISPLAY, CENTROID_PLOT_DATA_SOURCE_KEY, CENTROID_PLOT_MODEL_ID_TO_ANALYZE))
+            _shared_frames = share_frames({
+                'item_plot_base_attributes': df_item_plot_with_base_attributes,
+                'centroid_plot_base_items': df_centroid_plot_base_items_loaded,
+                'country_ngram_weights': df_country_ngram_weights_loaded,
+                'country_table_info': df_country_table_info_loaded,
+            }, SHARED_DATA_DIR, data_version=_shared_data_version)
+            df_item_plot_with_base_attributes = _shared_frames['item_plot_base_attributes']
+            df_centroid_plot_base_items_loaded = _shared_frames['centroid_plot_base_items']
+            df_country_ngram_weights_loaded = _shared_frames['country_ngram_weights']
+            df_country_table_info_loaded = _shared_frames['country_table_info']
+        except Exception as e:
+            logger.error(f"Could not share page datasets via {SHARED_DATA_DIR}: {e}. Using per-process copies.", exc_info=True)
+
+    return DataSnapshot(
+        version=data_version,
+        df_item_plot_with_base_attributes=df_item_plot_with_base_attributes,
+        item_plot_global_tm_min=item_plot_global_tm_min,
+        item_plot_global_tm_max=item_plot_global_tm_max,
+        df_centroid_plot_base_items=df_centroid_plot_base_items_loaded,
+        df_country_ngram_weights=df_country_ngram_weights_loaded,
+        df_country_table_info=df_country_table_info_loaded,
+        country_dropdown_options=tuple(country_dropdown_options_for_centroid_plot)
+    )
+
+DATA_VERSION = compute_database_version(AppConfig.DB_FILE)
+data_snapshot_holder = DataSnapshotHolder(build_data_snapshot(DATA_VERSION))
+
+# --- HOT DATA RELOAD ---
+# Polls the DB version token; on change, a new snapshot is built in the background and swapped in.
+# Requests already running keep the snapshot they started with; cache keys include the version.
+DATA_RELOAD_INTERVAL_SECONDS = float(os.getenv("DATA_RELOAD_INTERVAL_SECONDS", 30))
+data_reloader = DataReloader(
+    data_snapshot_holder,
+    version_fn=lambda: compute_database_version(AppConfig.DB_FILE),
+    build_snapshot=build_data_snapshot,
+    interval_seconds=DATA_RELOAD_INTERVAL_SECONDS
+)
+
+# --- CALLBACK RESULT CACHE ---
+# Figures depend only on callback inputs and the data snapshot, so results are memoised
+# per worker. Keys include the snapshot version, so a reload invalidates them.
+CALLBACK_CACHE_ENABLED = os.getenv("CALLBACK_CACHE_ENABLED", "True").lower() == "true"
+# Optional shared disk store: lets every gunicorn worker on the host reuse results computed by the others.
+CALLBACK_DISK_CACHE_PATH = os.getenv("CALLBACK_DISK_CACHE_PATH", "")
+callback_result_cache = None
+if CALLBACK_CACHE_ENABLED:
+    callback_disk_cache = None
+    if CALLBACK_DISK_CACHE_PATH:
+        try:
+            callback_disk_cache = SqliteDiskCache(
+                CALLBACK_DISK_CACHE_PATH,
+                max_bytes=int(float(os.getenv("CALLBACK_DISK_CACHE_MAX_MB", 512)) * 1024 * 1024),
+                default_ttl_seconds=float(os.getenv("CALLBACK_DISK_CACHE_TTL_SECONDS", 24 * 3600))
+            )
+            logger.info(f"Shared callback disk cache at {CALLBACK_DISK_CACHE_PATH}.")
+        except Exception as e:
+            logger.error(f"Could not open callback disk cache at {CALLBACK_DISK_CACHE_PATH}: {e}. Continuing with in-memory cache only.", exc_info=True)
+    callback_result_cache = CallbackResultCache(
+        max_entries=int(os.getenv("CALLBACK_CACHE_MAX_ENTRIES", 256)),
+        max_bytes=int(float(os.getenv("CALLBACK_CACHE_MAX_MB", 64)) * 1024 * 1024),
+        backing_store=callback_disk_cache
+    )
+    logger.info(f"Callback result cache enabled (max_entries={callback_result_cache.max_entries}, max_bytes={callback_result_cache.max_bytes}).")
+
+# --- BACKGROUND CALLBACKS ---
+# Optional: run the centroid computation in Dash background jobs (separate processes) so a burst
+# of heavy requests does not pin every web worker. Requires `pip install "dash[diskcache]"`.
+CENTROID_PLOT_BACKGROUND_CALLBACKS = os.getenv("CENTROID_PLOT_BACKGROUND_CALLBACKS", "False").lower() == "true"
+BACKGROUND_CALLBACK_CACHE_DIR = os.getenv("BACKGROUND_CALLBACK_CACHE_DIR", str(AppConfig.PROJECT_ROOT_DIR / 'data' / 'background_callback_cache'))
+background_callback_manager = None
+if CENTROID_PLOT_BACKGROUND_CALLBACKS:
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+        # cache_by makes Dash reuse finished job results for identical inputs until the data changes.
+        background_callback_manager = DiskcacheManager(
+            diskcache.Cache(BACKGROUND_CALLBACK_CACHE_DIR),
+            cache_by=[lambda: data_snapshot_holder.get().version],
+            expire=int(os.getenv("BACKGROUND_CALLBACK_EXPIRE_SECONDS", 3600))
+        )
+        logger.info(f"Centroid plot background callbacks enabled (cache dir: {BACKGROUND_CALLBACK_CACHE_DIR}).")
+    except ImportError as e:
+        logger.error(f"CENTROID_PLOT_BACKGROUND_CALLBACKS is set but diskcache/multiprocess are not installed ({e}). Running centroid callbacks synchronously.")
 
 # --- APP INITIALIZATION ---
 # Use a variable for url_base_pathname for clarity
@@ -201,6 +337,84 @@ if URL_BASE_PATHNAME == '//': # Handle case where it might have been just '/'
 app = Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'], url_base_pathname=URL_BASE_PATHNAME, suppress_callback_exceptions=True)
 server = app.server
 
+if PERF_METRICS_ENABLED:
+    DASH_UPDATE_COMPONENT_PATH = f"{URL_BASE_PATHNAME}_dash-update-component"
+
+    @server.before_request
+    def start_callback_request_timer():
+        if request.path == DASH_UPDATE_COMPONENT_PATH:
+            g.callback_request_started = time.perf_counter()
+
+    @server.after_request
+    def record_callback_request_metrics(response):
+        started = g.pop('callback_request_started', None)
+        if started is not None:
+            # Label by the callback's output spec (e.g. 'centroid-plot-ternary-graph.figure..centroid-plot-status-message.children')
+            # so each callback gets its own series; includes Dash's own JSON serialisation of the outputs.
+            payload = request.get_json(silent=True) or {}
+            callback_output = str(payload.get('output', 'unknown'))
+            perf_metrics.observe_duration(callback_output, 'request', time.perf_counter() - started)
+            perf_metrics.observe_payload_bytes(callback_output, response.calculate_content_length() or 0)
+        return response
+
+    @server.route(f"{URL_BASE_PATHNAME}metrics")
+    def prometheus_metrics():
+        extra_gauges = {'data_snapshot_loaded_timestamp_seconds': ("Unix time at which the current data snapshot was loaded.", data_snapshot_holder.get().loaded_at)}
+        if callback_result_cache is not None:
+            cache_stats = callback_result_cache.stats()
+            extra_gauges.update({
+                'callback_cache_hit_ratio': ("Fraction of callback cache lookups served from cache in this worker.", cache_stats['hit_rate']),
+                'callback_cache_hits': ("Callback cache hits in this worker (in-memory and disk).", cache_stats['hits']),
+                'callback_cache_misses': ("Callback cache misses in this worker.", cache_stats['misses']),
+                'callback_cache_disk_hits': ("Callback cache hits served from the shared disk cache.", cache_stats['backing_store_hits']),
+                'callback_cache_evictions': ("Entries evicted from the in-memory callback cache.", cache_stats['evictions']),
+                'callback_cache_entries': ("Entries held in the in-memory callback cache.", cache_stats['entries']),
+                'callback_cache_bytes': ("Bytes held in the in-memory callback cache.", cache_stats['bytes_held']),
+            })
+            if callback_result_cache.backing_store is not None:
+                disk_stats = callback_result_cache.backing_store.stats()
+                extra_gauges.update({
+                    'callback_disk_cache_entries': ("Unexpired entries in the shared callback disk cache.", disk_stats['entries']),
+                    'callback_disk_cache_bytes': ("Bytes held by unexpired entries in the shared callback disk cache.", disk_stats['bytes_held']),
+                })
+        return Response(perf_metrics.render_prometheus(extra_gauges), mimetype='text/plain; version=0.0.4')
+
+# --- ON-DEMAND CALLBACK PROFILING ---
+# PROFILE_ALL_CALLBACKS profiles every callback request (local debugging only). With
+# PROFILE_SIGNING_SECRET set, a single request is profiled when it carries an X-Profile-Signature
+# header from `python -m src.utils.request_profiler <path>`; a header signed for an admin route's
+# method and path unlocks that route. Signatures are bound to one method and path and expire after 300 s.
+# Collapsed stacks for the last PROFILE_BUFFER_SIZE requests are kept per worker (and written to
+# PROFILE_OUTPUT_DIR if set, which lets any worker serve them).
+PROFILE_ALL_CALLBACKS = os.getenv("PROFILE_ALL_CALLBACKS", "False").lower() == "true"
+PROFILE_SIGNING_SECRET = os.getenv("PROFILE_SIGNING_SECRET", "")
+if PROFILE_ALL_CALLBACKS or PROFILE_SIGNING_SECRET:
+    callback_profile_buffer = ProfileRingBuffer(
+        capacity=int(os.getenv("PROFILE_BUFFER_SIZE", 20)),
+        output_dir=os.getenv("PROFILE_OUTPUT_DIR", "") or None
+    )
+    install_request_profiler(server, f"{URL_BASE_PATHNAME}_dash-update-component", callback_profile_buffer,
+                             profile_all=PROFILE_ALL_CALLBACKS, signing_secret=PROFILE_SIGNING_SECRET or None)
+
+    def _require_profile_admin():
+        if PROFILE_SIGNING_SECRET and not verify_profile_signature(PROFILE_SIGNING_SECRET, request.headers.get(PROFILE_SIGNATURE_HEADER),
+                                                                   request.method, request.path):
+            abort(403)
+
+    @server.route(f"{URL_BASE_PATHNAME}_admin/profiles")
+    def list_callback_profiles():
+        _require_profile_admin()
+        return jsonify(callback_profile_buffer.list())
+
+    @server.route(f"{URL_BASE_PATHNAME}_admin/profiles/<profile_id>.collapsed")
+    def download_callback_profile(profile_id):
+        _require_profile_admin()
+        entry = callback_profile_buffer.get(profile_id)
+        if entry is None:
+            abort(404)
+        return Response(entry['collapsed'], mimetype='text/plain',
+                        headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.collapsed'})
+
 # --- APP LAYOUT ---
 # Construct link hrefs carefully based on URL_BASE_PATHNAME
 item_plot_nav_link = f"{URL_BASE_PATHNAME.rstrip('/')}/item-plot"
@@ -221,12 +435,19 @@ app.layout = html.Div([
 ])
 
 # --- REGISTER PAGE CALLBACKS ---
-item_plot_page.register_callbacks(app, df_item_plot_with_base_attributes, item_plot_current_data_config_dict if item_plot_current_data_config_dict else {}, ITEM_PLOT_PAGE_SPECIFIC_CONFIGS, item_plot_global_tm_min, item_plot_global_tm_max)
-centroid_plot_page.register_callbacks(app, df_centroid_plot_base_items_loaded, df_country_ngram_weights_loaded, df_country_table_info_loaded, centroid_plot_current_data_config_dict if centroid_plot_current_data_config_dict else {}, CENTROID_PLOT_PAGE_SPECIFIC_CONFIGS)
+item_plot_page.register_callbacks(app, data_snapshot_holder.get, item_plot_current_data_config_dict if item_plot_current_data_config_dict else {}, ITEM_PLOT_PAGE_SPECIFIC_CONFIGS, callback_cache=callback_result_cache)
+centroid_plot_page.register_callbacks(app, data_snapshot_holder.get, centroid_plot_current_data_config_dict if centroid_plot_current_data_config_dict else {}, CENTROID_PLOT_PAGE_SPECIFIC_CONFIGS, callback_cache=callback_result_cache, background_callback_manager=background_callback_manager)
+
+# The reloader thread is (re)started lazily in whichever process serves requests, since threads
+# started in a preloading gunicorn master do not survive the fork into workers.
+@server.before_request
+def ensure_data_reloader_running():
+    data_reloader.ensure_running()
 
 
 # --- MAIN ROUTING CALLBACK ---
 @app.callback(Output('page-content', 'children'), [Input('url', 'pathname')])
+@perf_metrics.timed('display_page')
 def display_page(pathname):
     # Use the app's configured base pathname for routing logic
     # This should be the same as URL_BASE_PATHNAME used for app init.
@@ -269,18 +490,19 @@ def display_page(pathname):
     link_centroid_plot = full_centroid_plot_target_path.rstrip('/')
 
 
+    data_snapshot = data_snapshot_holder.get()
     if normalized_pathname == full_item_plot_target_path:
         return item_plot_page.layout(
-            df_item_plot_with_base_attributes, 
+            data_snapshot.df_item_plot_with_base_attributes, 
             item_plot_current_data_config_dict if item_plot_current_data_config_dict else {}, 
             ITEM_PLOT_PAGE_SPECIFIC_CONFIGS, 
-            item_plot_global_tm_min, 
-            item_plot_global_tm_max
+            data_snapshot.item_plot_global_tm_min, 
+            data_snapshot.item_plot_global_tm_max
         )
     elif normalized_pathname == full_centroid_plot_target_path:
         return centroid_plot_page.layout(
             initial_amplification_power=CENTROID_PLOT_PAGE_SPECIFIC_CONFIGS.get('AMPLIFICATION_POWER_DEFAULT', 2.0),
-            country_dropdown_options=country_dropdown_options_for_centroid_plot,
+            country_dropdown_options=list(data_snapshot.country_dropdown_options),
             app_specific_data_config=centroid_plot_current_data_config_dict if centroid_plot_current_data_config_dict else {},
             page_specific_configs=CENTROID_PLOT_PAGE_SPECIFIC_CONFIGS
         )
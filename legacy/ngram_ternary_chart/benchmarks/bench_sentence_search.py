@@ -0,0 +1,97 @@
+# benchmarks/bench_sentence_search.py
+#
+# Latency benchmark for the speech_sentence full-text index.
+# Run from the ngram_ternary_chart/ directory:
+#     python -m benchmarks.bench_sentence_search --db data/oewg_analysis_dash.db
+
+import argparse
+import logging
+import statistics
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from src.config import AppConfig
+from src.utils.sentence_search_utils import ensure_sentence_fts_index, search_sentences
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERIES = [
+    "capacity building",
+    "international law",
+    "critical infrastructure",
+    "confidence building measures",
+    "ransomware",
+    "norms of responsible state behaviour",
+    "cyb",  # search-as-you-type prefix
+]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _time_calls(fn, repeat):
+    timings_ms = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings_ms.append((time.perf_counter() - start) * 1000.0)
+    return sorted(timings_ms), result
+
+
+def run_benchmark(db_path, queries, repeat=20, limit=20, compare_like=False):
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+
+    build_start = time.perf_counter()
+    rebuilt = ensure_sentence_fts_index(engine)
+    build_ms = (time.perf_counter() - build_start) * 1000.0
+    with engine.connect() as conn:
+        sentence_count = conn.execute(text("SELECT COUNT(*) FROM speech_sentence")).scalar()
+    print(f"Corpus: {sentence_count} sentences in {db_path}")
+    print(f"Index {'built' if rebuilt else 'already present'} ({build_ms:.0f} ms)\n")
+
+    header = f"{'query':<40} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+    if compare_like:
+        header += f" {'LIKE p50 ms':>12}"
+    print(header)
+    print('-' * len(header))
+
+    all_timings = []
+    for query in queries:
+        timings, df = _time_calls(lambda: search_sentences(engine, query, limit=limit), repeat)
+        all_timings.extend(timings)
+        line = f"{query[:40]:<40} {len(df):>5} {_percentile(timings, 50):>8.2f} {_percentile(timings, 95):>8.2f} {timings[-1]:>8.2f}"
+        if compare_like:
+            like_sql = text("""
+                SELECT ss.id, i.speaker, ss.sentence_full
+                FROM speech_sentence ss JOIN intervention i ON i.id = ss.intervention_id
+                WHERE ss.sentence_full LIKE :pattern LIMIT :limit
+            """)
+            def _like_scan():
+                with engine.connect() as conn:
+                    return conn.execute(like_sql, {'pattern': f"%{query}%", 'limit': limit}).fetchall()
+            like_timings, _ = _time_calls(_like_scan, max(1, repeat // 4))
+            line += f" {_percentile(like_timings, 50):>12.2f}"
+        print(line)
+
+    all_timings.sort()
+    print('-' * len(header))
+    print(f"{'ALL':<40} {'':>5} {_percentile(all_timings, 50):>8.2f} {_percentile(all_timings, 95):>8.2f} {all_timings[-1]:>8.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark BM25 full-text search over speech_sentence.")
+    parser.add_argument('--db', type=Path, default=AppConfig.DB_FILE, help="Path to the analysis SQLite database.")
+    parser.add_argument('--query', action='append', dest='queries', help="Query to time (repeatable). Defaults to a built-in set.")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query.")
+    parser.add_argument('--limit', type=int, default=20, help="Results per query.")
+    parser.add_argument('--compare-like', action='store_true', help="Also time the equivalent LIKE scan.")
+    args = parser.parse_args()
+    run_benchmark(args.db.resolve(), args.queries or DEFAULT_QUERIES, args.repeat, args.limit, args.compare_like)
@@ -0,0 +1,147 @@
+# benchmarks/bench_ternary_utils.py
+#
+# pytest-benchmark suite for the ternary and centroid utilities, run at several input sizes.
+# Run from the ngram_ternary_chart/ directory (needs `pip install pytest-benchmark`):
+#     python -m pytest benchmarks/bench_ternary_utils.py --save-baseline       # record baselines
+#     python -m pytest benchmarks/bench_ternary_utils.py                       # compare against them
+#     python -m pytest benchmarks/bench_ternary_utils.py --guard calculate_categorical_item_centroids --regression-threshold 0.2
+# See benchmarks/conftest.py for all options; a scaling summary is printed at the end of the run.
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from src.utils.ternary_data_utils import calculate_base_ternary_attributes, recalculate_bubble_sizes, create_plotly_ternary_figure
+from src.utils.ternary_centroid_utils import (
+    calculate_amplified_ternary_coordinates,
+    calculate_weighted_group_centroids,
+    calculate_categorical_item_centroids,
+    assign_colors_to_centroids
+)
+
+DATA_CONFIG = {'id_col': 'ngram_id', 'label_col': 'ngram', 'us_count_col': 'count_A', 'russia_count_col': 'count_G',
+               'middle_count_col': 'count_BCDE', 'entity_type_label': "Ngram"}
+PLOT_LAYOUT_CONFIG = {
+    'axis_mapping': {'a_axis': {'prop_col': 'P_Middle', 'title': "Middle-ground Share"},
+                     'b_axis': {'prop_col': 'P_Russia', 'title': "Russia-like-voting Share"},
+                     'c_axis': {'prop_col': 'P_US', 'title': "US-like-voting Share"}},
+    'TERNARY_PLOT_HEIGHT': 800,
+}
+GROUP_DEFINITIONS = {
+    "US_Focus": {"weight_col_name": "count_A", "label": "US Centroid (Amplified)", "marker_symbol": "diamond", "marker_color": "blue"},
+    "Russia_Focus": {"weight_col_name": "count_G", "label": "Russia Centroid (Amplified)", "marker_symbol": "diamond", "marker_color": "red"},
+    "Middle_Focus": {"weight_col_name": "count_BCDE", "label": "Middle Ground Centroid (Amplified)", "marker_symbol": "diamond", "marker_color": "green"},
+}
+COLOR_MAP = {'A': "blue", 'G': "red", 'B': "green", 'C': "green", 'D': "green", 'E': "green", 'F': 'grey', 'DEFAULT': 'darkgrey'}
+N_COUNTRIES = 193
+COUNTRIES_PER_ITEM = 5
+AMPLIFICATION_POWER = 2.0
+
+
+@lru_cache(maxsize=None)
+def _items(n_items):
+    """n_items n-grams with Zipf-like total counts split randomly between the three groups."""
+    rng = np.random.default_rng(n_items)
+    totals = np.maximum(1, (1000.0 / np.arange(1, n_items + 1) ** 0.9).astype(int) + rng.integers(0, 5, n_items))
+    shares = rng.dirichlet([0.8, 1.0, 0.8], size=n_items)
+    counts = np.floor(shares * totals[:, None]).astype(int)
+    return pd.DataFrame({
+        'ngram_id': np.arange(1, n_items + 1),
+        'ngram': [f"ngram {i}" for i in range(1, n_items + 1)],
+        'count_A': counts[:, 0], 'count_BCDE': counts[:, 1], 'count_G': counts[:, 2],
+    })
+
+
+@lru_cache(maxsize=None)
+def _items_with_base_attributes(n_items):
+    return calculate_base_ternary_attributes(_items(n_items), DATA_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def _items_for_plot(n_items):
+    df = recalculate_bubble_sizes(_items_with_base_attributes(n_items), 1, 75, 3.0)
+    df['hover_text'] = df['ngram_id'].astype(str) + ": " + df['ngram']
+    return df
+
+
+@lru_cache(maxsize=None)
+def _amplified_items(n_items):
+    return calculate_amplified_ternary_coordinates(_items_with_base_attributes(n_items), AMPLIFICATION_POWER)
+
+
+@lru_cache(maxsize=None)
+def _country_weights(n_items):
+    rng = np.random.default_rng(n_items + 1)
+    return pd.DataFrame({
+        'country_speaker': [f"C{c:03d}" for c in rng.integers(0, N_COUNTRIES, n_items * COUNTRIES_PER_ITEM)],
+        'ngram_id': np.repeat(np.arange(1, n_items + 1), COUNTRIES_PER_ITEM),
+        'count_sentences_for_ngram_by_country': rng.integers(1, 20, n_items * COUNTRIES_PER_ITEM),
+    }).drop_duplicates(['country_speaker', 'ngram_id'])
+
+
+@lru_cache(maxsize=None)
+def _country_info():
+    communities = np.array(list('AAAAABBBCCCDDDEEEFFG'))
+    return pd.DataFrame({
+        'id': [f"C{c:03d}" for c in range(N_COUNTRIES)],
+        'merge_name': [f"Country {c}" for c in range(N_COUNTRIES)],
+        'cpm_community_after_10_CPM_0_53': communities[np.arange(N_COUNTRIES) % len(communities)],
+    })
+
+
+@lru_cache(maxsize=None)
+def _country_centroids(n_items):
+    return calculate_categorical_item_centroids(_amplified_items(n_items), _country_weights(n_items), 'ngram_id',
+                                                'country_speaker', 'count_sentences_for_ngram_by_country')
+
+
+def test_calculate_base_ternary_attributes(benchmark, check_regression, n_items):
+    df = _items(n_items)
+    result = benchmark(calculate_base_ternary_attributes, df, DATA_CONFIG)
+    assert len(result) == n_items
+    check_regression('calculate_base_ternary_attributes', n_items)
+
+
+def test_recalculate_bubble_sizes(benchmark, check_regression, n_items):
+    df = _items_with_base_attributes(n_items)
+    result = benchmark(recalculate_bubble_sizes, df, 1, 75, 3.0)
+    assert 'size_px' in result.columns
+    check_regression('recalculate_bubble_sizes', n_items)
+
+
+def test_create_plotly_ternary_figure(benchmark, check_regression, n_items):
+    df = _items_for_plot(n_items)
+    fig = benchmark(create_plotly_ternary_figure, df, DATA_CONFIG, PLOT_LAYOUT_CONFIG, df['TotalMentions'].min(), df['TotalMentions'].max())
+    assert fig.data
+    check_regression('create_plotly_ternary_figure', n_items)
+
+
+def test_calculate_amplified_ternary_coordinates(benchmark, check_regression, n_items):
+    df = _items_with_base_attributes(n_items)
+    result = benchmark(calculate_amplified_ternary_coordinates, df, AMPLIFICATION_POWER)
+    assert 'P_US_amp' in result.columns
+    check_regression('calculate_amplified_ternary_coordinates', n_items)
+
+
+def test_calculate_weighted_group_centroids(benchmark, check_regression, n_items):
+    df = _amplified_items(n_items)
+    result = benchmark(calculate_weighted_group_centroids, df, GROUP_DEFINITIONS)
+    assert len(result) == len(GROUP_DEFINITIONS)
+    check_regression('calculate_weighted_group_centroids', n_items)
+
+
+def test_calculate_categorical_item_centroids(benchmark, check_regression, n_items):
+    df_items, df_weights = _amplified_items(n_items), _country_weights(n_items)
+    result = benchmark(calculate_categorical_item_centroids, df_items, df_weights, 'ngram_id',
+                       'country_speaker', 'count_sentences_for_ngram_by_country')
+    assert not result.empty
+    check_regression('calculate_categorical_item_centroids', n_items)
+
+
+def test_assign_colors_to_centroids(benchmark, check_regression, n_items):
+    df_centroids = _country_centroids(n_items)
+    result = benchmark(assign_colors_to_centroids, df_centroids, _country_info(), 'country_speaker', 'id',
+                       'cpm_community_after_10_CPM_0_53', COLOR_MAP)
+    assert 'marker_color_final' in result.columns
+    check_regression('assign_colors_to_centroids', n_items)
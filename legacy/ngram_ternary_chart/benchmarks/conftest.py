@@ -0,0 +1,112 @@
+# benchmarks/conftest.py
+#
+# Options and fixtures for the pytest-benchmark suites in this directory:
+#   --bench-sizes 1000,10000,100000   input sizes (number of items) to run every benchmark at
+#   --save-baseline                   write this run's medians to the baseline file
+#   --baseline-file PATH              JSON baselines (default: benchmarks/baselines/ternary_utils.json)
+#   --regression-threshold 0.3        fail when a median is more than 30% above its baseline
+#   --guard NAME                      only fail for these functions (repeatable; default: all)
+# Baselines are machine-specific: record them on the machine that runs the comparison.
+
+import json
+import logging
+import math
+import platform
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+DEFAULT_BASELINE_FILE = Path(__file__).resolve().parent / 'baselines' / 'ternary_utils.json'
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+_medians = defaultdict(dict)  # function name -> {n_items: median seconds}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('ternary benchmarks')
+    group.addoption('--bench-sizes', default=','.join(str(n) for n in DEFAULT_SIZES), help="Comma-separated input sizes.")
+    group.addoption('--save-baseline', action='store_true', help="Store this run's medians as the new baseline.")
+    group.addoption('--baseline-file', type=Path, default=DEFAULT_BASELINE_FILE, help="Baseline JSON file.")
+    group.addoption('--regression-threshold', type=float, default=0.3, help="Allowed slowdown relative to the baseline (0.3 = 30%%).")
+    group.addoption('--guard', action='append', default=[], help="Function name to guard against regressions (repeatable).")
+
+
+def pytest_configure(config):
+    # The utilities log at INFO on every call, which would dominate the timings of small inputs.
+    logging.getLogger('src').setLevel(logging.WARNING)
+
+
+def pytest_generate_tests(metafunc):
+    if 'n_items' in metafunc.fixturenames:
+        sizes = [int(n) for n in metafunc.config.getoption('--bench-sizes').split(',') if n.strip()]
+        metafunc.parametrize('n_items', sizes, ids=[f"n={n}" for n in sizes])
+
+
+def _baseline_key(function_name, n_items):
+    return f"{function_name}[n={n_items}]"
+
+
+@pytest.fixture(scope='session')
+def baselines(request):
+    baseline_file = request.config.getoption('--baseline-file')
+    if request.config.getoption('--save-baseline') or not baseline_file.exists():
+        return {}
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('medians_seconds', {})
+
+
+@pytest.fixture
+def check_regression(request, benchmark, baselines):
+    """
+    Call as check_regression(function_name, n_items) after benchmark(...): records the median for the
+    scaling summary and fails the test if it regressed beyond --regression-threshold.
+    """
+    def check(function_name, n_items):
+        benchmark.group = function_name
+        benchmark.extra_info['n_items'] = n_items
+        if benchmark.stats is None:  # --benchmark-disable
+            return
+        median = benchmark.stats.stats.median
+        _medians[function_name][n_items] = median
+        baseline = baselines.get(_baseline_key(function_name, n_items))
+        guarded = request.config.getoption('--guard')
+        if baseline is None or (guarded and function_name not in guarded):
+            return
+        threshold = request.config.getoption('--regression-threshold')
+        if median > baseline * (1.0 + threshold):
+            pytest.fail(f"{function_name} at n={n_items}: median {median * 1e3:.2f} ms is "
+                        f"{(median / baseline - 1.0) * 100:.0f}% slower than the baseline {baseline * 1e3:.2f} ms "
+                        f"(threshold {threshold * 100:.0f}%).")
+    return check
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not session.config.getoption('--save-baseline', default=False) or not _medians:
+        return
+    baseline_file = session.config.getoption('--baseline-file')
+    baseline_file.parent.mkdir(parents=True, exist_ok=True)
+    existing = {}
+    if baseline_file.exists():
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            existing = json.load(f).get('medians_seconds', {})
+    existing.update({_baseline_key(name, n): median for name, by_size in _medians.items() for n, median in by_size.items()})
+    with open(baseline_file, 'w', encoding='utf-8') as f:
+        json.dump({'machine': platform.node(), 'python': platform.python_version(), 'medians_seconds': dict(sorted(existing.items()))}, f, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Scaling curve per function: median time at each size and the fitted growth exponent (time ~ n^k)."""
+    if not _medians:
+        return
+    terminalreporter.section('scaling curves (median ms)')
+    sizes = sorted({n for by_size in _medians.values() for n in by_size})
+    terminalreporter.write_line(f"{'function':<42}" + ''.join(f"{f'n={n}':>14}" for n in sizes) + f"{'k':>8}")
+    for name, by_size in sorted(_medians.items()):
+        measured = sorted(by_size.items())
+        exponent = ''
+        if len(measured) >= 2 and measured[0][1] > 0:
+            (n_first, t_first), (n_last, t_last) = measured[0], measured[-1]
+            exponent = f"{math.log(t_last / t_first) / math.log(n_last / n_first):.2f}"
+        terminalreporter.write_line(f"{name:<42}" + ''.join(
+            f"{by_size[n] * 1e3:>14.2f}" if n in by_size else f"{'-':>14}" for n in sizes) + f"{exponent:>8}")
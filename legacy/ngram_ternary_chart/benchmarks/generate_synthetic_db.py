@@ -0,0 +1,388 @@
+# benchmarks/generate_synthetic_db.py
+#
+# Builds a synthetic OEWG analysis database with the full db_models.py schema (tables, views,
+# FTS index) at a configurable multiple of the real corpus size, for benchmarks and load tests.
+# Run from the ngram_ternary_chart/ directory:
+#     python -m benchmarks.generate_synthetic_db --output data/synthetic_x10.db --scale 10
+# and point the app (or any benchmark) at it with OEWG_DB_FILE=data/synthetic_x10.db.
+#
+# Populated: country (with CPM communities), intervention, intervention_cleaned_words,
+# speech_sentence, oewg_ngrams_to_use, oewg_ngram_statistics, oewg_ngram_community_frequencies,
+# junc_sentence_id_to_ngram_id, oewg_ngram_sentence_samples (and its sample aggregate), analysis_ngram_community_stats,
+# oewg_topics, sentence_topic_ai_classification_(un)pivoted, analysis_ai_labelled_topic_community_stats,
+# bert_models, bert_topic_definition, bert_topic_keywords, bert_sentence_topic_probabilities,
+# analysis_bert_labelled_topic_community_stats, bert_speaker_avg_topic_probability,
+# bert_speaker_pairwise_distance and user_settings. Annotation-only tables (photos, gender sources,
+# WIC attendance, AI usefulness ratings, clustering outputs) are created but left empty.
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from src.models.db_models import (
+    Base, Country, Intervention, InterventionCleanedWords, SpeechSentence, OewgNgramsToUse,
+    NgramStatistics, OewgNgramFrequencyByCommunity, JuncSentenceToNgram, OewgNgramSentenceSamples,
+    AnalysisNgramCommunityStats, OewgTopics, SentenceTopicAIClassificationPivoted,
+    SentenceTopicAIClassificationUnpivoted, AILabelledTopicCommunityStats, BertModel, BertTopicDefinition,
+    BertTopicKeyword, BertSentenceTopicProbability, BertLabelledTopicCommunityStats,
+    BertSpeakerAvgTopicProbability, BertSpeakerPairwiseDistance, UserSettings,
+    create_speech_sentence_fts_insert_trigger, create_ngram_sentence_sample_aggregate_triggers
+)
+from src.utils.ngram_sample_aggregate_utils import rebuild_ngram_sentence_sample_aggregate
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Approximate size of the real corpus; --scale multiplies the corpus-dependent counts.
+BASE_INTERVENTIONS = 4000
+BASE_NGRAMS = 6000
+MEAN_SENTENCES_PER_INTERVENTION = 18
+MEAN_NGRAMS_PER_SENTENCE = 1.5
+N_AI_TOPICS = 60
+N_BERT_TOPICS = 80
+BERT_TOPIC_RANKS = 3
+
+# Countries per CPM community (193 in total). A and G are the two poles of the ternary plots;
+# B-E make up the 'middle' (BCDE) group, F is counted separately.
+COMMUNITY_SIZES = {'A': 40, 'B': 25, 'C': 30, 'D': 35, 'E': 30, 'F': 20, 'G': 13}
+COMMUNITIES = list(COMMUNITY_SIZES)
+COMMUNITY_POLE = {'A': 0, 'B': 1, 'C': 1, 'D': 1, 'E': 1, 'F': 1, 'G': 2}  # 0 = US-like, 1 = middle, 2 = Russia-like
+NON_STATE_SPEAKER_SHARE = 0.12
+
+DOMAIN_TERMS = (
+    "cyber security capacity building international law critical infrastructure confidence measures "
+    "norms responsible state behaviour ransomware information communications technologies regular "
+    "institutional dialogue programme action threats existing emerging voluntary binding framework "
+    "sovereignty human rights gender digital divide cooperation assistance incident response points "
+    "contact directory supply chain integrity vulnerability disclosure attribution due diligence "
+    "humanitarian principles charter peace stability open ended working group consensus report "
+    "developing countries stakeholders private sector civil society academia technical experts "
+    "protection data privacy artificial intelligence quantum cloud services networks terrorism crime"
+).split()
+FILLER_WORDS = (
+    "the of and to in we that is for this on with as are our be it which by all its have an "
+    "delegation would like thank chair also has been important should will support welcome note "
+    "further continue ensure need remain states member particular regard view approach discussions"
+).split()
+
+
+def _zipf_weights(n, exponent, rng):
+    """Zipf(exponent) probabilities over n items, assigned to the items in random order."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _bulk_insert(conn, model, columns, rows, batch_size):
+    """executemany() in batches straight through the DB-API connection. Returns the number of rows."""
+    sql = f"INSERT INTO {model.__tablename__} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    n_rows, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            n_rows += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        n_rows += len(batch)
+    return n_rows
+
+
+def _make_ngram_phrases(n_ngrams, rng):
+    """Unique 2- and 3-word phrases; the vocabulary grows with synthetic terms at large scales."""
+    vocabulary = list(DOMAIN_TERMS)
+    while len(vocabulary) ** 2 < n_ngrams * 4:
+        vocabulary.append(f"term{len(vocabulary)}")
+    vocabulary = np.array(vocabulary)
+    phrases, seen = [], set()
+    while len(phrases) < n_ngrams:
+        n_words = 2 if rng.random() < 0.6 else 3
+        phrase = " ".join(vocabulary[rng.integers(0, len(vocabulary), n_words)])
+        if phrase not in seen and len(set(phrase.split())) == n_words:
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases
+
+
+def _community_stats_rows(ids, labels, counts_by_community, community_sentence_totals):
+    """
+    Rows for the analysis_*_community_stats tables from per-item sentence counts by community
+    (columns in COMMUNITIES order). Frequencies are relative to each group's sentence total.
+    """
+    col = {c: i for i, c in enumerate(COMMUNITIES)}
+    count_a = counts_by_community[:, col['A']]
+    count_bcde = counts_by_community[:, [col[c] for c in 'BCDE']].sum(axis=1)
+    count_f = counts_by_community[:, col['F']]
+    count_g = counts_by_community[:, col['G']]
+    group_counts = np.stack([count_a, count_bcde, count_f, count_g], axis=1).astype(float)
+    group_totals = np.array([
+        community_sentence_totals[col['A']],
+        sum(community_sentence_totals[col[c]] for c in 'BCDE'),
+        community_sentence_totals[col['F']],
+        community_sentence_totals[col['G']],
+    ], dtype=float)
+    relative = group_counts / np.maximum(group_totals, 1.0)
+    normalized = relative / np.maximum(relative.sum(axis=1, keepdims=True), 1e-12)
+    lor = np.log((count_a + 0.5) / (count_a.sum() - count_a + 0.5)) - np.log((count_g + 0.5) / (count_g.sum() - count_g + 0.5))
+    focus = (normalized[:, 0] - normalized[:, 3])
+    # Two-proportion z-test A vs G, normal approximation.
+    pooled = (count_a + count_g) / max(group_totals[0] + group_totals[3], 1.0)
+    se = np.sqrt(np.maximum(pooled * (1 - pooled) * (1 / max(group_totals[0], 1.0) + 1 / max(group_totals[3], 1.0)), 1e-18))
+    z = np.abs(relative[:, 0] - relative[:, 3]) / se
+    p_value = np.array([math.erfc(v / math.sqrt(2)) for v in z])
+    mid_point = (relative[:, 0] + relative[:, 3]) / 2
+    for i, item_id in enumerate(ids):
+        yield (item_id, labels[i], int(count_a[i]), int(count_bcde[i]), int(count_f[i]), int(count_g[i]), int(group_counts[i].sum()),
+               *map(float, relative[i]), *map(float, normalized[i]),
+               float(relative[i, 1] - max(relative[i, 0], relative[i, 3])), float(relative[i, 1] - mid_point[i]),
+               float(lor[i]), float(focus[i]), float(p_value[i]))
+
+
+COMMUNITY_STATS_COLUMNS = (
+    'count_A', 'count_BCDE', 'count_F', 'count_G', 'count_all_communities',
+    'relative_frequency_A', 'relative_frequency_BCDE', 'relative_frequency_F', 'relative_frequency_G',
+    'normalized_frequency_A', 'normalized_frequency_BCDE', 'normalized_frequency_F', 'normalized_frequency_G',
+    'dif_bcde_to_highest_polar', 'dif_bcde_to_mid_polar_point', 'lor_polarization_score', 'focus_polarization_score', 'p_value_ag'
+)
+
+
+def generate_synthetic_db(output_path, scale=1.0, seed=42, zipf_exponent=1.07, batch_size=50_000, chunk_interventions=2_000):
+    """
+    Creates output_path (which must not exist) and fills it with a synthetic corpus.
+
+    N-gram usage follows a Zipf distribution (rank-frequency exponent zipf_exponent); each n-gram
+    also gets a random lean towards the A, middle or G communities, so the ternary plots show
+    realistic spread. Interventions are generated in chunks of chunk_interventions to keep
+    memory flat at large scales, and all inserts go through executemany in batch_size batches.
+
+    Returns:
+        Dict of table name -> rows inserted.
+    """
+    output_path = Path(output_path)
+    if output_path.exists():
+        raise FileExistsError(f"{output_path} already exists; remove it or choose another --output.")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    n_interventions = max(1, int(BASE_INTERVENTIONS * scale))
+    n_ngrams = max(10, int(BASE_NGRAMS * scale))
+    logger.info(f"Generating synthetic DB at {output_path}: scale {scale} ({n_interventions} interventions, {n_ngrams} n-grams).")
+
+    engine = create_engine(f"sqlite:///{output_path}")
+    Base.metadata.create_all(engine)
+    raw_connection = engine.raw_connection()
+    conn = raw_connection.driver_connection
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -200000")
+    # The FTS index is rebuilt once at the end instead of row by row through the insert trigger.
+    conn.execute("DROP TRIGGER IF EXISTS speech_sentence_fts_ai")
+    # Likewise the per-n-gram sample sentence aggregate is filled in one grouped pass at the end.
+    conn.execute("DROP TRIGGER IF EXISTS oewg_ngram_sentence_samples_agg_ai")
+    row_counts = {}
+
+    # --- Countries ---
+    country_ids, country_communities = [], []
+    for community, size in COMMUNITY_SIZES.items():
+        for _ in range(size):
+            n = len(country_ids)
+            country_ids.append(f"{chr(65 + n // 26 // 26 % 26)}{chr(65 + n // 26 % 26)}{chr(65 + n % 26)}")
+            country_communities.append(community)
+    community_index = np.array([COMMUNITIES.index(c) for c in country_communities])
+    row_counts['country'] = _bulk_insert(conn, Country, ('id', 'merge_name', 'cpm_cluster_after_10_res_0_53', 'cpm_community_after_10_CPM_0_53', 'pat_10'), (
+        (cid, f"Country {cid}", COMMUNITIES.index(comm) + 1, comm, int(rng.integers(0, 2)))
+        for cid, comm in zip(country_ids, country_communities)), batch_size)
+    non_state_speakers = [f"ORG{i:02d}" for i in range(25)]
+    speaker_cumulative_weights = np.cumsum(_zipf_weights(len(country_ids), 0.8, rng))  # some delegations speak far more often
+
+    # --- N-grams: Zipf popularity times a per-community lean ---
+    phrases = _make_ngram_phrases(n_ngrams, rng)
+    popularity = _zipf_weights(n_ngrams, zipf_exponent, rng)
+    pole_lean = rng.dirichlet([0.7, 0.9, 0.7], size=n_ngrams)  # columns: A-pole, middle, G-pole
+    ngram_probs_by_community = []
+    for community in COMMUNITIES:
+        weights = popularity * pole_lean[:, COMMUNITY_POLE[community]]
+        ngram_probs_by_community.append(np.cumsum(weights / weights.sum()))
+    ngram_probs_non_state = np.cumsum(popularity)
+    is_filtered_out = rng.random(n_ngrams) < 0.05
+    row_counts['oewg_ngrams_to_use'] = _bulk_insert(conn, OewgNgramsToUse, ('id', 'ngram', 'is_filtered_out'), (
+        (i + 1, phrases[i], int(is_filtered_out[i])) for i in range(n_ngrams)), batch_size)
+
+    # --- Topics ---
+    ai_topic_ids = [f"T-{g:02d}-{t:02d}" for g in range(1, 7) for t in range(1, N_AI_TOPICS // 6 + 1)]
+    ai_topic_popularity = np.cumsum(_zipf_weights(len(ai_topic_ids), 1.0, rng))
+    row_counts['oewg_topics'] = _bulk_insert(conn, OewgTopics, ('topic_id', 'topic_short_description', 'topic_name', 'topic_group'), (
+        (tid, f"Topic {tid}", f"topic_{tid.lower()}", f"Group {tid[2:4]}") for tid in ai_topic_ids), batch_size)
+    row_counts['bert_models'] = _bulk_insert(conn, BertModel, ('id', 'model_identifier', 'description'),
+                                             [(1, 'synthetic-bertopic', 'Synthetic BERTopic run for benchmarks')], batch_size)
+    bert_topic_ids = list(range(-1, N_BERT_TOPICS))
+    bert_topic_popularity = _zipf_weights(N_BERT_TOPICS, 1.0, rng)
+    row_counts['bert_topic_definition'] = _bulk_insert(conn, BertTopicDefinition, ('bert_topic_id', 'bert_model_id', 'bert_topic_name_default'), (
+        (tid, 1, 'Outlier' if tid == -1 else f"{tid}_{'_'.join(rng.choice(DOMAIN_TERMS, 3))}") for tid in bert_topic_ids), batch_size)
+    row_counts['bert_topic_keywords'] = _bulk_insert(conn, BertTopicKeyword, ('bert_topic_id', 'bert_keyword_rank', 'bert_keyword', 'bert_keyword_score', 'bert_model_id'), (
+        (tid, rank, str(rng.choice(DOMAIN_TERMS)), float(0.1 / rank), 1) for tid in bert_topic_ids for rank in range(1, 11)), batch_size)
+
+    # --- Corpus, generated in chunks of interventions ---
+    ngram_counts = np.zeros((n_ngrams, len(COMMUNITIES)), dtype=np.int64)
+    ai_topic_counts = np.zeros((len(ai_topic_ids), len(COMMUNITIES)), dtype=np.int64)
+    bert_topic_counts = np.zeros((N_BERT_TOPICS, len(COMMUNITIES)), dtype=np.int64)
+    community_sentence_totals = np.zeros(len(COMMUNITIES), dtype=np.int64)
+    speaker_topic_sums = np.zeros((len(country_ids), N_BERT_TOPICS))
+    speaker_sentence_totals = np.zeros(len(country_ids))
+    samples_per_ngram = np.zeros(n_ngrams, dtype=np.int8)
+    for name in ('intervention', 'intervention_cleaned_words', 'speech_sentence', 'junc_sentence_id_to_ngram_id',
+                 'oewg_ngram_sentence_samples', 'sentence_topic_ai_classification_pivoted',
+                 'sentence_topic_ai_classification_unpivoted', 'bert_sentence_topic_probabilities'):
+        row_counts[name] = 0
+    filler = np.array(FILLER_WORDS)
+    prediction_timestamp = datetime.datetime(2025, 1, 1).strftime('%Y-%m-%d %H:%M:%S.%f')
+    next_sentence_id = 1
+
+    for chunk_start in range(0, n_interventions, chunk_interventions):
+        chunk_ids = range(chunk_start + 1, min(n_interventions, chunk_start + chunk_interventions) + 1)
+        interventions, cleaned_words, sentences, junction, samples = [], [], [], [], []
+        ai_pivoted, ai_unpivoted, bert_probabilities = [], [], []
+        for intervention_id in chunk_ids:
+            is_country = rng.random() >= NON_STATE_SPEAKER_SHARE
+            country_position = min(int(np.searchsorted(speaker_cumulative_weights, rng.random())), len(country_ids) - 1) if is_country else None
+            speaker = country_ids[country_position] if is_country else str(rng.choice(non_state_speakers))
+            community_position = int(community_index[country_position]) if is_country else None
+            cumulative_probs = ngram_probs_by_community[community_position] if is_country else ngram_probs_non_state
+            n_sentences = max(1, int(rng.poisson(MEAN_SENTENCES_PER_INTERVENTION)))
+            sentence_texts = []
+            for _ in range(n_sentences):
+                sentence_id = next_sentence_id
+                next_sentence_id += 1
+                ngram_positions = np.unique(np.minimum(np.searchsorted(cumulative_probs, rng.random(rng.poisson(MEAN_NGRAMS_PER_SENTENCE))), n_ngrams - 1))
+                words = list(filler[rng.integers(0, len(filler), int(rng.integers(6, 18)))])
+                for position in ngram_positions:
+                    words.insert(int(rng.integers(0, len(words) + 1)), phrases[position])
+                    junction.append((sentence_id, int(position) + 1))
+                    if samples_per_ngram[position] < 5:
+                        samples_per_ngram[position] += 1
+                        samples.append((int(position) + 1, sentence_id))
+                sentence_cleaned = " ".join(words)
+                sentence_full = sentence_cleaned[0].upper() + sentence_cleaned[1:] + "."
+                sentence_texts.append(sentence_full)
+                sentences.append((sentence_id, intervention_id, sentence_full, sentence_cleaned))
+
+                sentence_ai_topics = sorted({ai_topic_ids[min(int(np.searchsorted(ai_topic_popularity, rng.random())), len(ai_topic_ids) - 1)]
+                                             for _ in range(int(rng.integers(0, 3)))})
+                if sentence_ai_topics:
+                    ai_pivoted.append((sentence_id, json.dumps(sentence_ai_topics)))
+                    ai_unpivoted.extend((sentence_id, tid) for tid in sentence_ai_topics)
+                topic_probs = rng.dirichlet(bert_topic_popularity * 5)
+                ranked_topics = np.argsort(topic_probs)[::-1][:BERT_TOPIC_RANKS]
+                for rank, topic_position in enumerate(ranked_topics, start=1):
+                    bert_probabilities.append((sentence_id, rank, intervention_id, int(topic_position), float(topic_probs[topic_position]), 1, prediction_timestamp))
+
+                if is_country:
+                    community_sentence_totals[community_position] += 1
+                    np.add.at(ngram_counts[:, community_position], ngram_positions, 1)
+                    for tid in sentence_ai_topics:
+                        ai_topic_counts[ai_topic_ids.index(tid), community_position] += 1
+                    if topic_probs[ranked_topics[0]] >= 0.3:
+                        bert_topic_counts[ranked_topics[0], community_position] += 1
+                    speaker_topic_sums[country_position] += topic_probs
+                    speaker_sentence_totals[country_position] += 1
+
+            session_number = 1 + (intervention_id * 10) // (n_interventions + 1)
+            start_seconds = int(rng.integers(0, 3 * 3600))
+            interventions.append((
+                intervention_id, f"Session {session_number}, meeting {1 + intervention_id % 12}", session_number, 1 + intervention_id % 12,
+                intervention_id % 40, f"Agenda item {1 + intervention_id % 6}", speaker, 'country' if is_country else 'non_state',
+                f"{start_seconds // 3600:02d}:{start_seconds // 60 % 60:02d}:{start_seconds % 60:02d}.000000",
+                f"{(start_seconds + 300) // 3600:02d}:{(start_seconds + 300) // 60 % 60:02d}:{(start_seconds + 300) % 60:02d}.000000",
+                f"https://example.org/video/{session_number}", " ".join(sentence_texts), None))
+            cleaned_words.append((intervention_id, " ".join(s.lower().rstrip('.') for s in sentence_texts)))
+
+        row_counts['intervention'] += _bulk_insert(conn, Intervention, (
+            'id', 'meeting', 'session_number', 'meeting_number', 'within_meeting_index', 'agenda_item', 'speaker', 'speaker_type',
+            'timestamp_start_hhmmss', 'timestamp_end_hhmmss', 'url_for_video', 'speech', 'apr_negotiation_round'), interventions, batch_size)
+        row_counts['intervention_cleaned_words'] += _bulk_insert(conn, InterventionCleanedWords, ('intervention_id', 'cleaned_words_only_text'), cleaned_words, batch_size)
+        row_counts['speech_sentence'] += _bulk_insert(conn, SpeechSentence, ('id', 'intervention_id', 'sentence_full', 'sentence_cleaned'), sentences, batch_size)
+        row_counts['junc_sentence_id_to_ngram_id'] += _bulk_insert(conn, JuncSentenceToNgram, ('sentence_id', 'ngram_id'), junction, batch_size)
+        row_counts['oewg_ngram_sentence_samples'] += _bulk_insert(conn, OewgNgramSentenceSamples, ('ngram_id', 'sentence_id'), samples, batch_size)
+        row_counts['sentence_topic_ai_classification_pivoted'] += _bulk_insert(conn, SentenceTopicAIClassificationPivoted, ('sentence_id', 'topic_ids_json'), ai_pivoted, batch_size)
+        row_counts['sentence_topic_ai_classification_unpivoted'] += _bulk_insert(conn, SentenceTopicAIClassificationUnpivoted, ('sentence_id', 'topic_id'), ai_unpivoted, batch_size)
+        row_counts['bert_sentence_topic_probabilities'] += _bulk_insert(conn, BertSentenceTopicProbability, (
+            'sentence_id', 'bert_topic_rank', 'intervention_id', 'bert_topic_id', 'bert_probability_score', 'bert_model_id', 'prediction_timestamp'),
+            bert_probabilities, batch_size)
+        conn.commit()
+        logger.info(f"  {chunk_ids[-1]}/{n_interventions} interventions, {next_sentence_id - 1} sentences ({time.perf_counter() - started:.0f}s).")
+
+    # --- Derived statistics tables ---
+    ngram_ids = list(range(1, n_ngrams + 1))
+    row_counts['analysis_ngram_community_stats'] = _bulk_insert(conn, AnalysisNgramCommunityStats, ('ngram_id', 'ngram') + COMMUNITY_STATS_COLUMNS,
+        _community_stats_rows(ngram_ids, phrases, ngram_counts, community_sentence_totals), batch_size)
+    row_counts['oewg_ngram_statistics'] = _bulk_insert(conn, NgramStatistics, (
+        'ngram', 'count_A', 'count_BCDE', 'count_F', 'count_G', 'count_all_communities',
+        'relative_frequency_A', 'relative_frequency_BCDE', 'relative_frequency_F', 'relative_frequency_G',
+        'normalized_frequency_A', 'normalized_frequency_BCDE', 'normalized_frequency_F', 'normalized_frequency_G',
+        'lor_polarization_score', 'p_value', 'p_value_ag_below_05', 'bcde_raised_more'), (
+        (row[1], *row[2:15], row[17], row[19], 'Yes' if row[19] < 0.05 else 'No', 'Yes' if row[15] > 0 else 'No')
+        for row in _community_stats_rows(ngram_ids, phrases, ngram_counts, community_sentence_totals)), batch_size)
+    row_counts['oewg_ngram_community_frequencies'] = _bulk_insert(conn, OewgNgramFrequencyByCommunity, ('ngram', 'community', 'frequency'), (
+        (phrases[i], community, int(ngram_counts[i, c])) for i in range(n_ngrams) for c, community in enumerate(COMMUNITIES) if ngram_counts[i, c]), batch_size)
+    row_counts['analysis_ai_labelled_topic_community_stats'] = _bulk_insert(conn, AILabelledTopicCommunityStats, ('topic_id', 'topic_short_description') + COMMUNITY_STATS_COLUMNS,
+        _community_stats_rows(ai_topic_ids, [f"Topic {tid}" for tid in ai_topic_ids], ai_topic_counts, community_sentence_totals), batch_size)
+    row_counts['analysis_bert_labelled_topic_community_stats'] = _bulk_insert(conn, BertLabelledTopicCommunityStats, ('topic_id', 'bert_model_id', 'topic_short_description') + COMMUNITY_STATS_COLUMNS, (
+        (row[0], 1, *row[1:]) for row in _community_stats_rows(list(range(N_BERT_TOPICS)), [f"BERT topic {t}" for t in range(N_BERT_TOPICS)], bert_topic_counts, community_sentence_totals)), batch_size)
+
+    speaking_countries = np.flatnonzero(speaker_sentence_totals)
+    speaker_profiles = speaker_topic_sums[speaking_countries] / speaker_sentence_totals[speaking_countries, None]
+    row_counts['bert_speaker_avg_topic_probability'] = _bulk_insert(conn, BertSpeakerAvgTopicProbability, ('speaker', 'bert_model_id', 'bert_topic_id', 'average_probability'), (
+        (country_ids[c], 1, t, float(speaker_profiles[i, t])) for i, c in enumerate(speaking_countries) for t in range(N_BERT_TOPICS)), batch_size)
+
+    def pairwise_jsd_rows():
+        log_profiles = np.log(np.maximum(speaker_profiles, 1e-12))
+        for i in range(len(speaking_countries)):
+            for j in range(len(speaking_countries)):
+                first, second = country_ids[speaking_countries[i]], country_ids[speaking_countries[j]]
+                if first < second:
+                    mixture = (speaker_profiles[i] + speaker_profiles[j]) / 2
+                    log_mixture = np.log(np.maximum(mixture, 1e-12))
+                    jsd = 0.5 * (speaker_profiles[i] @ (log_profiles[i] - log_mixture) + speaker_profiles[j] @ (log_profiles[j] - log_mixture))
+                    yield (first, second, 1, 'JSD', float(np.sqrt(max(jsd, 0.0) / np.log(2))))
+    row_counts['bert_speaker_pairwise_distance'] = _bulk_insert(conn, BertSpeakerPairwiseDistance, ('speaker_1', 'speaker_2', 'bert_model_id', 'distance_metric', 'distance_value'),
+                                                                pairwise_jsd_rows(), batch_size)
+    row_counts['user_settings'] = _bulk_insert(conn, UserSettings, ('id', 'interventions_in_scope', 'ngram_frequency_cut_off', 'ngram_length', 'label_for_ngram_filtering_round'),
+                                               [(1, 'all', 5, 3, 'synthetic')], batch_size)
+    conn.commit()
+
+    logger.info("Rebuilding the full-text index...")
+    conn.execute("INSERT INTO speech_sentence_fts(speech_sentence_fts) VALUES ('rebuild')")
+    conn.commit()
+    raw_connection.close()
+    with engine.begin() as connection:
+        connection.exec_driver_sql(create_speech_sentence_fts_insert_trigger.statement)
+        for trigger_ddl in create_ngram_sentence_sample_aggregate_triggers:
+            connection.execute(trigger_ddl)
+        row_counts['oewg_ngram_sentence_sample_aggregate'] = rebuild_ngram_sentence_sample_aggregate(connection)
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    logger.info(f"Synthetic DB written to {output_path} in {time.perf_counter() - started:.0f}s ({os.path.getsize(output_path) / 1e6:.0f} MB).")
+    return row_counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic OEWG analysis database for benchmarks.")
+    parser.add_argument('--output', type=Path, required=True, help="Path of the SQLite file to create (must not exist).")
+    parser.add_argument('--scale', type=float, default=1.0, help="Corpus size relative to the real corpus (e.g. 10, 100).")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed.")
+    parser.add_argument('--zipf-exponent', type=float, default=1.07, help="Rank-frequency exponent for n-gram usage.")
+    parser.add_argument('--batch-size', type=int, default=50_000, help="Rows per executemany() batch.")
+    args = parser.parse_args()
+    counts = generate_synthetic_db(args.output, args.scale, args.seed, args.zipf_exponent, args.batch_size)
+    width = max(len(name) for name in counts)
+    for name, n_rows in counts.items():
+        print(f"{name:<{width}} {n_rows:>12,}")
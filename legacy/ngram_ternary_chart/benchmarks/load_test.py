@@ -0,0 +1,315 @@
+# benchmarks/load_test.py
+#
+# Concurrent load test that replays Dash callback traffic against /_dash-update-component.
+# Run from the ngram_ternary_chart/ directory, against a running server:
+#     python -m benchmarks.load_test --url http://127.0.0.1:8052 --concurrency 8 --duration 60
+# or let it start gunicorn locally for the run:
+#     python -m benchmarks.load_test --start-server --concurrency 8 --duration 60
+#
+# Sessions are synthetic by default (search typing on the Keyword View, power-slider sweeps and
+# growing country selections on the Country View). --sessions-file replays recorded sessions
+# instead: a JSON-lines file with one list of _dash-update-component request bodies per line,
+# e.g. copied from the browser's network tab.
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from src.pages.item_plot_page import PAGE_PREFIX as ITEM_PLOT_PREFIX
+from src.pages.centroid_plot_page import PAGE_PREFIX as CENTROID_PLOT_PREFIX
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_SEARCH_TERMS = ["cyber", "capacity building", "international law", "critical infrastructure", "norms", "ransomware"]
+DEFAULT_AMPLIFICATION_POWERS = [1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0]
+
+
+def _callback_body(outputs, inputs, changed_prop_id):
+    """Builds a request body in the shape the Dash renderer sends for a callback."""
+    output_specs = [{'id': component_id, 'property': prop} for component_id, prop in outputs]
+    if len(outputs) == 1:
+        output_string = f"{outputs[0][0]}.{outputs[0][1]}"
+        output_specs = output_specs[0]
+    else:
+        output_string = ".." + "...".join(f"{component_id}.{prop}" for component_id, prop in outputs) + ".."
+    return {
+        'output': output_string,
+        'outputs': output_specs,
+        'inputs': [{'id': component_id, 'property': prop, 'value': value} for component_id, prop, value in inputs],
+        'changedPropIds': [changed_prop_id],
+        'state': [],
+    }
+
+
+def _page_request(pathname):
+    return _callback_body([('page-content', 'children')], [('url', 'pathname', pathname)], 'url.pathname')
+
+
+def _ternary_request(search_term, min_size=1, max_size=75, scaling_power=3.0, changed='search-input'):
+    return _callback_body(
+        [(f'{ITEM_PLOT_PREFIX}-ternary-graph', 'figure'), (f'{ITEM_PLOT_PREFIX}-visible-count', 'children')],
+        [(f'{ITEM_PLOT_PREFIX}-search-input', 'value', search_term),
+         (f'{ITEM_PLOT_PREFIX}-min-size-input', 'value', min_size),
+         (f'{ITEM_PLOT_PREFIX}-max-size-input', 'value', max_size),
+         (f'{ITEM_PLOT_PREFIX}-scaling-power-slider', 'value', scaling_power)],
+        f'{ITEM_PLOT_PREFIX}-{changed}.value')
+
+
+def _centroid_request(power, country_ids, show_labels=False, changed='amplification-power-slider'):
+    return _callback_body(
+        [(f'{CENTROID_PLOT_PREFIX}-ternary-graph', 'figure'), (f'{CENTROID_PLOT_PREFIX}-status-message', 'children')],
+        [(f'{CENTROID_PLOT_PREFIX}-amplification-power-slider', 'value', power),
+         (f'{CENTROID_PLOT_PREFIX}-show-country-labels-checkbox', 'value', ['SHOW_LABELS'] if show_labels else []),
+         (f'{CENTROID_PLOT_PREFIX}-country-dropdown', 'value', list(country_ids))],
+        f'{CENTROID_PLOT_PREFIX}-{changed}.value')
+
+
+def keyword_view_session(rng, search_terms=DEFAULT_SEARCH_TERMS):
+    """Opens the Keyword View, types a search term one keystroke at a time, then nudges the bubble scaling."""
+    term = rng.choice(search_terms)
+    requests = [_page_request('/item-plot'), _ternary_request('', changed='search-input')]
+    requests += [_ternary_request(term[:n]) for n in range(1, len(term) + 1)]
+    requests.append(_ternary_request(term, scaling_power=rng.choice([1.0, 2.0, 3.0, 4.0]), changed='scaling-power-slider'))
+    return requests
+
+
+def country_view_session(rng, country_ids, powers=DEFAULT_AMPLIFICATION_POWERS):
+    """Opens the Country View, sweeps the amplification slider, then builds up a multi-country selection."""
+    requests = [_page_request('/centroid-plot')]
+    sweep = powers if rng.random() < 0.5 else list(reversed(powers))
+    requests += [_centroid_request(power, []) for power in sweep]
+    selected = []
+    for country_id in rng.sample(country_ids, min(len(country_ids), rng.randint(2, 6))):
+        selected.append(country_id)
+        requests.append(_centroid_request(sweep[-1], selected, changed='country-dropdown'))
+    requests.append(_centroid_request(sweep[-1], selected, show_labels=True, changed='show-country-labels-checkbox'))
+    return requests
+
+
+def _find_component_prop(node, component_id, prop):
+    """Depth-first search of a serialised Dash layout for a component's property."""
+    if isinstance(node, dict):
+        props = node.get('props')
+        if isinstance(props, dict) and props.get('id') == component_id:
+            return props.get(prop)
+        for value in node.values():
+            found = _find_component_prop(value, component_id, prop)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_component_prop(value, component_id, prop)
+            if found is not None:
+                return found
+    return None
+
+
+class _Client:
+    """One keep-alive HTTP connection per worker thread, reopened after errors."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.path_prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.connection = None
+
+    def post_json(self, path, body):
+        encoded = json.dumps(body).encode('utf-8')
+        try:
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+            self.connection.request('POST', f"{self.path_prefix}{path}", body=encoded, headers={'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def discover_country_ids(base_url, timeout=60.0):
+    """Asks the server for the Country View layout and returns the enabled country dropdown values."""
+    client = _Client(base_url, timeout)
+    try:
+        status, payload = client.post_json('/_dash-update-component', _page_request('/centroid-plot'))
+    finally:
+        client.close()
+    if status != 200:
+        logger.warning(f"Could not load the Country View layout (HTTP {status}); country selections will be empty.")
+        return []
+    options = _find_component_prop(json.loads(payload), f'{CENTROID_PLOT_PREFIX}-country-dropdown', 'options') or []
+    return [option['value'] for option in options if isinstance(option, dict) and not option.get('disabled')]
+
+
+def load_recorded_sessions(sessions_file):
+    with open(sessions_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load_test(base_url, concurrency, duration_seconds, make_session, think_time_ms=0, timeout=120.0, seed=None):
+    """
+    Runs `concurrency` simulated analysts for duration_seconds. Each repeatedly takes a session
+    from make_session(rng) and sends its requests in order, waiting think_time_ms between them.
+
+    Returns:
+        Dict with overall and per-callback latency samples (ms), error counts and elapsed time.
+    """
+    results_lock = threading.Lock()
+    latencies_by_output = defaultdict(list)
+    errors_by_output = defaultdict(int)
+    error_examples = []
+    deadline = time.perf_counter() + duration_seconds
+
+    def analyst(worker_index):
+        rng = random.Random(None if seed is None else seed + worker_index)
+        client = _Client(base_url, timeout)
+        try:
+            while time.perf_counter() < deadline:
+                for body in make_session(rng):
+                    if time.perf_counter() >= deadline:
+                        return
+                    output = body.get('output', 'unknown')
+                    started = time.perf_counter()
+                    try:
+                        status, _ = client.post_json('/_dash-update-component', body)
+                        error = None if 200 <= status < 300 else f"HTTP {status}"
+                    except (OSError, http.client.HTTPException) as e:
+                        error = f"{type(e).__name__}: {e}"
+                    elapsed_ms = (time.perf_counter() - started) * 1000.0
+                    with results_lock:
+                        if error is None:
+                            latencies_by_output[output].append(elapsed_ms)
+                        else:
+                            errors_by_output[output] += 1
+                            if len(error_examples) < 5:
+                                error_examples.append(f"{output}: {error}")
+                    if think_time_ms:
+                        time.sleep(rng.uniform(0.5, 1.5) * think_time_ms / 1000.0)
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=analyst, args=(i,), name=f"analyst-{i}", daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'latencies_by_output': dict(latencies_by_output),
+        'errors_by_output': dict(errors_by_output),
+        'error_examples': error_examples,
+        'elapsed_seconds': time.perf_counter() - started,
+    }
+
+
+def print_report(results, concurrency):
+    latencies_by_output = results['latencies_by_output']
+    errors_by_output = results['errors_by_output']
+    elapsed = results['elapsed_seconds']
+    header = f"{'callback output':<70} {'ok':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(f"\nConcurrency {concurrency}, {elapsed:.1f}s")
+    print(header)
+    print('-' * len(header))
+    all_latencies = []
+    for output in sorted(set(latencies_by_output) | set(errors_by_output)):
+        timings = sorted(latencies_by_output.get(output, []))
+        all_latencies.extend(timings)
+        print(f"{output[:70]:<70} {len(timings):>6} {errors_by_output.get(output, 0):>5} "
+              f"{_percentile(timings, 50):>8.1f} {_percentile(timings, 95):>8.1f} {_percentile(timings, 99):>8.1f}")
+    all_latencies.sort()
+    n_errors = sum(errors_by_output.values())
+    n_total = len(all_latencies) + n_errors
+    print('-' * len(header))
+    print(f"{'ALL':<70} {len(all_latencies):>6} {n_errors:>5} "
+          f"{_percentile(all_latencies, 50):>8.1f} {_percentile(all_latencies, 95):>8.1f} {_percentile(all_latencies, 99):>8.1f}")
+    print(f"Throughput: {n_total / elapsed if elapsed else 0:.1f} req/s   Error rate: {(n_errors / n_total * 100) if n_total else 0:.2f}%")
+    for example in results['error_examples']:
+        print(f"  e.g. {example}")
+
+
+def start_local_server(port, workers):
+    """Starts gunicorn with the project's config on 127.0.0.1:port and waits until it answers."""
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'app:server'],
+        cwd=PROJECT_DIR, env=env)
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode} during startup.")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/_dash-layout')
+            if connection.getresponse().status == 200:
+                connection.close()
+                logger.info(f"Local server ready on port {port} ({workers} workers).")
+                return process
+        except OSError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Timed out waiting for the local server to start.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test the Dash callback endpoint with replayed analyst sessions.")
+    parser.add_argument('--url', default='http://127.0.0.1:8052', help="Base URL of the app, including any URL_BASE_PATHNAME.")
+    parser.add_argument('--concurrency', type=int, default=4, help="Simulated analysts sending requests in parallel.")
+    parser.add_argument('--duration', type=float, default=30.0, help="Run time in seconds.")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Mean pause between requests within a session.")
+    parser.add_argument('--mix', type=float, default=0.5, help="Fraction of synthetic sessions that use the Country View.")
+    parser.add_argument('--sessions-file', type=Path, help="Replay recorded sessions (JSON lines of request-body lists) instead of synthetic ones.")
+    parser.add_argument('--seed', type=int, help="Random seed for reproducible synthetic sessions.")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Per-request timeout in seconds.")
+    parser.add_argument('--start-server', action='store_true', help="Start gunicorn locally (on --port) for the duration of the run.")
+    parser.add_argument('--port', type=int, default=8060, help="Port for --start-server.")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers for --start-server.")
+    args = parser.parse_args()
+
+    server_process = None
+    base_url = args.url
+    if args.start_server:
+        server_process = start_local_server(args.port, args.workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        if args.sessions_file:
+            recorded_sessions = load_recorded_sessions(args.sessions_file)
+            logger.info(f"Replaying {len(recorded_sessions)} recorded sessions from {args.sessions_file}.")
+            make_session = lambda rng: rng.choice(recorded_sessions)
+        else:
+            country_ids = discover_country_ids(base_url, args.timeout)
+            logger.info(f"Synthetic sessions; {len(country_ids)} selectable countries.")
+            make_session = lambda rng: (country_view_session(rng, country_ids) if rng.random() < args.mix
+                                        else keyword_view_session(rng))
+        results = run_load_test(base_url, args.concurrency, args.duration, make_session, args.think_ms, args.timeout, args.seed)
+        print_report(results, args.concurrency)
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait(timeout=30)
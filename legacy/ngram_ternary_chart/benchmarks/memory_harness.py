@@ -0,0 +1,233 @@
+# benchmarks/memory_harness.py
+#
+# tracemalloc harness: peak and retained Python memory for app initialisation and each callback,
+# measured on a fixed synthetic dataset, with the top allocation sites and per-stage budgets.
+# Run from the ngram_ternary_chart/ directory:
+#     python -m benchmarks.memory_harness                           # check against the budgets file
+#     python -m benchmarks.memory_harness --write-budgets           # (re)record budgets from this run
+#     python -m benchmarks.memory_harness --db data/oewg_analysis_dash.db --top 20
+#
+# The dataset is generated with benchmarks/generate_synthetic_db.py (--scale, --seed), so results are
+# comparable between runs and machines. Exits with status 1 when any stage exceeds its budget.
+# tracemalloc only sees allocations made through Python's allocator (including numpy/pandas buffers),
+# and tracing slows the app down several-fold, so timings from this run are meaningless.
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+# Nothing from src/ (or modules importing it) is imported at module level: src.config reads
+# OEWG_DB_FILE once, on first import, so the harness sets it before importing anything else.
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGETS_FILE = Path(__file__).resolve().parent / 'baselines' / 'memory_budgets.json'
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+_APP_SOURCE_PREFIXES = (str(PROJECT_DIR / 'app.py'), str(PROJECT_DIR / 'src') + os.sep)
+MB = 1024 * 1024
+TRACEBACK_FRAMES = 10
+
+# Frames from these files are skipped when attributing an allocation to a site, so the reported
+# line is the first one in application or library code rather than in the import machinery.
+_IGNORED_FRAME_FILES = {'<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', tracemalloc.__file__}
+
+
+def callback_scenarios(country_ids):
+    """(stage name, request body) pairs replayed through /_dash-update-component, in order."""
+    from benchmarks.load_test import _page_request, _ternary_request, _centroid_request
+    selected_countries = country_ids[:5]
+    return [
+        ('display_page:item-plot', _page_request('/item-plot')),
+        ('update_ternary_plot:no-search', _ternary_request('')),
+        ('update_ternary_plot:search', _ternary_request('cyber')),
+        ('update_ternary_plot:rescale', _ternary_request('', min_size=5, max_size=60, scaling_power=1.5, changed='scaling-power-slider')),
+        ('display_page:centroid-plot', _page_request('/centroid-plot')),
+        ('update_centroid_plot:power', _centroid_request(2.5, [])),
+        ('update_centroid_plot:countries', _centroid_request(2.5, selected_countries, changed='country-dropdown')),
+        ('update_centroid_plot:labels', _centroid_request(2.5, selected_countries, show_labels=True, changed='show-country-labels-checkbox')),
+    ]
+
+
+def _top_sites(snapshot, limit):
+    """
+    Largest live allocations in snapshot, grouped by allocating line (the innermost frame outside the
+    import machinery) and by the innermost app frame (app.py or src/) that led to it, which is usually
+    the line to change, e.g. a .copy() whose buffers are allocated inside pandas.
+    """
+    by_site = defaultdict(lambda: [0, 0])
+    for trace in snapshot.traces:
+        frames = [f for f in reversed(trace.traceback) if f.filename not in _IGNORED_FRAME_FILES] or [trace.traceback[-1]]
+        origin = next((f for f in frames if f.filename.startswith(_APP_SOURCE_PREFIXES)), None)
+        key = (f"{frames[0].filename}:{frames[0].lineno}", f"{os.path.relpath(origin.filename, PROJECT_DIR)}:{origin.lineno}" if origin else '')
+        totals = by_site[key]
+        totals[0] += trace.size
+        totals[1] += 1
+    ranked = sorted(by_site.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+    return [{'site': site, 'origin': origin, 'kb': round(size / 1024, 1), 'blocks': count} for (site, origin), (size, count) in ranked]
+
+
+def measure_stage(name, action, top):
+    """
+    Runs action() in its own tracemalloc session and returns its peak and retained memory in MB.
+
+    Only allocations made during the stage are traced. peak_mb is their high-water mark;
+    retained_mb is what is still allocated after the action's return value is dropped and a full
+    collection has run (snapshots, caches and leaks). top_sites lists the allocations still live
+    when the action returned, including its result, by allocating line.
+    """
+    gc.collect()
+    tracemalloc.start(TRACEBACK_FRAMES)
+    try:
+        result = action()
+        _, peak = tracemalloc.get_traced_memory()
+        top_sites = _top_sites(tracemalloc.take_snapshot(), top)
+        del result
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    measurement = {'stage': name, 'peak_mb': round(peak / MB, 2), 'retained_mb': round(retained / MB, 2), 'top_sites': top_sites}
+    logger.warning(f"{name}: peak {measurement['peak_mb']:.2f} MB, retained {measurement['retained_mb']:.2f} MB")
+    return measurement
+
+
+def configure_environment(db_file):
+    """Points the app at db_file. Must run before anything imports src.config."""
+    if 'src.config' in sys.modules or 'app' in sys.modules:
+        raise RuntimeError("src.config is already imported; configure the harness before importing the app or its modules.")
+    os.environ['OEWG_DB_FILE'] = str(Path(db_file).resolve())
+    # The result cache is disabled so every callback does its full work, and the reloader thread is not started.
+    os.environ['CALLBACK_CACHE_ENABLED'] = 'False'
+    os.environ['DATA_RELOAD_INTERVAL_SECONDS'] = '0'
+    os.environ['CENTROID_PLOT_BACKGROUND_CALLBACKS'] = 'False'
+    os.environ['SHARED_DATA_DIR'] = ''
+
+
+def run_memory_harness(top=10):
+    """
+    Imports the app (configure_environment must have been called) and measures initialisation,
+    then replays callback_scenarios through Flask's test client. Returns the stage measurements.
+    """
+    # Importing the page modules first means dash, pandas and plotly are loaded before measuring,
+    # so app_init covers what app.py itself allocates: the data snapshot, caches and the layout.
+    from benchmarks.load_test import _page_request, _find_component_prop
+    from src.pages.centroid_plot_page import PAGE_PREFIX as CENTROID_PLOT_PREFIX
+
+    measurements = [measure_stage('app_init', lambda: __import__('app'), top)]
+    app_module = sys.modules['app']
+    client = app_module.server.test_client()
+    endpoint = f"{app_module.URL_BASE_PATHNAME}_dash-update-component"
+
+    layout = client.post(endpoint, json=_page_request('/centroid-plot')).get_json()
+    options = _find_component_prop(layout, f'{CENTROID_PLOT_PREFIX}-country-dropdown', 'options') or []
+    country_ids = [option['value'] for option in options if isinstance(option, dict) and not option.get('disabled')]
+    del layout, options
+
+    for name, body in callback_scenarios(country_ids):
+        def call(body=body, name=name):
+            response = client.post(endpoint, json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name} returned HTTP {response.status_code}: {response.get_data(as_text=True)[:500]}")
+            return response
+        measurements.append(measure_stage(name, call, top))
+    return measurements
+
+
+def load_budgets(budgets_file):
+    if not Path(budgets_file).exists():
+        return {}
+    with open(budgets_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_budgets(budgets_file, measurements, headroom, dataset):
+    """Budgets are this run's values plus headroom (e.g. 0.25 = 25%), and at least 0.25 MB above them."""
+    budgets = {
+        'dataset': dataset,
+        'headroom': headroom,
+        'peak_mb': {m['stage']: round(max(m['peak_mb'] * (1.0 + headroom), m['peak_mb'] + 0.25), 2) for m in measurements},
+        'retained_mb': {m['stage']: round(max(m['retained_mb'] * (1.0 + headroom), m['retained_mb'] + 0.25), 2) for m in measurements},
+    }
+    Path(budgets_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(budgets_file, 'w', encoding='utf-8') as f:
+        json.dump(budgets, f, indent=2)
+    return budgets
+
+
+def check_budgets(measurements, budgets):
+    """Returns one message per stage and metric that exceeds its budget."""
+    violations = []
+    for m in measurements:
+        for metric in ('peak_mb', 'retained_mb'):
+            budget = budgets.get(metric, {}).get(m['stage'])
+            if budget is not None and m[metric] > budget:
+                violations.append(f"{m['stage']}: {metric} {m[metric]:.2f} MB exceeds budget {budget:.2f} MB")
+    return violations
+
+
+def print_report(measurements, budgets, top):
+    print(f"\n{'stage':<34}{'peak MB':>10}{'budget':>10}{'retained MB':>14}{'budget':>10}")
+    for m in measurements:
+        peak_budget = budgets.get('peak_mb', {}).get(m['stage'])
+        retained_budget = budgets.get('retained_mb', {}).get(m['stage'])
+        print(f"{m['stage']:<34}{m['peak_mb']:>10.2f}{peak_budget if peak_budget is not None else '-':>10}"
+              f"{m['retained_mb']:>14.2f}{retained_budget if retained_budget is not None else '-':>10}")
+    for m in measurements:
+        if not m['top_sites']:
+            continue
+        print(f"\nTop {top} allocation sites live at the end of {m['stage']}:")
+        for site in m['top_sites']:
+            via = f"  (via {site['origin']})" if site['origin'] else ''
+            print(f"  {site['kb']:>10.1f} KB {site['blocks']:>8} blocks  {site['site']}{via}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure peak and retained memory of app start-up and callbacks with tracemalloc.")
+    parser.add_argument('--db', type=Path, help="Use this database instead of generating a synthetic one.")
+    parser.add_argument('--scale', type=float, default=0.25, help="Scale of the generated synthetic database.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the generated synthetic database.")
+    parser.add_argument('--budgets-file', type=Path, default=DEFAULT_BUDGETS_FILE, help="JSON file with per-stage MB budgets.")
+    parser.add_argument('--write-budgets', action='store_true', help="Record this run's values (plus --headroom) as the budgets.")
+    parser.add_argument('--headroom', type=float, default=0.25, help="Allowance added on top of measured values by --write-budgets.")
+    parser.add_argument('--top', type=int, default=10, help="Allocation sites to report per stage.")
+    parser.add_argument('--json', type=Path, help="Also write the measurements to this file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='memory_harness_') as tmp_dir:
+        if args.db:
+            db_file, dataset = args.db.resolve(), str(args.db)
+        else:
+            db_file, dataset = Path(tmp_dir) / 'synthetic.db', f"synthetic scale={args.scale} seed={args.seed}"
+        configure_environment(db_file)
+        if not args.db:
+            from benchmarks.generate_synthetic_db import generate_synthetic_db
+            logger.warning(f"Generating {dataset} ...")
+            generate_synthetic_db(db_file, scale=args.scale, seed=args.seed)
+        measurements = run_memory_harness(args.top)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'dataset': dataset, 'stages': measurements}, f, indent=2)
+    if args.write_budgets:
+        budgets = write_budgets(args.budgets_file, measurements, args.headroom, dataset)
+        print(f"Budgets written to {args.budgets_file}.")
+    else:
+        budgets = load_budgets(args.budgets_file)
+        if budgets and budgets.get('dataset') != dataset:
+            logger.warning(f"Budgets were recorded for '{budgets.get('dataset')}', this run used '{dataset}'.")
+    print_report(measurements, budgets, args.top)
+
+    violations = [] if args.write_budgets else check_budgets(measurements, budgets)
+    if violations:
+        print("\nMemory budget exceeded:")
+        for violation in violations:
+            print(f"  {violation}")
+        sys.exit(1)
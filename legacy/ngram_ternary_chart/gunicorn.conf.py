@@ -0,0 +1,26 @@
+# ngram_ternary_chart/gunicorn.conf.py
+# Usage: gunicorn -c gunicorn.conf.py app:server
+
+import os
+from pathlib import Path
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8052)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+# Import app.py (and load every dataset) once in the master; workers are forked afterwards.
+preload_app = True
+
+# Opt-in: with SHARED_FRAMES=True the numeric dataset columns are memory-mapped from SHARED_DATA_DIR
+# (default data/shared_frames), so resident memory stays flat as workers are added.
+if os.getenv("SHARED_FRAMES", "False").lower() == "true":
+    os.environ.setdefault("SHARED_DATA_DIR", str(Path(__file__).resolve().parent / 'data' / 'shared_frames'))
+
+
+def post_fork(server, worker):
+    # SQLite connections opened while preloading must not be used from more than one process:
+    # drop the inherited pool (without closing the parent's connections) so each worker opens its own.
+    import sys
+    engine = getattr(sys.modules.get('app'), 'engine', None)
+    if engine is not None:
+        engine.dispose(close=False)
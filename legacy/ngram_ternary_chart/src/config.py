@@ -8,8 +8,12 @@ class AppConfig: # Renamed class for clarity, as it's for the app now
     PROJECT_ROOT_DIR = Path(__file__).resolve().parent.parent
     
     # Path to your SQLite database file within the 'data' directory at the project root
-    # Updated database filename
-    DB_FILE = PROJECT_ROOT_DIR / 'data' / 'oewg_analysis_dash.db'
+    # Updated database filename. OEWG_DB_FILE overrides it (e.g. a synthetic DB for benchmarks).
+    DB_FILE = Path(os.environ['OEWG_DB_FILE']).resolve() if os.environ.get('OEWG_DB_FILE') else PROJECT_ROOT_DIR / 'data' / 'oewg_analysis_dash.db'
+
+    # Directory holding the memory-mapped TF-IDF "more like this" index. Built and refreshed offline:
+    #   python -m src.utils.sentence_similarity_utils --db <path>
+    SENTENCE_TFIDF_INDEX_DIR = PROJECT_ROOT_DIR / 'data' / 'sentence_tfidf_index'
 
     # You can add other app-specific configurations here if needed in the future.
     # For example:
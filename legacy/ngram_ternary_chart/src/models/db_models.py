@@ -136,6 +136,19 @@ class SpeechSentence(Base):
         # Corrected __repr__ to use existing attributes
         return f"<SpeechSentence(id={self.id}, intervention_id={self.intervention_id})>"
 
+class SpeechSentenceDuplicateCluster(Base):
+    """Near-duplicate cluster of each sentence, found with MinHash/LSH over sentence_cleaned.
+       Sentences in the same cluster (e.g. boilerplate read out by several delegations) share
+       cluster_id, which is the lowest sentence id in the cluster. Singletons point to themselves."""
+    __tablename__ = 'speech_sentence_duplicate_cluster'
+
+    sentence_id = Column(Integer, ForeignKey('speech_sentence.id'), primary_key=True)
+    cluster_id = Column(Integer, nullable=False, index=True)
+    cluster_size = Column(Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f"<SpeechSentenceDuplicateCluster(sentence_id={self.sentence_id}, cluster_id={self.cluster_id}, cluster_size={self.cluster_size})>"
+
 class OewgNgramFrequencyByCommunity(Base):
     __tablename__ = 'oewg_ngram_community_frequencies'
     ngram = Column(String, nullable=False)
@@ -205,6 +218,18 @@ class OewgNgramSentenceSamples(Base):
     def __repr__(self):
         return f"<OewgNgramSentenceSamples(ngram_id={self.ngram_id}, sentence_id={self.sentence_id})>"
 
+class OewgNgramSentenceSampleAggregate(Base):
+    # Derived from oewg_ngram_sentence_samples + speech_sentence: one row per n-gram with samples, holding
+    # its sample sentences joined with '|||'. Kept in sync by triggers; see SAMPLE_SENTENCE_SEPARATOR.
+    __tablename__ = 'oewg_ngram_sentence_sample_aggregate'
+
+    ngram_id = Column(Integer, ForeignKey("oewg_ngrams_to_use.id"), primary_key=True)
+    sample_count = Column(Integer, nullable=False)
+    sample_sentences = Column(String, nullable=True)
+
+    def __repr__(self):
+        return f"<OewgNgramSentenceSampleAggregate(ngram_id={self.ngram_id}, sample_count={self.sample_count})>"
+
 class OewgNgramsToTopicNames(Base):
     __tablename__ = 'oewg_ngrams_to_topic_names'
     
@@ -698,45 +723,29 @@ engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create the DDL statement for the new view
+# cumulative_total is a running SUM() window over the per-frequency counts (one sort), rather than a
+# correlated subquery per distinct frequency. Needs SQLite 3.25+.
 frequency_distribution_of_ngrams = DDL(
     """
     CREATE VIEW IF NOT EXISTS FrequencyDistributionOfNgrams AS
-    WITH freq_counts AS (
-        SELECT s.count_all_communities AS frequency
-        FROM oewg_ngram_statistics AS s
-    ),
-    summaries AS (
+    WITH summaries AS (
         SELECT
-            frequency,
+            s.count_all_communities AS frequency,
             COUNT(*) AS number_of_ngrams
-        FROM freq_counts
-        GROUP BY frequency
-    ),
-    grand_total AS (
-        SELECT SUM(number_of_ngrams) AS sum_ngrams
-        FROM summaries
-    ),
-    cumulative_calc AS (
-        SELECT
-            s1.frequency,
-            s1.number_of_ngrams,
-            (
-                SELECT SUM(s2.number_of_ngrams)
-                FROM summaries s2
-                WHERE s2.frequency >= s1.frequency
-            ) AS cumulative_total
-        FROM summaries s1
+        FROM oewg_ngram_statistics AS s
+        GROUP BY s.count_all_communities
     )
     SELECT
-        c.frequency,
-        c.number_of_ngrams,
-        c.cumulative_total,
-        CAST(c.cumulative_total AS FLOAT)/gt.sum_ngrams*100 AS cumulative_percentage
-    FROM cumulative_calc c
-    CROSS JOIN grand_total gt
+        frequency,
+        number_of_ngrams,
+        SUM(number_of_ngrams) OVER (ORDER BY frequency DESC ROWS UNBOUNDED PRECEDING) AS cumulative_total,
+        CAST(SUM(number_of_ngrams) OVER (ORDER BY frequency DESC ROWS UNBOUNDED PRECEDING) AS FLOAT)
+            / SUM(number_of_ngrams) OVER () * 100 AS cumulative_percentage
+    FROM summaries
     ORDER BY frequency DESC;
     """
 )
+drop_frequency_distribution_of_ngrams = DDL("DROP VIEW IF EXISTS FrequencyDistributionOfNgrams")
 
 create_vw_ngram_sentence_samples = DDL("""
 CREATE VIEW IF NOT EXISTS vw_ngram_sentence_samples AS
@@ -751,6 +760,20 @@ JOIN speech_sentence ss ON s.sentence_id = ss.id;
 """
 )
 
+# One sample sentence per (ngram, near-duplicate cluster): collapses repeated boilerplate
+create_vw_ngram_sentence_samples_distinct = DDL("""
+CREATE VIEW IF NOT EXISTS vw_ngram_sentence_samples_distinct AS
+SELECT
+    s.ngram_id,
+    MIN(s.sentence_id) AS sentence_id,
+    COALESCE(c.cluster_id, s.sentence_id) AS duplicate_cluster_id,
+    COUNT(*) AS duplicates_in_samples
+FROM oewg_ngram_sentence_samples s
+LEFT JOIN speech_sentence_duplicate_cluster c ON c.sentence_id = s.sentence_id
+GROUP BY s.ngram_id, COALESCE(c.cluster_id, s.sentence_id);
+"""
+)
+
 create_vw_ngram_usefulness_rating = DDL("""
 CREATE VIEW IF NOT EXISTS vw_ngram_usefulness_rating AS
 SELECT 
@@ -766,26 +789,89 @@ JOIN oewg_ngrams_to_use n ON r.ngram_id = n.id;
 """
 )
 
+# --- Per-n-gram sample sentence aggregate ---
+# The review views used to run a correlated GROUP_CONCAT subquery per n-gram. They now join
+# oewg_ngram_sentence_sample_aggregate, which is filled in one grouped pass and then kept current
+# by triggers that recompute only the n-grams touched by a change.
+SAMPLE_SENTENCE_SEPARATOR = '|||'
+
+_sample_aggregate_select = f"""
+    SELECT s.ngram_id, COUNT(*), group_concat(ss.sentence_full, '{SAMPLE_SENTENCE_SEPARATOR}')
+    FROM oewg_ngram_sentence_samples s
+    JOIN speech_sentence ss ON s.sentence_id = ss.id
+"""
+
+
+def _sample_aggregate_refresh(ngram_id_condition):
+    """Trigger body statements recomputing the aggregate rows whose ngram_id matches ngram_id_condition."""
+    return f"""
+    DELETE FROM oewg_ngram_sentence_sample_aggregate WHERE ngram_id {ngram_id_condition};
+    INSERT INTO oewg_ngram_sentence_sample_aggregate (ngram_id, sample_count, sample_sentences)
+    {_sample_aggregate_select} WHERE s.ngram_id {ngram_id_condition}
+    GROUP BY s.ngram_id;
+"""
+
+
+clear_ngram_sentence_sample_aggregate = DDL("DELETE FROM oewg_ngram_sentence_sample_aggregate")
+
+populate_ngram_sentence_sample_aggregate = DDL(f"""
+INSERT INTO oewg_ngram_sentence_sample_aggregate (ngram_id, sample_count, sample_sentences)
+{_sample_aggregate_select}
+GROUP BY s.ngram_id;
+""")
+
+create_ngram_sentence_sample_aggregate_triggers = [
+    DDL(f"""
+CREATE TRIGGER IF NOT EXISTS oewg_ngram_sentence_samples_agg_ai AFTER INSERT ON oewg_ngram_sentence_samples BEGIN
+{_sample_aggregate_refresh('= new.ngram_id')}
+END;
+"""),
+    DDL(f"""
+CREATE TRIGGER IF NOT EXISTS oewg_ngram_sentence_samples_agg_ad AFTER DELETE ON oewg_ngram_sentence_samples BEGIN
+{_sample_aggregate_refresh('= old.ngram_id')}
+END;
+"""),
+    DDL(f"""
+CREATE TRIGGER IF NOT EXISTS oewg_ngram_sentence_samples_agg_au AFTER UPDATE ON oewg_ngram_sentence_samples BEGIN
+{_sample_aggregate_refresh('IN (old.ngram_id, new.ngram_id)')}
+END;
+"""),
+    DDL(f"""
+CREATE TRIGGER IF NOT EXISTS speech_sentence_sample_agg_au AFTER UPDATE OF sentence_full ON speech_sentence BEGIN
+{_sample_aggregate_refresh('IN (SELECT ngram_id FROM oewg_ngram_sentence_samples WHERE sentence_id IN (old.id, new.id))')}
+END;
+"""),
+    DDL(f"""
+CREATE TRIGGER IF NOT EXISTS speech_sentence_sample_agg_ad AFTER DELETE ON speech_sentence BEGIN
+{_sample_aggregate_refresh('IN (SELECT ngram_id FROM oewg_ngram_sentence_samples WHERE sentence_id = old.id)')}
+END;
+"""),
+]
+
 create_vw_lowest_rated_ngrams_for_review = DDL("""
 CREATE VIEW IF NOT EXISTS vw_lowest_rated_ngrams_for_review AS
+WITH low_rated AS (
+    SELECT
+        r.ngram_id,
+        ROUND(AVG(r.rating), 2) AS average_rating,
+        group_concat(r.reason, '|||') AS list_of_reasons
+    FROM oewg_ngram_usefulness_ai_rating r
+    GROUP BY r.ngram_id
+    HAVING SUM(CASE WHEN r.rating <= 3 THEN 1 ELSE 0 END) >= 2
+)
 SELECT
-    r.ngram_id,
+    lr.ngram_id,
     n.ngram,
-    ROUND(AVG(r.rating), 2) AS average_rating,
-    (
-        SELECT group_concat(sentence_full, '|||')
-        FROM vw_ngram_sentence_samples
-        WHERE ngram_id = r.ngram_id
-    ) AS list_of_examples,
-    group_concat(r.reason, '|||') AS list_of_reasons
-FROM oewg_ngram_usefulness_ai_rating r
-JOIN oewg_ngrams_to_use n ON n.id = r.ngram_id
-GROUP BY r.ngram_id, n.ngram
-HAVING SUM(CASE WHEN r.rating <= 3 THEN 1 ELSE 0 END) >= 2
+    lr.average_rating,
+    agg.sample_sentences AS list_of_examples,
+    lr.list_of_reasons
+FROM low_rated lr
+JOIN oewg_ngrams_to_use n ON n.id = lr.ngram_id
+LEFT JOIN oewg_ngram_sentence_sample_aggregate agg ON agg.ngram_id = lr.ngram_id
 """
 )
 
-create_vw_ngrams_to_already_matched_topics = DDL("""
+create_vw_ngrams_to_already_matched_topics = DDL(f"""
 CREATE VIEW IF NOT EXISTS vw_ngrams_to_already_matched_topics AS
 SELECT
     n.id AS ngram_id,
@@ -793,14 +879,11 @@ SELECT
     n.ngram,
     t.topic_name,
     t.topic_group,
-    (
-        SELECT GROUP_CONCAT(ss.sentence_full, ' | ')
-        FROM oewg_ngram_sentence_samples ognss
-        JOIN speech_sentence ss ON ognss.sentence_id = ss.id
-        WHERE ognss.ngram_id = n.id
-    ) AS sample_sentences_concatenated
+    replace(agg.sample_sentences, '{SAMPLE_SENTENCE_SEPARATOR}', ' | ') AS sample_sentences_concatenated
 FROM
     oewg_ngrams_to_use n
+LEFT JOIN
+    oewg_ngram_sentence_sample_aggregate agg ON agg.ngram_id = n.id
 LEFT JOIN
     oewg_ngram_cluster_from_shared_sentences ca ON ca.ngram_id = n.id
 LEFT JOIN
@@ -812,6 +895,51 @@ WHERE
 """
 )
 
+drop_vw_lowest_rated_ngrams_for_review = DDL("DROP VIEW IF EXISTS vw_lowest_rated_ngrams_for_review")
+drop_vw_ngrams_to_already_matched_topics = DDL("DROP VIEW IF EXISTS vw_ngrams_to_already_matched_topics")
+
+# --- Full-text index over speech_sentence (FTS5, external content) ---
+# The index stores no copy of the text; it points back at speech_sentence via content_rowid.
+# Triggers keep it in sync with inserts/updates/deletes on speech_sentence.
+create_speech_sentence_fts = DDL("""
+CREATE VIRTUAL TABLE IF NOT EXISTS speech_sentence_fts USING fts5(
+    sentence_full,
+    sentence_cleaned,
+    content='speech_sentence',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+""")
+
+create_speech_sentence_fts_insert_trigger = DDL("""
+CREATE TRIGGER IF NOT EXISTS speech_sentence_fts_ai AFTER INSERT ON speech_sentence BEGIN
+    INSERT INTO speech_sentence_fts(rowid, sentence_full, sentence_cleaned)
+    VALUES (new.id, new.sentence_full, new.sentence_cleaned);
+END;
+""")
+
+create_speech_sentence_fts_delete_trigger = DDL("""
+CREATE TRIGGER IF NOT EXISTS speech_sentence_fts_ad AFTER DELETE ON speech_sentence BEGIN
+    INSERT INTO speech_sentence_fts(speech_sentence_fts, rowid, sentence_full, sentence_cleaned)
+    VALUES ('delete', old.id, old.sentence_full, old.sentence_cleaned);
+END;
+""")
+
+create_speech_sentence_fts_update_trigger = DDL("""
+CREATE TRIGGER IF NOT EXISTS speech_sentence_fts_au AFTER UPDATE ON speech_sentence BEGIN
+    INSERT INTO speech_sentence_fts(speech_sentence_fts, rowid, sentence_full, sentence_cleaned)
+    VALUES ('delete', old.id, old.sentence_full, old.sentence_cleaned);
+    INSERT INTO speech_sentence_fts(rowid, sentence_full, sentence_cleaned)
+    VALUES (new.id, new.sentence_full, new.sentence_cleaned);
+END;
+""")
+
+# Rank by BM25 with sentence_full weighted above sentence_cleaned. Stored in the index
+# config so that "ORDER BY rank" uses FTS5's optimised ranking path.
+configure_speech_sentence_fts_rank = DDL("""
+INSERT INTO speech_sentence_fts(speech_sentence_fts, rank) VALUES ('rank', 'bm25(1.0, 0.5)');
+""")
+
 create_country_speaker_gender = DDL("""
 CREATE VIEW IF NOT EXISTS vw_country_speaker_gender AS
 SELECT
@@ -1248,6 +1376,14 @@ event.listen(SentenceTopicAIClassificationUnpivoted.__table__, 'after_create', c
 event.listen(BertSentenceTopicProbability.__table__, 'after_create', create_vw_bert_topic_to_ai_topic_exclusive_match_count)
 event.listen(BertSpeakerPairwiseDistance.__table__, 'after_create', create_vw_avg_topic_prob_network_nodes)
 event.listen(BertSpeakerPairwiseDistance.__table__, 'after_create', create_vw_avg_topic_prob_network_edges)
+event.listen(SpeechSentence.__table__, 'after_create', create_speech_sentence_fts)
+event.listen(SpeechSentence.__table__, 'after_create', create_speech_sentence_fts_insert_trigger)
+event.listen(SpeechSentence.__table__, 'after_create', create_speech_sentence_fts_delete_trigger)
+event.listen(SpeechSentence.__table__, 'after_create', create_speech_sentence_fts_update_trigger)
+event.listen(SpeechSentence.__table__, 'after_create', configure_speech_sentence_fts_rank)
+event.listen(SpeechSentenceDuplicateCluster.__table__, 'after_create', create_vw_ngram_sentence_samples_distinct)
+for sample_aggregate_trigger in create_ngram_sentence_sample_aggregate_triggers:
+    event.listen(OewgNgramSentenceSamples.__table__, 'after_create', sample_aggregate_trigger)
 
 if __name__ == "__main__":
     Base.metadata.create_all(engine)
@@ -9,6 +9,8 @@ from dash.dependencies import Input, Output
 
 # --- Import from your project structure ---
 from src.utils.ternary_data_utils import calculate_base_ternary_attributes
+from src.utils import perf_metrics
+from src.utils.callback_cache import figure_outputs_to_dict
 from src.utils.ternary_centroid_utils import (
     calculate_amplified_ternary_coordinates,
     calculate_weighted_group_centroids,
@@ -102,11 +104,11 @@ def layout(
 
 def register_callbacks(
     app,
-    df_base_items_loaded_closure,
-    df_country_ngram_weights_loaded_closure,
-    df_country_table_info_loaded_closure,
+    get_data_snapshot, # Callable returning the current DataSnapshot (base items, country weights and info)
     app_specific_data_config_closure,
-    page_specific_configs_closure
+    page_specific_configs_closure,
+    callback_cache=None, # Optional CallbackResultCache shared with other pages
+    background_callback_manager=None # Optional Dash background callback manager (e.g. DiskcacheManager)
 ):
     logger.info(f"[{PAGE_PREFIX}] Registering callbacks...")
 
@@ -143,23 +145,80 @@ def register_callbacks(
     graph_id = f'{PAGE_PREFIX}-ternary-graph'
     status_id = f'{PAGE_PREFIX}-status-message'
 
-    @app.callback(
-        [Output(graph_id, 'figure'), Output(status_id, 'children')],
-        [Input(slider_id, 'value'),
-         Input(show_labels_checkbox_id, 'value'),
-         Input(country_dropdown_id, 'value')]
-    )
+    centroid_callback_outputs = [Output(graph_id, 'figure'), Output(status_id, 'children')]
+    centroid_callback_inputs = [Input(slider_id, 'value'),
+                                Input(show_labels_checkbox_id, 'value'),
+                                Input(country_dropdown_id, 'value')]
+
+    @perf_metrics.timed('update_centroid_plot')
     def update_centroid_plot(selected_power: float, 
                              show_labels_checklist_values: list,
-                             selected_countries_iso: list):
+                             selected_countries_iso: list,
+                             report_progress=None):
         logger.debug(f"[{PAGE_PREFIX}] Callback: Power={selected_power}, ShowLabelsCheck={show_labels_checklist_values}, SelectedCountriesISO={selected_countries_iso}")
+        should_show_country_labels_cb = bool(show_labels_checklist_values) and 'SHOW_LABELS' in show_labels_checklist_values
+        # Selection order does not change which centroids are computed, so the key uses a sorted list.
+        countries_normalised = sorted(set(selected_countries_iso)) if selected_countries_iso else []
+
+        # One snapshot per request: a concurrent data reload cannot change the data mid-computation.
+        data_snapshot = get_data_snapshot()
+        def compute_outputs():
+            return figure_outputs_to_dict('update_centroid_plot', _build_centroid_outputs(
+                data_snapshot, selected_power, should_show_country_labels_cb, countries_normalised, report_progress))
+        if callback_cache is None:
+            return compute_outputs()
+        cache_key = callback_cache.make_key(f"{PAGE_PREFIX}/update_centroid_plot", data_snapshot.version, selected_power, should_show_country_labels_cb, countries_normalised)
+        return callback_cache.get_or_compute(cache_key, compute_outputs)
+
+    if background_callback_manager is None:
+        app.callback(centroid_callback_outputs, centroid_callback_inputs)(update_centroid_plot)
+    else:
+        # Runs in a separate worker process managed by Dash. Progress text is written to the
+        # status message while the job runs and replaced by the final status on completion.
+        # When any input changes mid-flight, the renderer re-fires the callback and Dash
+        # terminates the superseded job (oldJob), so stale computations do not keep running.
+        @app.callback(
+            centroid_callback_outputs,
+            centroid_callback_inputs,
+            background=True,
+            manager=background_callback_manager,
+            progress=[Output(status_id, 'children')]
+        )
+        def update_centroid_plot_in_background(set_progress, selected_power, show_labels_checklist_values, selected_countries_iso):
+            return update_centroid_plot(selected_power, show_labels_checklist_values, selected_countries_iso,
+                                        report_progress=lambda message: set_progress([message]))
+
+    def _amplified_coordinates(df_with_p_values, amplification_power, data_version):
+        """calculate_amplified_ternary_coordinates, with the amplified columns shared via the disk cache when one is configured."""
+        disk_store = callback_cache.backing_store if callback_cache is not None else None
+        if disk_store is None:
+            return calculate_amplified_ternary_coordinates(df_with_p_values.copy(), amplification_power)
+        amplified_cols = ['P_US_amp', 'P_Russia_amp', 'P_Middle_amp']
+        store_key = disk_store.make_key(f"{PAGE_PREFIX}/amplified_coordinates", str(data_version), round(float(amplification_power), 6))
+        amplified_values = disk_store.get(store_key)
+        if amplified_values is not None and len(amplified_values) == len(df_with_p_values):
+            df_amplified = df_with_p_values.copy()
+            df_amplified[amplified_cols] = amplified_values
+            return df_amplified
+        df_amplified = calculate_amplified_ternary_coordinates(df_with_p_values.copy(), amplification_power)
+        disk_store.set(store_key, df_amplified.loc[df_with_p_values.index, amplified_cols].to_numpy(dtype=float))
+        return df_amplified
+
+    def _build_centroid_outputs(data_snapshot,
+                                selected_power: float,
+                                should_show_country_labels_cb: bool,
+                                selected_countries_iso: list,
+                                report_progress=None):
+        """Computes (figure, status_message) for already-normalised inputs. Pure given the data snapshot.
+        report_progress, if given, is called with short status strings as the computation advances."""
         status_message = ""
         fig = go.Figure()
-
-        should_show_country_labels_cb = 'SHOW_LABELS' in show_labels_checklist_values
+        if report_progress is None:
+            report_progress = lambda message: None
+        stages = perf_metrics.stage_recorder('update_centroid_plot')
 
         data_config_cb = app_specific_data_config_closure if app_specific_data_config_closure else {}
-        df_base_items_for_callback = df_base_items_loaded_closure.copy() if df_base_items_loaded_closure is not None and not df_base_items_loaded_closure.empty else pd.DataFrame()
+        df_base_items_for_callback = data_snapshot.df_centroid_plot_base_items.copy() if data_snapshot.df_centroid_plot_base_items is not None and not data_snapshot.df_centroid_plot_base_items.empty else pd.DataFrame()
         
         if df_base_items_for_callback.empty:
             status_message = "Error: Base item data is missing or empty for centroid calculation."
@@ -170,6 +229,7 @@ def register_callbacks(
 
         df_with_P_initial = calculate_base_ternary_attributes(df_base_items_for_callback, data_config_cb)
         df_with_P_initial.dropna(subset=['P_US', 'P_Russia', 'P_Middle'], inplace=True)
+        stages.mark('base_attributes')
         if df_with_P_initial.empty:
             status_message = "Error: No items with valid P_X coordinates after base attribute calculation."
             logger.error(f"[{PAGE_PREFIX}] {status_message}")
@@ -177,8 +237,10 @@ def register_callbacks(
             fig.update_layout(ternary=dict(sum=1, aaxis=dict(title='A'),baxis=dict(title='B'),caxis=dict(title='C')), title_text=f"{CENTROID_PLOT_TITLE_PREFIX_CB} (Error)")
             return fig, status_message
 
-        df_items_amplified = calculate_amplified_ternary_coordinates(df_with_P_initial.copy(), selected_power)
+        report_progress(f"Computing amplified coordinates (power {selected_power})...")
+        df_items_amplified = _amplified_coordinates(df_with_P_initial, selected_power, data_snapshot.version)
         df_items_amplified.dropna(subset=['P_US_amp', 'P_Russia_amp', 'P_Middle_amp'], inplace=True)
+        stages.mark('amplification')
         if df_items_amplified.empty:
             status_message = "Error: No items with valid amplified coordinates."
             logger.error(f"[{PAGE_PREFIX}] {status_message}")
@@ -195,12 +257,14 @@ def register_callbacks(
                 processed_group_definitions_for_cb[group_name] = proc_def
         df_group_centroids = pd.DataFrame()
         if processed_group_definitions_for_cb:
+            report_progress("Computing voting group centroids...")
             df_group_centroids = calculate_weighted_group_centroids(df_items_amplified.copy(), processed_group_definitions_for_cb, 'P_US_amp', 'P_Russia_amp', 'P_Middle_amp')
+        stages.mark('group_centroids')
 
         df_country_centroids_to_plot = pd.DataFrame()
         
-        df_country_weights_cb = df_country_ngram_weights_loaded_closure.copy() if df_country_ngram_weights_loaded_closure is not None and not df_country_ngram_weights_loaded_closure.empty else pd.DataFrame()
-        df_country_info_cb = df_country_table_info_loaded_closure.copy() if df_country_table_info_loaded_closure is not None and not df_country_table_info_loaded_closure.empty else pd.DataFrame()
+        df_country_weights_cb = data_snapshot.df_country_ngram_weights.copy() if data_snapshot.df_country_ngram_weights is not None and not data_snapshot.df_country_ngram_weights.empty else pd.DataFrame()
+        df_country_info_cb = data_snapshot.df_country_table_info.copy() if data_snapshot.df_country_table_info is not None and not data_snapshot.df_country_table_info.empty else pd.DataFrame()
 
         page_data_source_label = data_config_cb.get('entity_type_label', 'items')
         if 'ngram' not in page_data_source_label.lower(): status_message += " Note: Country centroids are typically for 'ngrams'. "
@@ -231,13 +295,14 @@ def register_callbacks(
                     categories_to_process=countries_for_calculation_cb,
                     centroid_label_prefix=centroid_label_prefix_for_hover, # For 'label' column (hover)
                     default_marker_symbol=COUNTRY_CENTROID_MARKER_SYMBOL_CB,
-                    default_marker_color="grey" 
+                    default_marker_color="grey",
+                    progress_callback=lambda n_done, n_total: report_progress(f"Computing country centroids ({n_done}/{n_total})...")
                 )
                 # Ensure RAW_COUNTRY_ID_COL_FOR_DISPLAY_TEXT is a column if it was the index
                 if RAW_COUNTRY_ID_COL_FOR_DISPLAY_TEXT not in temp_df_country_centroids.columns and \
                    temp_df_country_centroids.index.name == RAW_COUNTRY_ID_COL_FOR_DISPLAY_TEXT:
                     temp_df_country_centroids.reset_index(inplace=True)
-
+            stages.mark('country_centroids')
 
             if not temp_df_country_centroids.empty:
                 if COUNTRY_COMMUNITY_GROUPING_COL_NAME not in df_country_info_cb.columns:
@@ -265,6 +330,7 @@ def register_callbacks(
 
             elif (selected_countries_iso or DEFAULT_COUNTRIES_TO_PLOT_CB is None): 
                 status_message += " No country centroids calculated for selected/available countries."
+        stages.mark('color_assignment')
         
         if not df_group_centroids.empty:
             custom_data_gc = df_group_centroids[['P_US_centroid', 'P_Russia_centroid', 'P_Middle_centroid', 'total_weight_for_group']].values
@@ -429,6 +495,7 @@ def register_callbacks(
             title_text=f"{CENTROID_PLOT_TITLE_PREFIX_CB} (Power: {selected_power})",
             margin=dict(l=100, r=120, t=80, b=60), ternary=dict(sum=1, aaxis=dict(title=TERNARY_AXIS_MAPPING_CB.get('a_axis',{}).get('title','A-axis'), min=0.0, linewidth=1.5, tickfont={'size': 10}), baxis=dict(title=TERNARY_AXIS_MAPPING_CB.get('b_axis',{}).get('title','B-axis'), min=0.0, linewidth=1.5, tickfont={'size': 10}), caxis=dict(title=TERNARY_AXIS_MAPPING_CB.get('c_axis',{}).get('title','C-axis'), min=0.0, linewidth=1.5, tickfont={'size': 10}), bgcolor="#f0f0f0"), legend_title_text='Centroid Types', hoverlabel=dict(bgcolor="white", font_size=12)
         )
+        stages.mark('figure_build')
         
         if not status_message:
             status_message = f"Plot updated. Power: {selected_power}. Labels: {'Shown' if should_show_country_labels_cb else 'Hidden'}."
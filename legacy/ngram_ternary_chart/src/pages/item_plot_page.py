@@ -8,6 +8,8 @@ from dash.dependencies import Input, Output
 
 # Utility functions for this page
 from src.utils.ternary_data_utils import recalculate_bubble_sizes, create_plotly_ternary_figure
+from src.utils import perf_metrics
+from src.utils.callback_cache import figure_outputs_to_dict
 
 logger = logging.getLogger(__name__)
 
@@ -130,13 +132,13 @@ def layout(
 
 def register_callbacks(
     app,
-    df_with_base_attributes_closure, # Renamed: This is data with P_X, TotalMentions from app.py
+    get_data_snapshot, # Callable returning the current DataSnapshot (item data with P_X, TotalMentions, colour range)
     current_data_config_closure,
     page_specific_configs_closure, # Contains plot layout and other page-specific settings
-    global_tm_min_for_color_closure,
-    global_tm_max_for_color_closure
+    callback_cache=None # Optional CallbackResultCache shared with other pages
 ):
-    """Registers callbacks for the item ternary plot page."""
+    """Registers callbacks for the item ternary plot page.
+    Each request reads one DataSnapshot, so a data reload never changes data mid-request."""
     logger.info(f"[{PAGE_PREFIX}] Registering callbacks...")
 
     TERNARY_MIN_BUBBLE_SIZE_CB = page_specific_configs_closure.get('TERNARY_MIN_BUBBLE_SIZE', 1)
@@ -159,26 +161,43 @@ def register_callbacks(
          Input(max_size_input_id, 'value'),
          Input(scaling_slider_id, 'value')]
     )
+    @perf_metrics.timed('update_ternary_plot')
     def update_ternary_plot(search_term, ui_min_size, ui_max_size, ui_scaling_power):
         logger.debug(f"[{PAGE_PREFIX}] Callback triggered. Search: '{search_term}', MinSize: {ui_min_size}, MaxSize: {ui_max_size}, Power: {ui_scaling_power}")
 
-        data_config_cb = current_data_config_closure if current_data_config_closure else {}
-        plot_layout_config_cb = current_plot_layout_config_cb if current_plot_layout_config_cb else {}
-        
-        if df_with_base_attributes_closure is None or df_with_base_attributes_closure.empty:
-            logger.warning(f"[{PAGE_PREFIX}] Base data is empty in callback. Returning empty figure.")
-            empty_fig = create_plotly_ternary_figure(pd.DataFrame(), data_config_cb, plot_layout_config_cb, 0, 1)
-            return empty_fig, "No data available to display."
-
         min_s = int(ui_min_size) if ui_min_size is not None and str(ui_min_size).strip() else TERNARY_MIN_BUBBLE_SIZE_CB
         max_s = int(ui_max_size) if ui_max_size is not None and str(ui_max_size).strip() else TERNARY_MAX_BUBBLE_SIZE_CB
         scaling_p = float(ui_scaling_power) if ui_scaling_power is not None else TERNARY_BUBBLE_SCALING_POWER_CB
 
         if min_s <= 0: min_s = 1
         if max_s < min_s: max_s = min_s + 1
-        
+
+        # Search matching is case-insensitive, so the normalised term is also the cache key.
+        search_term_normalised = search_term.lower().strip() if search_term else ''
+
+        data_snapshot = get_data_snapshot()
+        def compute_outputs():
+            return figure_outputs_to_dict('update_ternary_plot', _build_ternary_outputs(data_snapshot, search_term_normalised, min_s, max_s, scaling_p))
+        if callback_cache is None:
+            return compute_outputs()
+        cache_key = callback_cache.make_key(f"{PAGE_PREFIX}/update_ternary_plot", data_snapshot.version, search_term_normalised, min_s, max_s, scaling_p)
+        return callback_cache.get_or_compute(cache_key, compute_outputs)
+
+    def _build_ternary_outputs(data_snapshot, search_term, min_s, max_s, scaling_p):
+        """Computes (figure, count_text) for already-normalised inputs. Pure given the data snapshot."""
+        stages = perf_metrics.stage_recorder('update_ternary_plot')
+        df_with_base_attributes_cb = data_snapshot.df_item_plot_with_base_attributes
+        data_config_cb = current_data_config_closure if current_data_config_closure else {}
+        plot_layout_config_cb = current_plot_layout_config_cb if current_plot_layout_config_cb else {}
+
+        if df_with_base_attributes_cb is None or df_with_base_attributes_cb.empty:
+            logger.warning(f"[{PAGE_PREFIX}] Base data is empty in callback. Returning empty figure.")
+            empty_fig = create_plotly_ternary_figure(pd.DataFrame(), data_config_cb, plot_layout_config_cb, 0, 1)
+            return empty_fig, "No data available to display."
+
         # 1. Start with the base data (P_X, TotalMentions) and recalculate sizes
-        df_globally_resized = recalculate_bubble_sizes(df_with_base_attributes_closure.copy(), min_s, max_s, scaling_p)
+        df_globally_resized = recalculate_bubble_sizes(df_with_base_attributes_cb.copy(), min_s, max_s, scaling_p)
+        stages.mark('bubble_sizing')
         
         # 2. Generate hover text on this resized DataFrame
         id_c = data_config_cb.get('id_col')
@@ -194,8 +213,8 @@ def register_callbacks(
 
         # 3. Filter by search term
         df_display_subset = df_globally_resized # Start with resized and hover-texted data
-        if search_term and search_term.strip():
-            search_term_lower = search_term.lower().strip()
+        if search_term:
+            search_term_lower = search_term
             label_col_s = data_config_cb.get('label_col')
             id_col_s = data_config_cb.get('id_col')
             
@@ -208,6 +227,7 @@ def register_callbacks(
                 id_matches = df_display_subset[id_col_s].astype(str).str.lower().str.contains(search_term_lower, na=False)
             
             df_display_subset = df_display_subset[label_matches | id_matches]
+        stages.mark('hover_text_and_search')
         
         # 4. Prepare for plotting (ensure essential columns and dropna)
         axis_mapping_local_cb = plot_layout_config_cb.get('axis_mapping', {})
@@ -233,14 +253,15 @@ def register_callbacks(
             df_plot_ready,
             data_config_cb,
             plot_layout_config_cb,
-            global_tm_min_for_color_closure,
-            global_tm_max_for_color_closure
+            data_snapshot.item_plot_global_tm_min,
+            data_snapshot.item_plot_global_tm_max
         )
+        stages.mark('figure_build')
         
-        total_items_in_app = len(df_with_base_attributes_closure) if df_with_base_attributes_closure is not None else 0
+        total_items_in_app = len(df_with_base_attributes_cb) if df_with_base_attributes_cb is not None else 0
         items_in_resized = len(df_globally_resized) if df_globally_resized is not None else 0
         count_text = (f"Displaying {len(df_plot_ready)} of {items_in_resized} items " +
-                      (f"{'matching search ' if search_term and search_term.strip() else ''}") +
+                      (f"{'matching search ' if search_term else ''}") +
                       f"(Total available in app: {total_items_in_app} items).")
         
         logger.debug(f"[{PAGE_PREFIX}] Callback update_ternary_plot complete. Displaying {len(df_plot_ready)} items.")
@@ -0,0 +1,163 @@
+# src/utils/callback_cache.py
+
+import os
+import time
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+
+from src.utils import perf_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def compute_file_data_version(file_path) -> str:
+    """
+    Returns a cheap token that changes whenever the file at file_path changes
+    (modification time and size). Used to key cached callback results on the loaded data.
+    """
+    try:
+        stat_result = os.stat(file_path)
+        return f"{stat_result.st_mtime_ns}-{stat_result.st_size}"
+    except OSError:
+        return "missing"
+
+
+def figure_outputs_to_dict(callback_name: str, outputs) -> tuple:
+    """
+    Converts the figure of a callback's (figure, *other_outputs) to its plain dict form, timed as the
+    callback's 'serialisation' stage. Dash then encodes the dict to JSON as part of the 'request' stage.
+    """
+    started = time.perf_counter()
+    figure, *other_outputs = outputs
+    figure_dict = figure.to_plotly_json() if hasattr(figure, 'to_plotly_json') else figure
+    perf_metrics.observe_duration(callback_name, 'serialisation', time.perf_counter() - started)
+    return (figure_dict, *other_outputs)
+
+
+def _normalise_key_part(value):
+    """Converts a callback input into a hashable, canonical form (lists become tuples, floats are rounded)."""
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise_key_part(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalise_key_part(v)) for k, v in value.items()))
+    return value
+
+
+class CallbackResultCache:
+    """
+    Thread-safe, size-bounded LRU cache for Dash callbacks that return (figure, *other_outputs).
+
+    The figure is stored in its plain dict form (go.Figure.to_plotly_json()), and that same dict
+    is returned on a miss and on every hit. A hit therefore skips the computation, building the
+    go.Figure and converting it to a dict; Dash still encodes the dict to JSON once per response,
+    as it would any output. Entries are evicted least-recently-used first once either max_entries
+    or max_bytes (measured on the pickled entry) is exceeded.
+
+    An optional backing_store (e.g. SqliteDiskCache) is consulted on in-memory misses and
+    written on every put, so a result computed by one gunicorn worker serves the others.
+    Cached dicts are shared between requests and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, backing_store=None):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.backing_store = backing_store
+        self._entries = OrderedDict()  # key -> (figure_dict, other_outputs, n_bytes)
+        self._lock = threading.Lock()
+        self._bytes_held = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._backing_store_hits = 0
+
+    @staticmethod
+    def make_key(namespace: str, data_version, *inputs) -> tuple:
+        """Builds a cache key from a callback name, the data-version token and its normalised inputs."""
+        return (namespace, str(data_version)) + tuple(_normalise_key_part(v) for v in inputs)
+
+    def get(self, key):
+        """Returns (figure_dict, *other_outputs) for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        if entry is None and self.backing_store is not None:
+            stored = self.backing_store.get(self.backing_store.make_key(*key))
+            # Entries are stored pickled once (see put); anything else was written by an older version.
+            if isinstance(stored, bytes):
+                figure_dict, other_outputs = pickle.loads(stored)
+                entry = self._store_in_memory(key, figure_dict, tuple(other_outputs), len(stored))
+                with self._lock:
+                    self._hits += 1
+                    self._backing_store_hits += 1
+        if entry is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        figure_dict, other_outputs, _ = entry
+        return (figure_dict,) + other_outputs
+
+    def put(self, key, figure, *other_outputs):
+        """Stores figure (a go.Figure or its dict form) with the other outputs. Returns the stored figure dict."""
+        figure_dict = figure.to_plotly_json() if hasattr(figure, 'to_plotly_json') else figure
+        # Pickling is far cheaper than plotly's JSON encoding; the pickle sizes the entry and is what the disk cache keeps.
+        payload = pickle.dumps((figure_dict, tuple(other_outputs)), protocol=pickle.HIGHEST_PROTOCOL)
+        self._store_in_memory(key, figure_dict, tuple(other_outputs), len(payload))
+        if self.backing_store is not None:
+            self.backing_store.set(self.backing_store.make_key(*key), payload)
+        return figure_dict
+
+    def _store_in_memory(self, key, figure_dict, other_outputs, n_bytes):
+        entry = (figure_dict, other_outputs, n_bytes)
+        if n_bytes > self.max_bytes:
+            logger.debug(f"Callback result for {key[0]} ({n_bytes} bytes) exceeds the cache size limit; not cached in memory.")
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes_held -= previous[2]
+            self._entries[key] = entry
+            self._bytes_held += n_bytes
+            while len(self._entries) > self.max_entries or self._bytes_held > self.max_bytes:
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes_held -= evicted_bytes
+                self._evictions += 1
+        return entry
+
+    def get_or_compute(self, key, compute_fn):
+        """
+        Returns the cached outputs for key, or calls compute_fn() (which must return
+        (figure, *other_outputs)), caches the result and returns it.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        figure, *other_outputs = compute_fn()
+        figure_dict = self.put(key, figure, *other_outputs)
+        return (figure_dict, *other_outputs)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes_held = 0
+
+    def stats(self) -> dict:
+        """Returns hit/miss counts, hit rate, eviction count, entry count and bytes held."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits / lookups) if lookups else 0.0,
+                'backing_store_hits': self._backing_store_hits,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes_held': self._bytes_held,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,134 @@
+# src/utils/data_snapshot.py
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from src.utils.callback_cache import compute_file_data_version
+
+logger = logging.getLogger(__name__)
+
+
+def compute_database_version(db_path) -> str:
+    """
+    Version token for a SQLite database file that changes on every committed write.
+
+    Combines the mtime/size of the main file and of its -wal file: in WAL mode commits only
+    touch the -wal file until a checkpoint. (PRAGMA data_version is per-connection, so it cannot
+    give a token that is identical across gunicorn workers.)
+    """
+    return f"{compute_file_data_version(db_path)}+{compute_file_data_version(f'{db_path}-wal')}"
+
+
+@dataclass(frozen=True, eq=False)
+class DataSnapshot:
+    """
+    Immutable set of everything the pages read. Callbacks take one reference at the start of a
+    request and use only that, so a reload swapping in a new snapshot never affects an in-flight
+    request, and 'version' can be used in cache keys.
+    """
+    version: str
+    df_item_plot_with_base_attributes: pd.DataFrame = field(default_factory=pd.DataFrame)
+    item_plot_global_tm_min: float = 0.0
+    item_plot_global_tm_max: float = 1.0
+    df_centroid_plot_base_items: pd.DataFrame = field(default_factory=pd.DataFrame)
+    df_country_ngram_weights: pd.DataFrame = field(default_factory=pd.DataFrame)
+    df_country_table_info: pd.DataFrame = field(default_factory=pd.DataFrame)
+    country_dropdown_options: tuple = ()
+    loaded_at: float = field(default_factory=time.time)
+
+
+class DataSnapshotHolder:
+    """Holds the current DataSnapshot. Reads are a single attribute access; swaps are atomic."""
+
+    def __init__(self, snapshot: DataSnapshot):
+        self._snapshot = snapshot
+        self._swap_lock = threading.Lock()
+
+    def get(self) -> DataSnapshot:
+        return self._snapshot
+
+    def swap(self, new_snapshot: DataSnapshot) -> DataSnapshot:
+        """Replaces the current snapshot and returns the previous one."""
+        with self._swap_lock:
+            previous, self._snapshot = self._snapshot, new_snapshot
+        return previous
+
+
+class DataReloader:
+    """
+    Background thread that watches a version token (e.g. compute_database_version) and, when it
+    changes and then stays unchanged for one more poll, rebuilds the data with build_snapshot(version)
+    and swaps it into the holder. A failed rebuild keeps serving the previous snapshot.
+
+    Threads do not survive fork, so ensure_running() must be called from each worker process
+    (app.py does this from a before_request hook); it is cheap when the thread is already alive.
+    """
+
+    def __init__(self, holder: DataSnapshotHolder, version_fn, build_snapshot, interval_seconds: float = 30.0, on_swap=None):
+        self.holder = holder
+        self.version_fn = version_fn
+        self.build_snapshot = build_snapshot
+        self.interval_seconds = float(interval_seconds)
+        self.on_swap = on_swap
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def ensure_running(self):
+        if self.interval_seconds <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="data-reloader", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            logger.info(f"Data reloader started in process {self._pid} (poll every {self.interval_seconds}s).")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        pending_version = None
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                observed_version = self.version_fn()
+            except Exception as e:
+                logger.warning(f"Data reloader could not read the data version: {e}")
+                continue
+            if observed_version == self.holder.get().version:
+                pending_version = None
+                continue
+            if observed_version != pending_version:
+                # Wait one more interval so a rebuild does not start while the DB is still being written.
+                pending_version = observed_version
+                logger.info(f"Data change detected (version {observed_version}); reloading after the next check.")
+                continue
+            self.reload(observed_version)
+            pending_version = None
+
+    def reload(self, version: str) -> bool:
+        """Builds a snapshot for version and swaps it in. Returns True on success."""
+        started = time.perf_counter()
+        try:
+            new_snapshot = self.build_snapshot(version)
+        except Exception as e:
+            logger.error(f"Data reload for version {version} failed; keeping version {self.holder.get().version}: {e}", exc_info=True)
+            return False
+        previous = self.holder.swap(new_snapshot)
+        logger.info(f"Swapped data snapshot {previous.version} -> {new_snapshot.version} in {time.perf_counter() - started:.1f}s.")
+        if self.on_swap is not None:
+            try:
+                self.on_swap(previous, new_snapshot)
+            except Exception as e:
+                logger.warning(f"Data reloader on_swap hook failed: {e}", exc_info=True)
+        return True
@@ -0,0 +1,141 @@
+# src/utils/ngram_frequency_utils.py
+
+import logging
+import argparse
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, create_engine
+
+from src.models.db_models import frequency_distribution_of_ngrams, drop_frequency_distribution_of_ngrams, UserSettings
+from src.utils.data_snapshot import compute_database_version
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_VIEW_NAME = 'FrequencyDistributionOfNgrams'
+
+
+def ensure_frequency_distribution_view(engine):
+    """
+    Makes sure FrequencyDistributionOfNgrams is the window-function version.
+
+    Databases created before the rewrite still hold the correlated-subquery definition
+    (CREATE VIEW IF NOT EXISTS never replaces a view), so it is dropped and recreated.
+
+    Returns:
+        bool: True if the view was (re)created during this call.
+    """
+    with engine.begin() as conn:
+        current_sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = :name"),
+            {'name': FREQUENCY_VIEW_NAME}
+        ).scalar()
+        if current_sql is not None and ' OVER ' in current_sql.upper():
+            return False
+        conn.execute(drop_frequency_distribution_of_ngrams)
+        conn.execute(frequency_distribution_of_ngrams)
+    logger.info(f"(Re)created view '{FREQUENCY_VIEW_NAME}' with window functions.")
+    return True
+
+
+class NgramFrequencyHistogram:
+    """
+    Cumulative histogram of n-gram frequencies (count_all_communities) for interactive cut-off tuning.
+
+    Holds the distinct frequencies in ascending order and, for each, the number of n-grams at or above
+    it, so "how many n-grams survive cut-off k" is one binary search (O(log F) in the number of
+    distinct frequencies) instead of a query.
+    """
+
+    def __init__(self, frequencies, number_of_ngrams):
+        order = np.argsort(np.asarray(frequencies))
+        self.frequencies = np.asarray(frequencies)[order]
+        counts = np.asarray(number_of_ngrams, dtype=np.int64)[order]
+        # at_or_above[i] = n-grams with frequency >= frequencies[i]; one trailing 0 for cut-offs above the maximum.
+        self.at_or_above = np.append(np.cumsum(counts[::-1])[::-1], 0)
+        self.total = int(self.at_or_above[0]) if len(counts) else 0
+
+    @classmethod
+    def from_frame(cls, df_distribution: pd.DataFrame):
+        """From rows of FrequencyDistributionOfNgrams (columns frequency, number_of_ngrams)."""
+        return cls(df_distribution['frequency'].to_numpy(), df_distribution['number_of_ngrams'].to_numpy())
+
+    @classmethod
+    def from_database(cls, engine):
+        df_distribution = pd.read_sql_query(f"SELECT frequency, number_of_ngrams FROM {FREQUENCY_VIEW_NAME}", engine)
+        return cls.from_frame(df_distribution)
+
+    def count_at_or_above(self, cut_off) -> int:
+        """Number of n-grams with frequency >= cut_off. Accepts a scalar or an array of cut-offs."""
+        counts = self.at_or_above[np.searchsorted(self.frequencies, cut_off, side='left')]
+        return int(counts) if np.ndim(counts) == 0 else counts
+
+    def percentage_at_or_above(self, cut_off):
+        """count_at_or_above as a percentage of all n-grams (the view's cumulative_percentage)."""
+        if self.total == 0:
+            return 0.0 if np.ndim(cut_off) == 0 else np.zeros(np.shape(cut_off))
+        return self.count_at_or_above(cut_off) / self.total * 100
+
+    def cut_off_for_count(self, max_ngrams: int):
+        """Smallest integer cut-off that keeps at most max_ngrams n-grams, or None if no n-grams are recorded."""
+        if self.total == 0:
+            return None
+        # at_or_above is non-increasing: binary search on its negation for the first distinct frequency whose
+        # survivors fit; any cut-off above the frequency before it gives the same survivors.
+        index = int(np.searchsorted(-self.at_or_above, -max_ngrams, side='left'))
+        if index == 0:
+            return int(self.frequencies[0])
+        return int(self.frequencies[index - 1]) + 1
+
+
+_histogram_cache = {}
+_histogram_cache_lock = threading.Lock()
+
+
+def get_ngram_frequency_histogram(engine, data_version=None) -> NgramFrequencyHistogram:
+    """
+    Returns the NgramFrequencyHistogram for engine's database, building it at most once per database
+    version. data_version defaults to compute_database_version of the engine's SQLite file, so a
+    rebuilt statistics table is picked up on the next call.
+    """
+    if data_version is None:
+        data_version = compute_database_version(engine.url.database)
+    cache_key = (str(engine.url), data_version)
+    with _histogram_cache_lock:
+        histogram = _histogram_cache.get(cache_key)
+    if histogram is None:
+        histogram = NgramFrequencyHistogram.from_database(engine)
+        with _histogram_cache_lock:
+            # Only the latest version of each database is worth keeping.
+            for stale_key in [key for key in _histogram_cache if key[0] == cache_key[0]]:
+                del _histogram_cache[stale_key]
+            _histogram_cache[cache_key] = histogram
+        logger.info(f"Built n-gram frequency histogram: {histogram.total} n-grams, {len(histogram.frequencies)} distinct frequencies.")
+    return histogram
+
+
+if __name__ == '__main__':
+    # How many n-grams survive each cut-off, e.g.
+    #   python -m src.utils.ngram_frequency_utils --db data/oewg_analysis_dash.db 5 10 20 50
+    parser = argparse.ArgumentParser(description="Number of n-grams surviving frequency cut-offs.")
+    parser.add_argument('--db', type=Path, required=True, help="SQLite analysis database.")
+    parser.add_argument('cut_offs', type=int, nargs='*', help="Cut-offs to evaluate (default: the one in user_settings).")
+    parser.add_argument('--target', type=int, help="Also print the smallest cut-off keeping at most this many n-grams.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    db_engine = create_engine(f"sqlite:///{args.db.resolve()}")
+    ensure_frequency_distribution_view(db_engine)
+    ngram_histogram = get_ngram_frequency_histogram(db_engine)
+    cut_offs = args.cut_offs
+    if not cut_offs:
+        with db_engine.connect() as conn:
+            configured = conn.execute(text(f"SELECT ngram_frequency_cut_off FROM {UserSettings.__tablename__} WHERE id = 1")).scalar()
+        cut_offs = [configured] if configured is not None else []
+    for cut_off in cut_offs:
+        print(f"cut-off {cut_off:>6}: {ngram_histogram.count_at_or_above(cut_off):>8,} of {ngram_histogram.total:,} n-grams "
+              f"({ngram_histogram.percentage_at_or_above(cut_off):.2f}%)")
+    if args.target is not None:
+        print(f"smallest cut-off keeping at most {args.target:,} n-grams: {ngram_histogram.cut_off_for_count(args.target)}")
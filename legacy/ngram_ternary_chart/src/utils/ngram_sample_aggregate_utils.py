@@ -0,0 +1,104 @@
+# src/utils/ngram_sample_aggregate_utils.py
+
+import re
+import logging
+import argparse
+from pathlib import Path
+from contextlib import contextmanager
+
+from sqlalchemy import text, create_engine
+
+from src.models.db_models import (
+    OewgNgramSentenceSampleAggregate,
+    clear_ngram_sentence_sample_aggregate,
+    populate_ngram_sentence_sample_aggregate,
+    create_ngram_sentence_sample_aggregate_triggers,
+    create_vw_lowest_rated_ngrams_for_review,
+    create_vw_ngrams_to_already_matched_topics,
+    drop_vw_lowest_rated_ngrams_for_review,
+    drop_vw_ngrams_to_already_matched_topics,
+)
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_TABLE_NAME = OewgNgramSentenceSampleAggregate.__tablename__
+_TRIGGER_NAME_IN_DDL = re.compile(r'CREATE TRIGGER IF NOT EXISTS (\w+)')
+_REVIEW_VIEWS = (
+    ('vw_lowest_rated_ngrams_for_review', drop_vw_lowest_rated_ngrams_for_review, create_vw_lowest_rated_ngrams_for_review),
+    ('vw_ngrams_to_already_matched_topics', drop_vw_ngrams_to_already_matched_topics, create_vw_ngrams_to_already_matched_topics),
+)
+
+
+def rebuild_ngram_sentence_sample_aggregate(conn):
+    """Refills the aggregate table from oewg_ngram_sentence_samples in one grouped pass (within conn's transaction)."""
+    conn.execute(clear_ngram_sentence_sample_aggregate)
+    conn.execute(populate_ngram_sentence_sample_aggregate)
+    n_ngrams = conn.execute(text(f"SELECT COUNT(*) FROM {AGGREGATE_TABLE_NAME}")).scalar()
+    logger.info(f"Rebuilt '{AGGREGATE_TABLE_NAME}' for {n_ngrams} n-grams.")
+    return n_ngrams
+
+
+def ensure_ngram_sentence_sample_aggregate(engine, force_rebuild=False):
+    """
+    Makes sure the per-n-gram sample sentence aggregate, its sync triggers and the review views that
+    join it are in place.
+
+    On databases created before the aggregate was added, the table and triggers are created, the
+    two review views are recreated (CREATE VIEW IF NOT EXISTS never replaces the old correlated-
+    subquery definitions) and the table is filled in one pass. Later calls are cheap: the triggers
+    keep the table current.
+
+    Returns:
+        bool: True if the aggregate was (re)built during this call.
+    """
+    OewgNgramSentenceSampleAggregate.__table__.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        table_is_empty = conn.execute(text(f"SELECT 1 FROM {AGGREGATE_TABLE_NAME} LIMIT 1")).first() is None
+        for trigger_ddl in create_ngram_sentence_sample_aggregate_triggers:
+            conn.execute(trigger_ddl)
+        for view_name, drop_ddl, create_ddl in _REVIEW_VIEWS:
+            view_sql = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = :name"), {'name': view_name}
+            ).scalar()
+            if view_sql is None or AGGREGATE_TABLE_NAME not in view_sql:
+                conn.execute(drop_ddl)
+                conn.execute(create_ddl)
+                logger.info(f"(Re)created view '{view_name}' on '{AGGREGATE_TABLE_NAME}'.")
+        # An empty table with samples present means it has never been built (an empty samples table
+        # is cheap to "rebuild").
+        if not (force_rebuild or table_is_empty):
+            return False
+        rebuild_ngram_sentence_sample_aggregate(conn)
+    return True
+
+
+@contextmanager
+def sample_aggregate_triggers_suspended(conn):
+    """
+    For bulk loads into oewg_ngram_sentence_samples or speech_sentence: drops the sync triggers (which
+    would recompute an n-gram's aggregate row once per inserted sample), and on exit recreates them
+    and rebuilds the aggregate in one grouped pass. Use inside a transaction, e.g.
+
+        with engine.begin() as conn, sample_aggregate_triggers_suspended(conn):
+            conn.execute(OewgNgramSentenceSamples.__table__.insert(), records)
+    """
+    for trigger_ddl in create_ngram_sentence_sample_aggregate_triggers:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {_TRIGGER_NAME_IN_DDL.search(trigger_ddl.statement).group(1)}"))
+    yield conn
+    for trigger_ddl in create_ngram_sentence_sample_aggregate_triggers:
+        conn.execute(trigger_ddl)
+    rebuild_ngram_sentence_sample_aggregate(conn)
+
+
+if __name__ == '__main__':
+    # Creates or upgrades the aggregate, its triggers and the review views in an existing database, e.g.
+    #   python -m src.utils.ngram_sample_aggregate_utils --db data/oewg_analysis_dash.db
+    parser = argparse.ArgumentParser(description="Create (or rebuild) the per-n-gram sample sentence aggregate.")
+    parser.add_argument('--db', type=Path, required=True, help="SQLite analysis database.")
+    parser.add_argument('--force-rebuild', action='store_true', help="Refill the aggregate even if it is already populated.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    db_engine = create_engine(f"sqlite:///{args.db.resolve()}")
+    rebuilt = ensure_ngram_sentence_sample_aggregate(db_engine, force_rebuild=args.force_rebuild)
+    print(f"'{AGGREGATE_TABLE_NAME}' {'rebuilt' if rebuilt else 'already up to date'}.")
@@ -0,0 +1,153 @@
+# src/utils/perf_metrics.py
+
+import time
+import logging
+import threading
+import functools
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "ngram_ternary"
+
+DURATION_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PAYLOAD_BUCKETS_BYTES = (1_000, 10_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000, 50_000_000)
+
+_enabled = False
+
+
+def configure(enabled: bool):
+    """Turns metric collection on or off for this process. Off by default: every hook is then a no-op."""
+    global _enabled
+    _enabled = bool(enabled)
+    logger.info(f"Performance metrics {'enabled' if _enabled else 'disabled'}.")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _Histogram:
+    """Prometheus-style cumulative histogram, one series per label tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket_counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        bucket_index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bucket_index] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in zip(self.label_names, labels))
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{upper_bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+STAGE_DURATION = _Histogram(
+    f"{METRIC_PREFIX}_stage_duration_seconds",
+    "Time spent in each stage of a callback or data load.",
+    ('callback', 'stage'), DURATION_BUCKETS_SECONDS)
+PAYLOAD_SIZE = _Histogram(
+    f"{METRIC_PREFIX}_payload_bytes",
+    "Size of serialised callback responses.",
+    ('callback',), PAYLOAD_BUCKETS_BYTES)
+
+
+def observe_duration(callback: str, stage: str, seconds: float):
+    if _enabled:
+        STAGE_DURATION.observe((callback, stage), seconds)
+
+
+def observe_payload_bytes(callback: str, n_bytes: int):
+    if _enabled:
+        PAYLOAD_SIZE.observe((callback,), n_bytes)
+
+
+class _StageRecorder:
+    """Records the time since the previous mark (or creation) under the given stage name."""
+    __slots__ = ('callback', '_last')
+
+    def __init__(self, callback: str):
+        self.callback = callback
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        STAGE_DURATION.observe((self.callback, stage), now - self._last)
+        self._last = now
+
+
+class _NullStageRecorder:
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+
+_NULL_STAGE_RECORDER = _NullStageRecorder()
+
+
+def stage_recorder(callback: str):
+    """
+    Returns an object whose mark(stage) records the time elapsed since the previous mark.
+    Lets a long function be split into stages without re-indenting it. When metrics are
+    disabled a shared no-op recorder is returned.
+    """
+    return _StageRecorder(callback) if _enabled else _NULL_STAGE_RECORDER
+
+
+def timed(callback: str, stage: str = 'total'):
+    """Decorator recording the wall time of every call under (callback, stage)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_DURATION.observe((callback, stage), time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def render_prometheus(extra_gauges: dict = None) -> str:
+    """
+    Renders all histograms, plus optional gauges, in the Prometheus text exposition format.
+
+    Args:
+        extra_gauges: Optional mapping of metric name (without prefix) to (help text, value).
+    """
+    lines = STAGE_DURATION.render() + PAYLOAD_SIZE.render()
+    for name, (help_text, value) in (extra_gauges or {}).items():
+        full_name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} gauge")
+        lines.append(f"{full_name} {value}")
+    return "\n".join(lines) + "\n"
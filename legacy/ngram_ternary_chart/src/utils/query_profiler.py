@@ -0,0 +1,212 @@
+# src/utils/query_profiler.py
+
+import re
+import json
+import time
+import logging
+import argparse
+import sqlite3
+from pathlib import Path
+
+from sqlalchemy import event, DDL
+
+logger = logging.getLogger(__name__)
+
+_QUERY_START_TIMES_KEY = 'query_profiler_start_times'
+_EXPLAINABLE_STATEMENT = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_VIEW_NAME_IN_DDL = re.compile(r'CREATE\s+VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?["`\[]?(\w+)', re.IGNORECASE)
+_FULL_TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+_SUBQUERY_RESULT = re.compile(r'^(?:MATERIALIZE|CO-ROUTINE) (\w+)$')
+_TEMP_B_TREE = re.compile(r'^(?:USE TEMP B-TREE FOR (.+)|(\w+(?: ALL)?) USING TEMP B-TREE)$')
+_AUTOMATIC_INDEX = re.compile(r'^SEARCH (\w+)(?: AS \w+)? USING AUTOMATIC ')
+
+
+def explain_query_plan(dbapi_connection, statement: str, parameters=()) -> list:
+    """
+    Runs EXPLAIN QUERY PLAN for statement on a raw sqlite3 connection.
+
+    Returns:
+        List of (id, parent_id, detail) rows, in SQLite's output order.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [(row[0], row[1], row[3]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def format_query_plan(plan_rows: list) -> str:
+    """Indents EXPLAIN QUERY PLAN rows as a tree, like the sqlite3 shell's .eqp output."""
+    depth_by_id = {0: -1}
+    lines = []
+    for node_id, parent_id, detail in plan_rows:
+        depth = depth_by_id.get(parent_id, -1) + 1
+        depth_by_id[node_id] = depth
+        lines.append(f"{'  ' * depth}{detail}")
+    return "\n".join(lines)
+
+
+def classify_query_plan(plan_rows: list) -> dict:
+    """
+    Flags the expensive steps of a query plan.
+
+    Returns:
+        Dict with 'full_scans' (tables read without an index), 'temp_b_trees' (ORDER BY / GROUP BY /
+        DISTINCT / UNION steps done in a temporary B-tree) and 'automatic_indexes' (indexes SQLite had to
+        build on the fly, a sign that a permanent one is missing).
+    """
+    flags = {'full_scans': [], 'temp_b_trees': [], 'automatic_indexes': []}
+    # Reading back a materialised CTE/subquery or a co-routine is not a table scan; the scans
+    # inside it are listed separately. Aliases of CTEs cannot be told apart from table aliases.
+    subquery_results = {match.group(1) for _, _, detail in plan_rows if (match := _SUBQUERY_RESULT.match(detail))}
+    for _, _, detail in plan_rows:
+        if (match := _FULL_TABLE_SCAN.match(detail)) and match.group(1) not in subquery_results | {'CONSTANT'}:
+            flags['full_scans'].append(match.group(1))
+        if match := _TEMP_B_TREE.match(detail):
+            flags['temp_b_trees'].append(match.group(1) or match.group(2))
+        if match := _AUTOMATIC_INDEX.match(detail):
+            flags['automatic_indexes'].append(match.group(1))
+    return flags
+
+
+def install_slow_query_logger(engine, threshold_ms: float, explain: bool = True, max_statement_chars: int = 2000):
+    """
+    Times every statement executed through engine and logs those slower than threshold_ms at WARNING,
+    with their parameters and, for SELECT/WITH statements on SQLite, the EXPLAIN QUERY PLAN output.
+
+    The plan is fetched on the same DBAPI connection right after the statement, bypassing SQLAlchemy,
+    so it does not re-trigger these hooks. executemany() batches are timed but never explained.
+    """
+    explain = explain and engine.dialect.name == 'sqlite'
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_START_TIMES_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get(_QUERY_START_TIMES_KEY)
+        if not start_times:
+            return
+        duration_ms = (time.perf_counter() - start_times.pop()) * 1000.0
+        if duration_ms < threshold_ms:
+            return
+        shown_statement = statement if len(statement) <= max_statement_chars else statement[:max_statement_chars] + " ..."
+        message = f"Slow query ({duration_ms:.1f} ms >= {threshold_ms:g} ms): {shown_statement}"
+        if parameters:
+            message += f"\nParameters: {str(parameters)[:500]}"
+        if explain and not executemany and _EXPLAINABLE_STATEMENT.match(statement):
+            try:
+                plan_rows = explain_query_plan(cursor.connection, statement, parameters)
+                message += f"\nQuery plan:\n{format_query_plan(plan_rows)}"
+            except sqlite3.Error as e:
+                message += f"\nQuery plan unavailable: {e}"
+        logger.warning(message)
+
+    logger.info(f"Slow-query logger installed on {engine.url} (threshold {threshold_ms:g} ms, explain={'on' if explain else 'off'}).")
+
+
+def registered_view_names() -> list:
+    """Names of the views created by the DDL statements registered in src.models.db_models, in file order."""
+    from src.models import db_models
+    names = []
+    for value in vars(db_models).values():
+        if isinstance(value, DDL) and (match := _VIEW_NAME_IN_DDL.search(value.statement)) and match.group(1) not in names:
+            names.append(match.group(1))
+    return names
+
+
+def profile_view(connection: sqlite3.Connection, view_name: str, timeout_seconds: float = 120.0) -> dict:
+    """
+    Explains and fully materialises SELECT * FROM view_name, aborting after timeout_seconds.
+
+    Returns:
+        Dict with the view name, duration_ms, row count, the plan rows, the classify_query_plan flags,
+        and 'error' (None, 'timeout' or the SQLite error message).
+    """
+    statement = f'SELECT * FROM "{view_name}"'
+    result = {'view': view_name, 'duration_ms': None, 'rows': None, 'plan': [], 'error': None}
+    try:
+        result['plan'] = explain_query_plan(connection, statement)
+    except sqlite3.Error as e:
+        result['error'] = str(e)
+        result.update(classify_query_plan([]))
+        return result
+    result.update(classify_query_plan(result['plan']))
+
+    deadline = time.perf_counter() + timeout_seconds
+    connection.set_progress_handler(lambda: 1 if time.perf_counter() > deadline else 0, 10_000)
+    started = time.perf_counter()
+    try:
+        cursor = connection.execute(statement)
+        n_rows = 0
+        while batch := cursor.fetchmany(10_000):
+            n_rows += len(batch)
+        result['rows'] = n_rows
+    except sqlite3.OperationalError as e:
+        result['error'] = 'timeout' if 'interrupted' in str(e) else str(e)
+    finally:
+        result['duration_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+        connection.set_progress_handler(None, 0)
+    return result
+
+
+def profile_views(db_file, view_names=None, timeout_seconds: float = 120.0) -> list:
+    """
+    Profiles each view (default: every registered view) against db_file, opened read-only.
+    Views missing from the database are reported with an error rather than skipped.
+
+    Returns:
+        List of profile_view results, slowest first.
+    """
+    view_names = view_names or registered_view_names()
+    connection = sqlite3.connect(f"file:{Path(db_file).resolve()}?mode=ro", uri=True)
+    try:
+        existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        results = []
+        for view_name in view_names:
+            if view_name not in existing:
+                results.append({'view': view_name, 'duration_ms': None, 'rows': None, 'plan': [], 'error': 'view not in database',
+                                **classify_query_plan([])})
+                continue
+            logger.info(f"Profiling view {view_name} ...")
+            results.append(profile_view(connection, view_name, timeout_seconds))
+    finally:
+        connection.close()
+    return sorted(results, key=lambda r: -1.0 if r['duration_ms'] is None else r['duration_ms'], reverse=True)
+
+
+def format_view_report(results: list, show_plans: bool = False) -> str:
+    lines = [f"{'rank':>4}  {'view':<52}{'ms':>11}{'rows':>11}  flags"]
+    for rank, r in enumerate(results, start=1):
+        flags = [f"FULL SCAN {table}" for table in r['full_scans']]
+        flags += [f"TEMP B-TREE {purpose}" for purpose in r['temp_b_trees']]
+        flags += [f"AUTOMATIC INDEX {table}" for table in r['automatic_indexes']]
+        if r['error']:
+            flags.insert(0, f"ERROR: {r['error']}")
+        duration = f"{r['duration_ms']:.1f}" if r['duration_ms'] is not None else '-'
+        rows = f"{r['rows']:,}" if r['rows'] is not None else '-'
+        lines.append(f"{rank:>4}  {r['view']:<52}{duration:>11}{rows:>11}  {'; '.join(flags)}")
+        if show_plans and r['plan']:
+            lines.extend(f"{'':>8}{line}" for line in format_query_plan(r['plan']).splitlines())
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    # Ranked timing and query-plan report for the database views, e.g.
+    #   python -m src.utils.query_profiler --db data/oewg_analysis_dash.db --show-plans
+    parser = argparse.ArgumentParser(description="Profile every registered view against a database and flag expensive query plans.")
+    parser.add_argument('--db', type=Path, required=True, help="SQLite database to profile (opened read-only).")
+    parser.add_argument('--view', action='append', help="Only profile this view (repeatable). Default: all views registered in db_models.")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Seconds after which a view's query is aborted.")
+    parser.add_argument('--show-plans', action='store_true', help="Print each view's EXPLAIN QUERY PLAN tree under its row.")
+    parser.add_argument('--json', type=Path, help="Also write the results to this file.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    view_results = profile_views(args.db, args.view, args.timeout)
+    print(format_view_report(view_results, args.show_plans))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(view_results, f, indent=2)
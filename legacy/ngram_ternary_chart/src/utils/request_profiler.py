@@ -0,0 +1,217 @@
+# src/utils/request_profiler.py
+
+import os
+import re
+import hmac
+import argparse
+import time
+import uuid
+import pstats
+import hashlib
+import logging
+import cProfile
+import functools
+import threading
+from collections import deque, defaultdict
+
+from flask import request, make_response
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SIGNATURE_HEADER = 'X-Profile-Signature'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+SIGNATURE_MAX_AGE_SECONDS = 300
+PROFILE_ID_PATTERN = re.compile(r'\d{8}T\d{6}-[0-9a-f]{8}')
+
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: int = None) -> str:
+    """
+    Returns a value for the X-Profile-Signature header of one request:
+    '<unix time>.<hex HMAC-SHA256 of "<unix time>:<METHOD>:<path>">'. Binding the method and path
+    means a captured header cannot be replayed against another route.
+    """
+    timestamp = int(time.time()) if timestamp is None else int(timestamp)
+    message = f"{timestamp}:{method.upper()}:{path}"
+    digest = hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{digest}"
+
+
+def verify_profile_signature(secret: str, header_value: str, method: str, path: str,
+                             max_age_seconds: int = SIGNATURE_MAX_AGE_SECONDS) -> bool:
+    """
+    Checks a header produced by sign_profile_request for this method and path (e.g. request.method,
+    request.path). Signatures older than max_age_seconds are rejected.
+    """
+    if not secret or not header_value or '.' not in header_value:
+        return False
+    timestamp_text, _, digest = header_value.partition('.')
+    try:
+        timestamp = int(timestamp_text)
+    except ValueError:
+        return False
+    if abs(time.time() - timestamp) > max_age_seconds:
+        return False
+    expected = sign_profile_request(secret, method, path, timestamp).partition('.')[2]
+    return hmac.compare_digest(expected, digest)
+
+
+def _frame_label(func_key) -> str:
+    filename, line_number, function_name = func_key
+    if filename == '~':  # built-ins, e.g. "<method 'join' of 'str' objects>"
+        return function_name.replace(';', ',')
+    return f"{function_name} ({os.path.basename(filename)}:{line_number})".replace(';', ',')
+
+
+def collapse_profile_stats(profiler: cProfile.Profile, min_seconds: float = 1e-5, max_depth: int = 200) -> str:
+    """
+    Converts a cProfile run into collapsed-stack text ('root;child;leaf <microseconds>' per line),
+    the input format of flamegraph.pl, speedscope and similar tools.
+
+    cProfile only records caller -> callee edges, not whole stacks, so stacks are rebuilt by
+    walking down from the root functions and splitting each function's own time across the
+    paths that reach it in proportion to the cumulative time of each incoming edge. Subtrees
+    worth less than min_seconds on a given path are omitted, as are frames deeper than max_depth.
+    """
+    stats = pstats.Stats(profiler).stats  # func -> (cc, nc, tt, ct, callers{caller: (cc, nc, tt, ct)})
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+    roots = [func for func, entry in stats.items() if not entry[4]]
+
+    collapsed = defaultdict(float)
+
+    def walk(func, path, share):
+        total_time, own_time = stats[func][3], stats[func][2]
+        if own_time * share > 0:
+            collapsed[';'.join(path)] += own_time * share
+        if len(path) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_share = share * min(1.0, edge_time / total_time) if total_time > 0 else 0.0
+            # The number of caller paths grows exponentially in large call graphs; subtrees that
+            # would contribute less than min_seconds in total are dropped.
+            if callee in stats and stats[callee][3] * callee_share >= min_seconds and _frame_label(callee) not in path:
+                walk(callee, path + (_frame_label(callee),), callee_share)
+
+    for root in roots:
+        walk(root, (_frame_label(root),), 1.0)
+    return "\n".join(f"{stack} {round(seconds * 1e6)}" for stack, seconds in collapsed.items() if round(seconds * 1e6) > 0) + "\n"
+
+
+class ProfileRingBuffer:
+    """
+    Keeps the last `capacity` request profiles. Each entry holds the collapsed-stack text and
+    metadata; when output_dir is set, every profile is also written there as
+    profile-<id>.collapsed and deleted again once it drops out of the buffer.
+    """
+
+    def __init__(self, capacity: int = 20, output_dir=None):
+        self.capacity = max(1, int(capacity))
+        self.output_dir = output_dir
+        self._entries = deque()
+        self._lock = threading.Lock()
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def add(self, collapsed_text: str, **metadata) -> str:
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        entry = dict(metadata, id=profile_id, created_at=time.time(), collapsed=collapsed_text)
+        if self.output_dir:
+            entry['file'] = os.path.join(self.output_dir, f"profile-{profile_id}.collapsed")
+            with open(entry['file'], 'w', encoding='utf-8') as f:
+                f.write(collapsed_text)
+        with self._lock:
+            self._entries.append(entry)
+            evicted = [self._entries.popleft() for _ in range(len(self._entries) - self.capacity)]
+        for old_entry in evicted:
+            if old_entry.get('file'):
+                try:
+                    os.remove(old_entry['file'])
+                except OSError:
+                    pass
+        return profile_id
+
+    def list(self) -> list:
+        """Metadata of the buffered profiles, newest first (without the stack text)."""
+        with self._lock:
+            return [{k: v for k, v in entry.items() if k != 'collapsed'} for entry in reversed(self._entries)]
+
+    def get(self, profile_id: str):
+        """
+        Returns the entry for profile_id. Profiles recorded by other worker processes are not in
+        this buffer, but are still found in output_dir when one is shared between workers.
+        """
+        with self._lock:
+            for entry in self._entries:
+                if entry['id'] == profile_id:
+                    return entry
+        if self.output_dir and PROFILE_ID_PATTERN.fullmatch(profile_id or ''):
+            file_path = os.path.join(self.output_dir, f"profile-{profile_id}.collapsed")
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    return {'id': profile_id, 'file': file_path, 'collapsed': f.read()}
+            except OSError:
+                pass
+        return None
+
+
+def install_request_profiler(server, endpoint: str, profile_buffer: ProfileRingBuffer, profile_all: bool = False, signing_secret: str = None):
+    """
+    Wraps the Flask view registered under endpoint (e.g. Dash's '/_dash-update-component') so that
+    selected requests run under cProfile and their collapsed stacks land in profile_buffer.
+
+    A request is profiled when profile_all is set, or when it carries a valid X-Profile-Signature
+    header for signing_secret. Profiled responses get an X-Profile-Id header naming the entry.
+    Only one request is profiled at a time (cProfile cannot run concurrently on Python 3.12+);
+    others arriving meanwhile are served unprofiled. With background callbacks the profile only
+    covers job submission and polling, not the computation in the job process.
+    """
+    original_view = server.view_functions[endpoint]
+    profiling_lock = threading.Lock()
+
+    @functools.wraps(original_view)
+    def profiled_view(*args, **kwargs):
+        wanted = profile_all or verify_profile_signature(signing_secret, request.headers.get(PROFILE_SIGNATURE_HEADER),
+                                                         request.method, request.path)
+        if not wanted or not profiling_lock.acquire(blocking=False):
+            return original_view(*args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                response = make_response(original_view(*args, **kwargs))
+            finally:
+                profiler.disable()
+            duration_seconds = time.perf_counter() - started
+        finally:
+            profiling_lock.release()
+        payload = request.get_json(silent=True) or {}
+        profile_id = profile_buffer.add(
+            collapse_profile_stats(profiler),
+            callback_output=str(payload.get('output', '')),
+            path=request.path,
+            duration_seconds=round(duration_seconds, 6),
+            pid=os.getpid()
+        )
+        response.headers[PROFILE_ID_HEADER] = profile_id
+        logger.info(f"Profiled {request.path} ({payload.get('output', '')}) in {duration_seconds:.3f}s as {profile_id}.")
+        return response
+
+    server.view_functions[endpoint] = profiled_view
+    logger.info(f"Request profiler installed on {endpoint} (profile_all={profile_all}, signed requests={'on' if signing_secret else 'off'}).")
+
+
+if __name__ == '__main__':
+    # Prints a header value for one request to the given path (valid for SIGNATURE_MAX_AGE_SECONDS), e.g.
+    #   curl -H "X-Profile-Signature: $(python -m src.utils.request_profiler /_dash-update-component)" ...
+    #   curl -H "X-Profile-Signature: $(python -m src.utils.request_profiler --method GET /_admin/profiles)" ...
+    parser = argparse.ArgumentParser(description="Sign a request for on-demand profiling or the profile admin routes.")
+    parser.add_argument('path', help="Request path including URL_BASE_PATHNAME, e.g. /_dash-update-component.")
+    parser.add_argument('--method', default='POST', help="HTTP method of the request (default: POST).")
+    args = parser.parse_args()
+    secret = os.environ.get('PROFILE_SIGNING_SECRET')
+    if not secret:
+        raise SystemExit("Set PROFILE_SIGNING_SECRET to the value configured on the server.")
+    print(sign_profile_request(secret, args.method, args.path))
@@ -0,0 +1,197 @@
+# src/utils/sentence_dedup_utils.py
+
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from src.models.db_models import SpeechSentenceDuplicateCluster, create_vw_ngram_sentence_samples_distinct
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 31) - 1)
+
+DEFAULT_SHINGLE_SIZE = 3
+DEFAULT_NUM_BANDS = 16
+DEFAULT_ROWS_PER_BAND = 4
+DEFAULT_SIMILARITY_THRESHOLD = 0.7
+
+
+def _sentence_shingle_hashes(sentence_text, shingle_size):
+    """Hashes the word k-shingles of one sentence. Short sentences become a single shingle."""
+    tokens = str(sentence_text or '').lower().split()
+    if len(tokens) <= shingle_size:
+        shingles = [' '.join(tokens)]
+    else:
+        shingles = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    return [zlib.crc32(s.encode('utf-8')) for s in set(shingles)]
+
+
+def compute_minhash_signatures(sentences, num_perm=DEFAULT_NUM_BANDS * DEFAULT_ROWS_PER_BAND,
+                               shingle_size=DEFAULT_SHINGLE_SIZE, seed=42):
+    """
+    Computes MinHash signatures for a list of sentences.
+
+    All shingle hashes are flattened into one array, so each of the num_perm hash functions
+    is a single vectorised pass followed by a per-sentence minimum (np.minimum.reduceat).
+    Cost is linear in the total number of shingles.
+
+    Args:
+        sentences: Iterable of sentence strings (typically sentence_cleaned).
+        num_perm: Number of hash functions (signature length).
+        shingle_size: Words per shingle.
+        seed: Seed for the random hash function coefficients.
+
+    Returns:
+        numpy.ndarray of shape (len(sentences), num_perm), dtype uint32.
+    """
+    per_sentence = [_sentence_shingle_hashes(s, shingle_size) for s in sentences]
+    if not per_sentence:
+        return np.zeros((0, num_perm), dtype=np.uint32)
+    lengths = np.fromiter((len(h) for h in per_sentence), dtype=np.int64, count=len(per_sentence))
+    offsets = np.zeros(len(per_sentence), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    shingle_hashes = np.fromiter((h for hashes in per_sentence for h in hashes), dtype=np.uint64,
+                                 count=int(lengths.sum())) % _MERSENNE_PRIME
+
+    rng = np.random.default_rng(seed)
+    coeff_a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    coeff_b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(per_sentence), num_perm), dtype=np.uint32)
+    for perm in range(num_perm):
+        permuted = (coeff_a[perm] * shingle_hashes + coeff_b[perm]) % _MERSENNE_PRIME
+        signatures[:, perm] = np.minimum.reduceat(permuted & _MAX_HASH, offsets)
+    return signatures
+
+
+def _find_root(parent, node):
+    root = node
+    while parent[root] != root:
+        root = parent[root]
+    while parent[node] != root:  # path compression
+        parent[node], node = root, parent[node]
+    return root
+
+
+def cluster_near_duplicates(signatures, num_bands=DEFAULT_NUM_BANDS, rows_per_band=DEFAULT_ROWS_PER_BAND,
+                            similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """
+    Groups rows with similar MinHash signatures using banded LSH, without pairwise comparison.
+
+    Each band's rows are bucketed by their exact values. Within a bucket, every member is
+    checked once against the bucket's first member (estimated Jaccard = share of equal
+    signature values) and joined to it with union-find if it reaches similarity_threshold.
+    The check stops unrelated sentences that collide in one band from being chained together.
+
+    Args:
+        signatures: Array (n_rows, num_bands * rows_per_band) from compute_minhash_signatures.
+        num_bands, rows_per_band: LSH banding. More bands catch lower similarities.
+        similarity_threshold: Minimum estimated Jaccard similarity to merge two rows.
+
+    Returns:
+        numpy.ndarray of length n_rows: the row index of each row's cluster representative.
+    """
+    n_rows = signatures.shape[0]
+    if signatures.shape[1] < num_bands * rows_per_band:
+        raise ValueError(f"Signatures have {signatures.shape[1]} values, need {num_bands * rows_per_band} for {num_bands} bands x {rows_per_band} rows.")
+    parent = list(range(n_rows))
+
+    for band in range(num_bands):
+        band_values = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        band_keys = band_values.view(np.dtype((np.void, band_values.dtype.itemsize * rows_per_band))).ravel()
+        _, bucket_of_row, bucket_sizes = np.unique(band_keys, return_inverse=True, return_counts=True)
+        shared_rows = np.flatnonzero(bucket_sizes[bucket_of_row] > 1)
+        if len(shared_rows) == 0:
+            continue
+        # Sort shared rows by bucket so each bucket is a contiguous run; its first row is the representative.
+        shared_rows = shared_rows[np.argsort(bucket_of_row[shared_rows], kind='stable')]
+        shared_buckets = bucket_of_row[shared_rows]
+        run_starts = np.flatnonzero(np.r_[True, shared_buckets[1:] != shared_buckets[:-1]])
+        representatives = np.repeat(shared_rows[run_starts], np.diff(np.r_[run_starts, len(shared_rows)]))
+
+        similarity = (signatures[shared_rows] == signatures[representatives]).mean(axis=1)
+        for row, representative in zip(shared_rows[similarity >= similarity_threshold].tolist(),
+                                       representatives[similarity >= similarity_threshold].tolist()):
+            if row == representative:
+                continue
+            root_a, root_b = _find_root(parent, row), _find_root(parent, representative)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    return np.fromiter((_find_root(parent, i) for i in range(n_rows)), dtype=np.int64, count=n_rows)
+
+
+def find_near_duplicate_sentence_clusters(df_sentences, text_col='sentence_cleaned', id_col='sentence_id',
+                                          num_bands=DEFAULT_NUM_BANDS, rows_per_band=DEFAULT_ROWS_PER_BAND,
+                                          similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD,
+                                          shingle_size=DEFAULT_SHINGLE_SIZE):
+    """
+    Assigns a near-duplicate cluster to every sentence.
+
+    Args:
+        df_sentences: DataFrame with sentence ids and text.
+        text_col: Column holding the text to compare.
+        id_col: Column holding the sentence id.
+        num_bands, rows_per_band, similarity_threshold, shingle_size: See
+            cluster_near_duplicates and compute_minhash_signatures.
+
+    Returns:
+        DataFrame with 'sentence_id', 'cluster_id' (lowest sentence id in the cluster) and
+        'cluster_size', one row per input sentence.
+    """
+    if df_sentences is None or df_sentences.empty:
+        return pd.DataFrame(columns=['sentence_id', 'cluster_id', 'cluster_size'])
+
+    logger.info(f"Computing MinHash signatures for {len(df_sentences)} sentences...")
+    # Sentences without words stay singletons: NULL (read by pandas as NaN, which would be shingled
+    # as "nan") and empty or blank text would otherwise all share one signature and form one cluster.
+    texts = df_sentences[text_col]
+    has_text = (texts.notna() & texts.astype(str).str.strip().ne('')).to_numpy()
+    text_rows = np.flatnonzero(has_text)
+    signatures = compute_minhash_signatures(df_sentences[text_col].to_numpy()[text_rows].tolist(), num_bands * rows_per_band, shingle_size)
+    representative_rows = np.arange(len(df_sentences))
+    representative_rows[text_rows] = text_rows[cluster_near_duplicates(signatures, num_bands, rows_per_band, similarity_threshold)]
+
+    df_clusters = pd.DataFrame({
+        'sentence_id': df_sentences[id_col].to_numpy(),
+        '_representative_row': representative_rows,
+    })
+    df_clusters['cluster_id'] = df_clusters.groupby('_representative_row')['sentence_id'].transform('min')
+    df_clusters['cluster_size'] = df_clusters.groupby('_representative_row')['sentence_id'].transform('size')
+    df_clusters.drop(columns=['_representative_row'], inplace=True)
+
+    n_duplicate_clusters = df_clusters.loc[df_clusters['cluster_size'] > 1, 'cluster_id'].nunique()
+    n_in_clusters = int((df_clusters['cluster_size'] > 1).sum())
+    logger.info(f"Found {n_duplicate_clusters} near-duplicate clusters covering {n_in_clusters} sentences.")
+    return df_clusters
+
+
+def persist_duplicate_clusters(engine, df_clusters):
+    """Replaces the contents of speech_sentence_duplicate_cluster with df_clusters."""
+    table = SpeechSentenceDuplicateCluster.__table__
+    table.create(engine, checkfirst=True)
+    records = df_clusters[['sentence_id', 'cluster_id', 'cluster_size']].astype(int).to_dict('records')
+    with engine.begin() as conn:
+        conn.execute(create_vw_ngram_sentence_samples_distinct)
+        conn.execute(table.delete())
+        if records:
+            conn.execute(table.insert(), records)
+    logger.info(f"Stored duplicate clusters for {len(records)} sentences in '{table.name}'.")
+
+
+def update_sentence_duplicate_clusters(engine, **cluster_kwargs):
+    """Recomputes near-duplicate clusters over all of speech_sentence and stores them."""
+    with engine.connect() as conn:
+        df_sentences = pd.read_sql_query(
+            text("SELECT id AS sentence_id, sentence_cleaned FROM speech_sentence ORDER BY id"), conn)
+    df_clusters = find_near_duplicate_sentence_clusters(df_sentences, **cluster_kwargs)
+    persist_duplicate_clusters(engine, df_clusters)
+    return df_clusters
+
+
+if __name__ == "__main__":
+    from src.models.db_models import engine as default_engine
+    update_sentence_duplicate_clusters(default_engine)
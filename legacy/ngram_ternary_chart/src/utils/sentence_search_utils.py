@@ -0,0 +1,197 @@
+# src/utils/sentence_search_utils.py
+
+import re
+import logging
+import pandas as pd
+from sqlalchemy import text
+
+from src.models.db_models import (
+    create_speech_sentence_fts,
+    create_speech_sentence_fts_insert_trigger,
+    create_speech_sentence_fts_delete_trigger,
+    create_speech_sentence_fts_update_trigger,
+    configure_speech_sentence_fts_rank,
+)
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE_NAME = 'speech_sentence_fts'
+DUPLICATE_OVERFETCH_FACTOR = 4
+
+# Quoted phrases are kept together, everything else is split into word tokens.
+_QUERY_PART_PATTERN = re.compile(r'"([^"]+)"|(\w+)', re.UNICODE)
+
+
+def ensure_sentence_fts_index(engine, force_rebuild=False):
+    """
+    Makes sure the FTS5 index over speech_sentence exists and is populated.
+
+    On databases created before the index was added, the virtual table and its sync
+    triggers are created and the index is built in one bulk 'rebuild' pass. Later calls
+    are cheap: the triggers keep the index in step with speech_sentence.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine bound to the analysis SQLite database.
+        force_rebuild (bool): Rebuild the index from speech_sentence even if it already exists.
+
+    Returns:
+        bool: True if the index was (re)built during this call, False if it was already in place.
+    """
+    with engine.begin() as conn:
+        already_exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE_NAME}
+        ).first() is not None
+
+        conn.execute(create_speech_sentence_fts)
+        for trigger_ddl in (create_speech_sentence_fts_insert_trigger,
+                            create_speech_sentence_fts_delete_trigger,
+                            create_speech_sentence_fts_update_trigger):
+            conn.execute(trigger_ddl)
+
+        if already_exists and not force_rebuild:
+            return False
+
+        logger.info(f"Building '{FTS_TABLE_NAME}' from speech_sentence (bulk rebuild)...")
+        conn.execute(configure_speech_sentence_fts_rank)
+        conn.execute(text(f"INSERT INTO {FTS_TABLE_NAME}({FTS_TABLE_NAME}) VALUES ('rebuild')"))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE_NAME}({FTS_TABLE_NAME}) VALUES ('optimize')"))
+    logger.info(f"Finished building '{FTS_TABLE_NAME}'.")
+    return True
+
+
+def build_fts_match_query(search_text, prefix_last_term=True):
+    """
+    Turns free text typed by a user into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted term (so FTS5 operators and punctuation in the input cannot
+    cause syntax errors) and all terms are ANDed. Text in double quotes is kept as a phrase.
+    The last bare word gets a prefix wildcard so that search-as-you-type works.
+
+    Args:
+        search_text (str): Raw user input.
+        prefix_last_term (bool): Add '*' to the last bare word. Defaults to True.
+
+    Returns:
+        str: MATCH expression, or an empty string if the input has no searchable words.
+    """
+    if not search_text:
+        return ""
+
+    parts = []
+    last_is_bare_word = False
+    for match in _QUERY_PART_PATTERN.finditer(search_text):
+        phrase, word = match.group(1), match.group(2)
+        if phrase is not None:
+            words_in_phrase = re.findall(r'\w+', phrase, re.UNICODE)
+            if words_in_phrase:
+                parts.append('"' + ' '.join(words_in_phrase) + '"')
+                last_is_bare_word = False
+        else:
+            parts.append(f'"{word}"')
+            last_is_bare_word = True
+
+    if prefix_last_term and last_is_bare_word:
+        parts[-1] = parts[-1] + '*'
+    return ' '.join(parts)
+
+
+def search_sentences(
+    engine,
+    search_text: str,
+    limit: int = 20,
+    speakers: list = None,
+    session_numbers: list = None,
+    snippet_tokens: int = 12,
+    highlight_open: str = '<mark>',
+    highlight_close: str = '</mark>',
+    prefix_last_term: bool = True,
+    collapse_duplicates: bool = False
+) -> pd.DataFrame:
+    """
+    BM25-ranked full-text search over speech_sentence, joined to the intervention it came from.
+
+    Args:
+        engine: SQLAlchemy engine for the analysis database. The FTS index must exist
+                (see ensure_sentence_fts_index).
+        search_text: Free text entered by the user.
+        limit: Maximum number of results.
+        speakers: Optional list of intervention.speaker values to restrict to.
+        session_numbers: Optional list of intervention.session_number values to restrict to.
+        snippet_tokens: Maximum number of tokens in each highlighted snippet.
+        highlight_open, highlight_close: Markup placed around matched terms in 'snippet'.
+        prefix_last_term: Treat the last word as a prefix (search-as-you-type).
+        collapse_duplicates: Return only the best-ranked sentence of each near-duplicate
+                             cluster (requires speech_sentence_duplicate_cluster, see
+                             sentence_dedup_utils.update_sentence_duplicate_clusters).
+
+    Returns:
+        DataFrame with columns 'sentence_id', 'intervention_id', 'speaker', 'meeting',
+        'session_number', 'sentence_full', 'snippet', 'bm25_score', best match first.
+        Lower (more negative) 'bm25_score' is a better match, as returned by SQLite.
+    """
+    result_columns = ['sentence_id', 'intervention_id', 'speaker', 'meeting',
+                      'session_number', 'sentence_full', 'snippet', 'bm25_score']
+
+    match_expression = build_fts_match_query(search_text, prefix_last_term=prefix_last_term)
+    if not match_expression:
+        return pd.DataFrame(columns=result_columns)
+
+    params = {
+        'match_expression': match_expression,
+        'highlight_open': highlight_open,
+        'highlight_close': highlight_close,
+        'snippet_tokens': int(snippet_tokens),
+        # Over-fetch when collapsing so that dropping duplicates still leaves `limit` rows in most cases.
+        'limit': int(limit) * (DUPLICATE_OVERFETCH_FACTOR if collapse_duplicates else 1),
+    }
+    filter_clauses = []
+    if speakers:
+        placeholders = []
+        for i, speaker in enumerate(speakers):
+            params[f'speaker_{i}'] = speaker
+            placeholders.append(f':speaker_{i}')
+        filter_clauses.append(f"AND i.speaker IN ({', '.join(placeholders)})")
+    if session_numbers:
+        placeholders = []
+        for i, session_number in enumerate(session_numbers):
+            params[f'session_{i}'] = int(session_number)
+            placeholders.append(f':session_{i}')
+        filter_clauses.append(f"AND i.session_number IN ({', '.join(placeholders)})")
+
+    sql_query = f"""
+    SELECT
+        ss.id AS sentence_id,
+        ss.intervention_id,
+        i.speaker,
+        i.meeting,
+        i.session_number,
+        ss.sentence_full,
+        snippet({FTS_TABLE_NAME}, 0, :highlight_open, :highlight_close, '…', :snippet_tokens) AS snippet,
+        {FTS_TABLE_NAME}.rank AS bm25_score
+        {', COALESCE(dc.cluster_id, ss.id) AS duplicate_cluster_id' if collapse_duplicates else ''}
+    FROM {FTS_TABLE_NAME}
+    JOIN speech_sentence ss ON ss.id = {FTS_TABLE_NAME}.rowid
+    JOIN intervention i ON i.id = ss.intervention_id
+    {'LEFT JOIN speech_sentence_duplicate_cluster dc ON dc.sentence_id = ss.id' if collapse_duplicates else ''}
+    WHERE {FTS_TABLE_NAME} MATCH :match_expression
+    {' '.join(filter_clauses)}
+    ORDER BY {FTS_TABLE_NAME}.rank
+    LIMIT :limit
+    """
+
+    try:
+        with engine.connect() as conn:
+            df = pd.read_sql_query(text(sql_query), conn, params=params)
+    except Exception as e:
+        logger.error(f"Full-text search failed for '{search_text}' (MATCH {match_expression!r}): {e}", exc_info=True)
+        return pd.DataFrame(columns=result_columns)
+
+    if collapse_duplicates:
+        df = (df.drop_duplicates(subset=['duplicate_cluster_id'], keep='first')
+                .drop(columns=['duplicate_cluster_id'])
+                .head(int(limit))
+                .reset_index(drop=True))
+
+    logger.debug(f"Full-text search '{search_text}' returned {len(df)} rows.")
+    return df
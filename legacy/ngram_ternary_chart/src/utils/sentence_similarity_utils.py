@@ -0,0 +1,460 @@
+# src/utils/sentence_similarity_utils.py
+
+import os
+import re
+import json
+import shutil
+import logging
+import argparse
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, create_engine
+
+from src.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Words of 2+ characters; sentence_cleaned is already lower-cased and stop-word filtered.
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9']+")
+
+INDEX_FORMAT_VERSION = 1
+MAX_SEGMENTS_BEFORE_MERGE = 8
+SEGMENT_ARRAY_NAMES = ('indptr', 'indices', 'data', 'sentence_ids', 'speaker_codes', 'session_numbers')
+
+
+def tokenize_for_tfidf(sentence_text):
+    """Splits a (cleaned) sentence into lower-case word tokens."""
+    if not sentence_text:
+        return []
+    return _TOKEN_PATTERN.findall(str(sentence_text).lower())
+
+
+def _atomic_save_npy(path, array):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as fh:
+        np.save(fh, array)
+    os.replace(tmp_path, path)
+
+
+def _atomic_save_json(path, payload):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(payload, fh)
+    os.replace(tmp_path, path)
+
+
+class SentenceTfidfIndex:
+    """
+    Sparse TF-IDF index over speech_sentence.sentence_cleaned for "more like this" queries.
+
+    The index is a list of immutable segments, each holding the postings of a block of
+    sentences as a term-major CSR matrix (indptr/indices/data, one row per term, columns are
+    the segment's sentences, values are sublinear term frequencies 1 + log(tf)). Segments are
+    written once as .npy files and memory-mapped read-only, so several processes can share
+    them through the page cache. New interventions are added as a new segment; segments are
+    merged once there are more than MAX_SEGMENTS_BEFORE_MERGE of them.
+
+    IDF weights and per-sentence vector norms are kept outside the segments and recomputed
+    after every update, so scores always reflect the whole corpus. A query is a sparse dot
+    product between the query vector and the postings of its terms, followed by an
+    argpartition top-k. Speaker and session filters are boolean row masks, built once per
+    value and cached.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        self.vocabulary = {}
+        self.terms = []
+        self.speakers = []
+        self._speaker_codes_by_name = {}
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self.segments = []
+        self.segment_names = []
+        self.last_sentence_id = 0
+        self._reset_document_arrays()
+
+    # --- Document-level arrays (concatenated over segments) ---
+
+    def _reset_document_arrays(self):
+        self.sentence_ids = np.zeros(0, dtype=np.int64)
+        self.speaker_codes = np.zeros(0, dtype=np.int32)
+        self.session_numbers = np.zeros(0, dtype=np.int32)
+        self.doc_norms = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+        self._segment_offsets = []
+        self._mask_cache = {}
+
+    @property
+    def n_docs(self):
+        return len(self.sentence_ids)
+
+    def _refresh_document_arrays(self):
+        self._segment_offsets = []
+        offset = 0
+        for segment in self.segments:
+            self._segment_offsets.append(offset)
+            offset += len(segment['sentence_ids'])
+        if self.segments:
+            self.sentence_ids = np.concatenate([s['sentence_ids'] for s in self.segments])
+            self.speaker_codes = np.concatenate([s['speaker_codes'] for s in self.segments])
+            self.session_numbers = np.concatenate([s['session_numbers'] for s in self.segments])
+        self._mask_cache = {}
+
+    def _recompute_weights(self):
+        """Recomputes smoothed IDF and the L2 norm of every sentence's TF-IDF vector."""
+        n_docs = self.n_docs
+        self.idf = (np.log((1.0 + n_docs) / (1.0 + self.document_frequency)) + 1.0).astype(np.float32)
+        norms_squared = []
+        for segment in self.segments:
+            indptr = np.asarray(segment['indptr'])
+            term_of_entry = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+            weights = np.asarray(segment['data'], dtype=np.float32) * self.idf[term_of_entry]
+            norms_squared.append(np.bincount(segment['indices'], weights=weights * weights,
+                                             minlength=len(segment['sentence_ids'])))
+        self.doc_norms = (np.sqrt(np.concatenate(norms_squared)).astype(np.float32)
+                          if norms_squared else np.zeros(0, dtype=np.float32))
+
+    # --- Building ---
+
+    def _speaker_code(self, speaker):
+        speaker = speaker if speaker is not None else ''
+        code = self._speaker_codes_by_name.get(speaker)
+        if code is None:
+            code = len(self.speakers)
+            self.speakers.append(speaker)
+            self._speaker_codes_by_name[speaker] = code
+        return code
+
+    def _build_segment_arrays(self, df_sentences):
+        """Tokenises a block of sentences into a term-major CSR segment. Extends the vocabulary."""
+        entry_terms, entry_docs, entry_values = [], [], []
+        for local_doc, sentence_text in enumerate(df_sentences['sentence_cleaned'].tolist()):
+            for term, count in Counter(tokenize_for_tfidf(sentence_text)).items():
+                term_id = self.vocabulary.get(term)
+                if term_id is None:
+                    term_id = len(self.terms)
+                    self.vocabulary[term] = term_id
+                    self.terms.append(term)
+                entry_terms.append(term_id)
+                entry_docs.append(local_doc)
+                entry_values.append(1.0 + np.log(count))
+
+        n_terms = len(self.terms)
+        entry_terms = np.asarray(entry_terms, dtype=np.int64)
+        entry_docs = np.asarray(entry_docs, dtype=np.int32)
+        entry_values = np.asarray(entry_values, dtype=np.float32)
+
+        order = np.lexsort((entry_docs, entry_terms))
+        postings_per_term = np.bincount(entry_terms, minlength=n_terms)
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(postings_per_term, out=indptr[1:])
+
+        if len(self.document_frequency) < n_terms:
+            self.document_frequency = np.concatenate([
+                self.document_frequency,
+                np.zeros(n_terms - len(self.document_frequency), dtype=np.int64)
+            ])
+        self.document_frequency += postings_per_term  # each (term, doc) pair appears once
+
+        session_numbers = pd.to_numeric(df_sentences['session_number'], errors='coerce').fillna(-1).astype(np.int32)
+        return {
+            'indptr': indptr,
+            'indices': entry_docs[order],
+            'data': entry_values[order],
+            'sentence_ids': df_sentences['sentence_id'].to_numpy(dtype=np.int64),
+            'speaker_codes': np.asarray([self._speaker_code(s) for s in df_sentences['speaker'].tolist()], dtype=np.int32),
+            'session_numbers': session_numbers.to_numpy(),
+        }
+
+    def _merge_segments(self, segments):
+        """Merges several segments into one term-major CSR segment."""
+        n_terms = len(self.terms)
+        entry_terms, entry_docs, entry_values = [], [], []
+        doc_offset = 0
+        for segment in segments:
+            indptr = np.asarray(segment['indptr'])
+            entry_terms.append(np.repeat(np.arange(len(indptr) - 1), np.diff(indptr)))
+            entry_docs.append(np.asarray(segment['indices'], dtype=np.int32) + doc_offset)
+            entry_values.append(np.asarray(segment['data']))
+            doc_offset += len(segment['sentence_ids'])
+        entry_terms = np.concatenate(entry_terms)
+        entry_docs = np.concatenate(entry_docs)
+        entry_values = np.concatenate(entry_values)
+
+        order = np.lexsort((entry_docs, entry_terms))
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(entry_terms, minlength=n_terms), out=indptr[1:])
+        return {
+            'indptr': indptr,
+            'indices': entry_docs[order],
+            'data': entry_values[order],
+            'sentence_ids': np.concatenate([np.asarray(s['sentence_ids']) for s in segments]),
+            'speaker_codes': np.concatenate([np.asarray(s['speaker_codes']) for s in segments]),
+            'session_numbers': np.concatenate([np.asarray(s['session_numbers']) for s in segments]),
+        }
+
+    def add_sentences(self, df_sentences):
+        """
+        Adds a block of sentences to the index as a new segment and saves it.
+
+        Args:
+            df_sentences: DataFrame with 'sentence_id', 'sentence_cleaned', 'speaker' and
+                          'session_number' columns. Sentence IDs must be higher than any
+                          already indexed (see update_from_database).
+
+        Returns:
+            int: Number of sentences added.
+        """
+        if df_sentences is None or df_sentences.empty:
+            return 0
+        df_sentences = df_sentences.sort_values('sentence_id')
+        new_segment = self._build_segment_arrays(df_sentences)
+        segment_name = self._next_segment_name()
+        self._write_segment(segment_name, new_segment)
+        self.segments.append(self._open_segment(segment_name))
+        self.segment_names.append(segment_name)
+        self.last_sentence_id = max(self.last_sentence_id, int(new_segment['sentence_ids'].max()))
+
+        if len(self.segments) > MAX_SEGMENTS_BEFORE_MERGE:
+            self._compact()
+
+        self._refresh_document_arrays()
+        self._recompute_weights()
+        self._save_metadata()
+        logger.info(f"Added {len(df_sentences)} sentences to TF-IDF index ({self.n_docs} total, {len(self.terms)} terms, {len(self.segments)} segments).")
+        return len(df_sentences)
+
+    def _compact(self):
+        merged_name = self._next_segment_name()
+        logger.info(f"Merging {len(self.segments)} TF-IDF segments into '{merged_name}'.")
+        self._write_segment(merged_name, self._merge_segments(self.segments))
+        old_names = self.segment_names
+        self.segments = [self._open_segment(merged_name)]
+        self.segment_names = [merged_name]
+        self._save_metadata()
+        for name in old_names:
+            shutil.rmtree(self.index_dir / name, ignore_errors=True)
+
+    def update_from_database(self, engine, fetch_size=50000):
+        """
+        Indexes sentences added to speech_sentence since the last update.
+
+        Args:
+            engine: SQLAlchemy engine for the analysis database.
+            fetch_size: Sentences per segment when a large backlog is indexed.
+
+        Returns:
+            int: Number of sentences added.
+        """
+        sql_query = text("""
+            SELECT ss.id AS sentence_id, ss.sentence_cleaned, i.speaker, i.session_number
+            FROM speech_sentence ss
+            JOIN intervention i ON i.id = ss.intervention_id
+            WHERE ss.id > :last_sentence_id
+            ORDER BY ss.id
+            LIMIT :fetch_size
+        """)
+        total_added = 0
+        while True:
+            with engine.connect() as conn:
+                df_new = pd.read_sql_query(sql_query, conn, params={'last_sentence_id': self.last_sentence_id, 'fetch_size': fetch_size})
+            if df_new.empty:
+                break
+            total_added += self.add_sentences(df_new)
+            if len(df_new) < fetch_size:
+                break
+        if total_added == 0:
+            logger.info("TF-IDF index is up to date.")
+        return total_added
+
+    # --- Persistence ---
+
+    def _next_segment_name(self):
+        next_number = int(self.segment_names[-1].split('_')[1]) + 1 if self.segment_names else 0
+        return f"seg_{next_number:06d}"
+
+    def _write_segment(self, segment_name, arrays):
+        segment_dir = self.index_dir / segment_name
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        for array_name in SEGMENT_ARRAY_NAMES:
+            _atomic_save_npy(segment_dir / f"{array_name}.npy", arrays[array_name])
+
+    def _open_segment(self, segment_name):
+        segment_dir = self.index_dir / segment_name
+        return {array_name: np.load(segment_dir / f"{array_name}.npy", mmap_mode='r')
+                for array_name in SEGMENT_ARRAY_NAMES}
+
+    def _save_metadata(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_save_npy(self.index_dir / 'document_frequency.npy', self.document_frequency)
+        _atomic_save_json(self.index_dir / 'vocabulary.json', self.terms)
+        # meta.json is written last: it is what makes the new segment list visible to readers.
+        _atomic_save_json(self.index_dir / 'meta.json', {
+            'format_version': INDEX_FORMAT_VERSION,
+            'segments': self.segment_names,
+            'last_sentence_id': self.last_sentence_id,
+            'speakers': self.speakers,
+        })
+
+    @classmethod
+    def load(cls, index_dir):
+        """Opens an existing index, memory-mapping its segments. Returns None if there is none."""
+        index = cls(index_dir)
+        meta_path = index.index_dir / 'meta.json'
+        if not meta_path.exists():
+            return None
+        with open(meta_path, encoding='utf-8') as fh:
+            meta = json.load(fh)
+        if meta.get('format_version') != INDEX_FORMAT_VERSION:
+            logger.warning(f"TF-IDF index at {index.index_dir} has format {meta.get('format_version')}, expected {INDEX_FORMAT_VERSION}. Ignoring it.")
+            return None
+        with open(index.index_dir / 'vocabulary.json', encoding='utf-8') as fh:
+            index.terms = json.load(fh)
+        index.vocabulary = {term: term_id for term_id, term in enumerate(index.terms)}
+        index.speakers = meta['speakers']
+        index._speaker_codes_by_name = {speaker: code for code, speaker in enumerate(index.speakers)}
+        index.document_frequency = np.load(index.index_dir / 'document_frequency.npy')
+        index.segment_names = meta['segments']
+        index.segments = [index._open_segment(name) for name in index.segment_names]
+        index.last_sentence_id = meta['last_sentence_id']
+        index._refresh_document_arrays()
+        index._recompute_weights()
+        logger.info(f"Loaded TF-IDF index from {index.index_dir}: {index.n_docs} sentences, {len(index.terms)} terms, {len(index.segments)} segments.")
+        return index
+
+    # --- Querying ---
+
+    def _row_mask(self, kind, values):
+        """OR of cached per-value boolean masks over all indexed sentences."""
+        combined = np.zeros(self.n_docs, dtype=bool)
+        for value in values:
+            cache_key = (kind, value)
+            mask = self._mask_cache.get(cache_key)
+            if mask is None:
+                if kind == 'speaker':
+                    code = self._speaker_codes_by_name.get(value)
+                    mask = (self.speaker_codes == code) if code is not None else np.zeros(self.n_docs, dtype=bool)
+                else:
+                    mask = self.session_numbers == int(value)
+                self._mask_cache[cache_key] = mask
+            combined |= mask
+        return combined
+
+    def query(self, query_text, top_k=10, speakers=None, session_numbers=None, exclude_sentence_ids=None):
+        """
+        Finds the indexed sentences most similar (cosine over TF-IDF) to a piece of text.
+
+        Args:
+            query_text: Text to compare against, typically another sentence's sentence_cleaned.
+            top_k: Number of results.
+            speakers: Optional list of speakers to restrict results to.
+            session_numbers: Optional list of session numbers to restrict results to.
+            exclude_sentence_ids: Optional sentence IDs to leave out (e.g. the query sentence).
+
+        Returns:
+            DataFrame with 'sentence_id' and 'similarity' columns, most similar first.
+        """
+        empty_result = pd.DataFrame({'sentence_id': pd.Series(dtype='int64'), 'similarity': pd.Series(dtype='float32')})
+        if self.n_docs == 0:
+            return empty_result
+
+        query_counts = Counter(t for t in tokenize_for_tfidf(query_text) if t in self.vocabulary)
+        if not query_counts:
+            return empty_result
+        query_terms = np.fromiter((self.vocabulary[t] for t in query_counts), dtype=np.int64, count=len(query_counts))
+        query_weights = (1.0 + np.log(np.fromiter(query_counts.values(), dtype=np.float32))) * self.idf[query_terms]
+        query_weights /= np.linalg.norm(query_weights)
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for segment, offset in zip(self.segments, self._segment_offsets):
+            indptr = segment['indptr']
+            n_segment_terms = len(indptr) - 1
+            for term_id, weight in zip(query_terms, query_weights):
+                if term_id >= n_segment_terms:
+                    continue
+                start, end = indptr[term_id], indptr[term_id + 1]
+                if start == end:
+                    continue
+                # Postings within a term hold each sentence at most once, so fancy-index += is safe.
+                scores[offset + segment['indices'][start:end]] += (weight * self.idf[term_id]) * segment['data'][start:end]
+
+        np.divide(scores, self.doc_norms, out=scores, where=self.doc_norms > 0)
+        if speakers:
+            scores[~self._row_mask('speaker', speakers)] = 0.0
+        if session_numbers:
+            scores[~self._row_mask('session', session_numbers)] = 0.0
+        if exclude_sentence_ids:
+            scores[np.isin(self.sentence_ids, list(exclude_sentence_ids))] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) == 0:
+            return empty_result
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(scores[candidates], -top_k)[-top_k:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return pd.DataFrame({'sentence_id': self.sentence_ids[candidates], 'similarity': scores[candidates]})
+
+
+def load_or_build_sentence_tfidf_index(engine, index_dir):
+    """
+    Opens the TF-IDF index at index_dir (building it on first use) and indexes any
+    sentences added to the database since it was last updated.
+    """
+    index = SentenceTfidfIndex.load(index_dir)
+    if index is None:
+        logger.info(f"No TF-IDF index found at {index_dir}. Building from speech_sentence...")
+        index = SentenceTfidfIndex(index_dir)
+    index.update_from_database(engine)
+    return index
+
+
+def find_similar_sentences(engine, index, sentence_id, top_k=10, speakers=None, session_numbers=None):
+    """
+    "More like this" for one sentence: returns its top_k most similar sentences, joined to
+    their sentence text and intervention (speaker, meeting, session).
+    """
+    result_columns = ['sentence_id', 'similarity', 'intervention_id', 'speaker', 'meeting', 'session_number', 'sentence_full']
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT sentence_cleaned FROM speech_sentence WHERE id = :sentence_id"),
+                           {'sentence_id': int(sentence_id)}).first()
+    if row is None:
+        logger.warning(f"Sentence {sentence_id} not found for similarity search.")
+        return pd.DataFrame(columns=result_columns)
+
+    df_hits = index.query(row[0], top_k=top_k, speakers=speakers, session_numbers=session_numbers,
+                          exclude_sentence_ids=[int(sentence_id)])
+    if df_hits.empty:
+        return pd.DataFrame(columns=result_columns)
+
+    placeholders = ', '.join(f':id_{i}' for i in range(len(df_hits)))
+    params = {f'id_{i}': int(sid) for i, sid in enumerate(df_hits['sentence_id'])}
+    with engine.connect() as conn:
+        df_details = pd.read_sql_query(text(f"""
+            SELECT ss.id AS sentence_id, ss.intervention_id, i.speaker, i.meeting, i.session_number, ss.sentence_full
+            FROM speech_sentence ss JOIN intervention i ON i.id = ss.intervention_id
+            WHERE ss.id IN ({placeholders})
+        """), conn, params=params)
+    return df_hits.merge(df_details, on='sentence_id', how='left')[result_columns]
+
+
+if __name__ == '__main__':
+    # Builds or refreshes the index offline, after new sentences are loaded and before the DB is published, e.g.
+    #   python -m src.utils.sentence_similarity_utils --db data/oewg_analysis_dash.db
+    #   python -m src.utils.sentence_similarity_utils --db data/oewg_analysis_dash.db --similar-to 1234
+    parser = argparse.ArgumentParser(description="Build or refresh the TF-IDF \"more like this\" sentence index.")
+    parser.add_argument('--db', type=Path, required=True, help="SQLite analysis database.")
+    parser.add_argument('--index-dir', type=Path, default=AppConfig.SENTENCE_TFIDF_INDEX_DIR, help="Index directory (default: %(default)s).")
+    parser.add_argument('--similar-to', type=int, default=None, help="After updating, print the sentences most similar to this sentence ID.")
+    parser.add_argument('--top-k', type=int, default=10, help="Number of similar sentences to print.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    db_engine = create_engine(f"sqlite:///{args.db.resolve()}")
+    sentence_index = load_or_build_sentence_tfidf_index(db_engine, args.index_dir)
+    print(f"TF-IDF index at {args.index_dir}: {sentence_index.n_docs} sentences, {len(sentence_index.terms)} terms, {len(sentence_index.segments)} segments.")
+    if args.similar_to is not None:
+        df_similar = find_similar_sentences(db_engine, sentence_index, args.similar_to, top_k=args.top_k)
+        print(df_similar[['sentence_id', 'similarity', 'speaker', 'sentence_full']].to_string(index=False))
@@ -0,0 +1,158 @@
+# src/utils/shared_disk_cache.py
+
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteDiskCache:
+    """
+    File-backed key/value cache that can be shared by several processes (e.g. gunicorn workers)
+    on one host without any external server.
+
+    Entries live in a single SQLite file in WAL mode, so readers never block each other and a
+    writer only briefly blocks other writers. Every write (insert plus eviction) is one
+    BEGIN IMMEDIATE transaction, so other processes see either the old or the new entry, never
+    a partial one. Entries expire after their TTL; when the stored bytes exceed max_bytes the
+    least recently read entries are evicted first.
+
+    A read only writes last_access when the stored one is older than access_refresh_seconds, so
+    repeated hits stay read-only (LRU order is that coarse). The bytes held are kept as a running
+    total in the one-row cache_meta table, updated on every insert and delete, so eviction never
+    sums the whole table.
+
+    Values are pickled, so the cache file must only be writable by the app itself.
+    """
+
+    def __init__(self, path, max_bytes: int = 512 * 1024 * 1024, default_ttl_seconds: float = 24 * 3600,
+                 access_refresh_seconds: float = 5.0):
+        self.path = str(path)
+        self.max_bytes = int(max_bytes)
+        self.default_ttl_seconds = float(default_ttl_seconds)
+        self.access_refresh_seconds = float(access_refresh_seconds)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entry (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entry_last_access ON cache_entry(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entry_expires_at ON cache_entry(expires_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_bytes INTEGER NOT NULL
+                )""")
+            # Cache files created before cache_meta existed get their total summed once.
+            conn.execute("INSERT OR IGNORE INTO cache_meta (id, total_bytes) SELECT 1, COALESCE(SUM(size_bytes), 0) FROM cache_entry")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process: connections must not cross a fork.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Hashes arbitrary (repr-stable) key parts into a fixed-length string key."""
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        """Returns the stored value for key, or None if it is missing or expired."""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, last_access FROM cache_entry WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.access_refresh_seconds:
+                conn.execute("UPDATE cache_entry SET last_access = ? WHERE key = ? AND last_access < ?",
+                             (now, key, now - self.access_refresh_seconds))
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Disk cache read failed for key {key}: {e}")
+            return None
+
+    def set(self, key: str, value, ttl_seconds: float = None):
+        """Stores value under key and evicts expired / least recently read entries above max_bytes."""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            logger.debug(f"Disk cache value for key {key} ({len(payload)} bytes) exceeds max_bytes; not stored.")
+            return
+        now = time.time()
+        ttl = self.default_ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                replaced = conn.execute("SELECT size_bytes FROM cache_entry WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entry (key, value, size_bytes, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(payload), len(payload), now + ttl, now))
+                self._add_to_total(conn, len(payload) - (replaced[0] if replaced else 0))
+                self._evict(conn, now)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache write failed for key {key}: {e}")
+
+    @staticmethod
+    def _add_to_total(conn, delta_bytes):
+        if delta_bytes:
+            conn.execute("UPDATE cache_meta SET total_bytes = total_bytes + ? WHERE id = 1", (delta_bytes,))
+
+    def _evict(self, conn, now):
+        # Only expired entries are summed, through the expires_at index.
+        expired_bytes = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entry WHERE expires_at <= ?", (now,)).fetchone()[0]
+        if expired_bytes:
+            conn.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (now,))
+            self._add_to_total(conn, -expired_bytes)
+        total_bytes = conn.execute("SELECT total_bytes FROM cache_meta WHERE id = 1").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+        # Walk entries from least to most recently read until enough bytes are freed.
+        bytes_to_free = total_bytes - self.max_bytes
+        keys_to_delete = []
+        for key, size_bytes in conn.execute("SELECT key, size_bytes FROM cache_entry ORDER BY last_access"):
+            keys_to_delete.append((key,))
+            bytes_to_free -= size_bytes
+            if bytes_to_free <= 0:
+                break
+        conn.executemany("DELETE FROM cache_entry WHERE key = ?", keys_to_delete)
+        self._add_to_total(conn, bytes_to_free - (total_bytes - self.max_bytes))
+        logger.debug(f"Disk cache evicted {len(keys_to_delete)} entries to stay under {self.max_bytes} bytes.")
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_entry")
+            conn.execute("UPDATE cache_meta SET total_bytes = 0 WHERE id = 1")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> dict:
+        n_entries, total_bytes = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cache_entry WHERE expires_at > ?", (time.time(),)).fetchone()
+        return {'path': self.path, 'entries': n_entries, 'bytes_held': total_bytes, 'max_bytes': self.max_bytes}
+
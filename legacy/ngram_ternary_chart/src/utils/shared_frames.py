@@ -0,0 +1,174 @@
+# src/utils/shared_frames.py
+
+import os
+import json
+import uuid
+import shutil
+import logging
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots are still published atomically, just without cross-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CURRENT_SNAPSHOT_FILE = 'current.json'
+
+
+def _is_shareable_column(series: pd.Series) -> bool:
+    """Plain numpy numeric/bool columns can be memory-mapped; object, string and extension dtypes cannot."""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf'
+
+
+def _read_current_snapshot(directory):
+    try:
+        with open(os.path.join(directory, CURRENT_SNAPSHOT_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _snapshot_lock(directory, exclusive: bool):
+    """Serialises publishers (and keeps readers off a snapshot while it is being replaced) across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, '.lock'), 'a+') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def publish_frames(frames: dict, directory, data_version: str = None) -> str:
+    """
+    Writes DataFrames to a snapshot directory so that other processes can memory-map them.
+
+    Numeric columns (and a numeric index) are stored as one .npy file each; all other columns
+    are pickled together per frame. The snapshot is written into a fresh subdirectory and then
+    published by atomically replacing current.json, so readers never see a half-written snapshot.
+    If the current snapshot already has the same data_version, nothing is written.
+
+    Args:
+        frames: Mapping of frame name to DataFrame.
+        directory: Root directory for snapshots (created if missing).
+        data_version: Token identifying the source data (e.g. DB mtime/size).
+
+    Returns:
+        Path of the published snapshot subdirectory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with _snapshot_lock(directory, exclusive=True):
+        return _publish_frames_locked(frames, directory, data_version)
+
+
+def _publish_frames_locked(frames: dict, directory, data_version: str = None) -> str:
+    current = _read_current_snapshot(directory)
+    if data_version is not None and current and current.get('data_version') == data_version \
+            and os.path.isdir(os.path.join(directory, current['snapshot'])):
+        logger.info(f"Shared frames for data version {data_version} already published in {directory}.")
+        return os.path.join(directory, current['snapshot'])
+
+    snapshot_name = f"snapshot-{uuid.uuid4().hex[:12]}"
+    tmp_dir = os.path.join(directory, f".tmp-{snapshot_name}")
+    os.makedirs(tmp_dir)
+    manifest = {'frames': {}}
+    for frame_name, df in frames.items():
+        frame_entry = {'columns': [], 'numeric_columns': [], 'index': None}
+        other_columns = []
+        for col_position, col in enumerate(df.columns):
+            frame_entry['columns'].append(col)
+            if _is_shareable_column(df.iloc[:, col_position]):
+                np.save(os.path.join(tmp_dir, f"{frame_name}.{col_position}.npy"), df.iloc[:, col_position].to_numpy())
+                frame_entry['numeric_columns'].append(col_position)
+            else:
+                other_columns.append(col_position)
+        if isinstance(df.index, pd.RangeIndex):
+            frame_entry['index'] = {'kind': 'range', 'start': int(df.index.start), 'stop': int(df.index.stop), 'step': int(df.index.step)}
+        elif isinstance(df.index.dtype, np.dtype) and df.index.dtype.kind in 'iuf':
+            np.save(os.path.join(tmp_dir, f"{frame_name}.index.npy"), df.index.to_numpy())
+            frame_entry['index'] = {'kind': 'npy'}
+        else:
+            frame_entry['index'] = {'kind': 'pickle'}
+        # Non-numeric columns (and a non-numeric index) are small in comparison and stay per-process.
+        df.iloc[:, other_columns].to_pickle(os.path.join(tmp_dir, f"{frame_name}.other.pkl"))
+        manifest['frames'][frame_name] = frame_entry
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.rename(tmp_dir, os.path.join(directory, snapshot_name))
+
+    tmp_current = os.path.join(directory, f".{CURRENT_SNAPSHOT_FILE}.{os.getpid()}")
+    with open(tmp_current, 'w', encoding='utf-8') as f:
+        json.dump({'snapshot': snapshot_name, 'data_version': data_version}, f)
+    os.replace(tmp_current, os.path.join(directory, CURRENT_SNAPSHOT_FILE))
+
+    # Older snapshots can go: processes that still map them keep their pages until they unmap.
+    for entry in os.listdir(directory):
+        if entry.startswith('snapshot-') and entry != snapshot_name:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+    logger.info(f"Published {len(frames)} shared frames to {os.path.join(directory, snapshot_name)}.")
+    return os.path.join(directory, snapshot_name)
+
+
+def attach_frames(directory) -> dict:
+    """
+    Loads the current snapshot from publish_frames. Numeric columns are read-only memory-mapped
+    views, so every process attached to the same snapshot shares one copy in the page cache.
+
+    Returns:
+        Mapping of frame name to DataFrame, or an empty dict if nothing has been published.
+    """
+    if not os.path.isdir(directory):
+        return {}
+    with _snapshot_lock(directory, exclusive=False):
+        return _attach_frames_locked(directory)
+
+
+def _attach_frames_locked(directory) -> dict:
+    current = _read_current_snapshot(directory)
+    if not current:
+        return {}
+    snapshot_dir = os.path.join(directory, current['snapshot'])
+    with open(os.path.join(snapshot_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    frames = {}
+    for frame_name, frame_entry in manifest['frames'].items():
+        df_other = pd.read_pickle(os.path.join(snapshot_dir, f"{frame_name}.other.pkl"))
+        index_entry = frame_entry['index']
+        if index_entry['kind'] == 'range':
+            index = pd.RangeIndex(index_entry['start'], index_entry['stop'], index_entry['step'])
+        elif index_entry['kind'] == 'npy':
+            index = pd.Index(np.load(os.path.join(snapshot_dir, f"{frame_name}.index.npy"), mmap_mode='r'), copy=False)
+        else:
+            index = df_other.index
+
+        numeric_positions = set(frame_entry['numeric_columns'])
+        other_position = 0
+        columns = {}
+        for col_position, col in enumerate(frame_entry['columns']):
+            if col_position in numeric_positions:
+                mapped = np.load(os.path.join(snapshot_dir, f"{frame_name}.{col_position}.npy"), mmap_mode='r')
+                columns[col_position] = pd.Series(mapped, index=index, copy=False)
+            else:
+                columns[col_position] = df_other.iloc[:, other_position].set_axis(index)
+                other_position += 1
+        # copy=False keeps each numeric column backed by its memmap instead of consolidating into new blocks.
+        df = pd.DataFrame(columns, copy=False)
+        df.columns = frame_entry['columns']
+        frames[frame_name] = df
+    logger.info(f"Attached {len(frames)} shared frames from {snapshot_dir}.")
+    return frames
+
+
+def share_frames(frames: dict, directory, data_version: str = None) -> dict:
+    """Publishes frames (unless already published for data_version) and returns memory-mapped replacements."""
+    publish_frames(frames, directory, data_version)
+    attached = attach_frames(directory)
+    return {name: attached.get(name, df) for name, df in frames.items()}
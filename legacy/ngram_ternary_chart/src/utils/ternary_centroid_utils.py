@@ -197,7 +197,8 @@ def calculate_categorical_item_centroids(
     categories_to_process: list = None,
     centroid_label_prefix: str = "Centroid: ",
     default_marker_symbol: str = "circle",
-    default_marker_color: str = "purple" # Default color, can be overridden by assign_colors_to_centroids
+    default_marker_color: str = "purple", # Default color, can be overridden by assign_colors_to_centroids
+    progress_callback=None
 ) -> pd.DataFrame:
     """
     Calculates weighted centroids for items, grouped by a specified category 
@@ -214,6 +215,7 @@ def calculate_categorical_item_centroids(
         centroid_label_prefix: Prefix for the 'label' column in the output.
         default_marker_symbol: Default symbol for markers.
         default_marker_color: Default color for markers.
+        progress_callback: Optional callable(n_done, n_total), called before each category is processed.
 
     Returns:
         DataFrame of centroids: [category_col_in_weights], 'P_US_centroid', 
@@ -273,7 +275,10 @@ def calculate_categorical_item_centroids(
             logger.info(f"None of the specified 'categories_to_process' found in the data.")
             return pd.DataFrame()
 
-    for category_value in categories_for_calc:
+    n_categories = len(categories_for_calc)
+    for category_index, category_value in enumerate(categories_for_calc):
+        if progress_callback is not None:
+            progress_callback(category_index, n_categories)
         df_cat_subset = df_merged[df_merged[category_col_in_weights] == category_value].copy()
         
         # Ensure weights are numeric, non-negative, NaNs are 0
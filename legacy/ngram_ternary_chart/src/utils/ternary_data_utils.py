@@ -4,6 +4,8 @@ import numpy as np
 import plotly.graph_objects as go
 import logging
 
+from src.utils import perf_metrics
+
 # Configure logging for the module if not already configured by the main script
 # This allows the module to log independently if run, for example, during testing.
 # However, in a Jupyter notebook, the root logger is usually configured by the notebook.
@@ -12,6 +14,7 @@ if not logging.getLogger().hasHandlers() or logging.getLogger().getEffectiveLeve
 logger = logging.getLogger(__name__) # Use a module-specific logger
 
 
+@perf_metrics.timed('load_data_for_ternary', 'load')
 def load_data_for_ternary(data_source_key, config, model_id_filter=None, SessionLocal=None, engine=None, MockDBClass=None):
     """
     Loads data from the database or generates mock data, focusing on columns needed for ternary plot.
@@ -0,0 +1,70 @@
+# tests/test_callback_cache.py
+
+import plotly.graph_objects as go
+import plotly.io.json as plotly_json
+import pytest
+from dash._utils import to_json as dash_to_json
+
+from src.utils.callback_cache import CallbackResultCache, figure_outputs_to_dict
+from src.utils.shared_disk_cache import SqliteDiskCache
+
+
+@pytest.fixture
+def json_encode_calls(monkeypatch):
+    """Counts plotly JSON encodes (pio.to_json and Dash's response encoding both go through to_json_plotly)."""
+    calls = []
+    original = plotly_json.to_json_plotly
+
+    def counting_to_json_plotly(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(plotly_json, 'to_json_plotly', counting_to_json_plotly)
+    return calls
+
+
+def _build_outputs():
+    figure = go.Figure(go.Scatterternary(a=[0.2, 0.5], b=[0.3, 0.25], c=[0.5, 0.25], text=['x', 'y']))
+    return figure, "2 items"
+
+
+def _respond(outputs):
+    """Encodes callback outputs the way Dash does for its response."""
+    return dash_to_json({'multi': True, 'response': {'graph': {'figure': outputs[0]}, 'count': {'children': outputs[1]}}})
+
+
+def test_miss_and_hit_each_encode_the_figure_once(json_encode_calls):
+    cache = CallbackResultCache()
+    key = cache.make_key('update_ternary_plot', 'v1', 'term')
+
+    missed = cache.get_or_compute(key, _build_outputs)
+    assert not isinstance(missed[0], go.Figure)
+    miss_response = _respond(missed)
+    assert len(json_encode_calls) == 1
+
+    hit = cache.get_or_compute(key, lambda: pytest.fail("a hit must not recompute"))
+    assert _respond(hit) == miss_response
+    assert len(json_encode_calls) == 2
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_disk_backed_hit_returns_the_same_outputs(tmp_path, json_encode_calls):
+    disk_cache = SqliteDiskCache(tmp_path / 'callbacks.db')
+    key = CallbackResultCache.make_key('update_ternary_plot', 'v1', 'term')
+    expected = _respond(CallbackResultCache(backing_store=disk_cache).get_or_compute(key, _build_outputs))
+
+    other_worker = CallbackResultCache(backing_store=disk_cache)
+    outputs = other_worker.get_or_compute(key, lambda: pytest.fail("the disk cache should serve this key"))
+    assert _respond(outputs) == expected
+    assert other_worker.stats()['backing_store_hits'] == 1
+    assert len(json_encode_calls) == 2
+
+
+def test_serialisation_is_timed_under_the_callback_name(monkeypatch):
+    from src.utils import perf_metrics
+    recorded = []
+    monkeypatch.setattr(perf_metrics, 'observe_duration', lambda callback, stage, seconds: recorded.append((callback, stage)))
+
+    figure_dict, count_text = figure_outputs_to_dict('update_ternary_plot', _build_outputs())
+    assert recorded == [('update_ternary_plot', 'serialisation')]
+    assert figure_dict == _build_outputs()[0].to_plotly_json() and count_text == "2 items"
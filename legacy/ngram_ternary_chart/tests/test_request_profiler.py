@@ -0,0 +1,28 @@
+# tests/test_request_profiler.py
+
+import time
+
+from src.utils.request_profiler import sign_profile_request, verify_profile_signature
+
+SECRET = 'test-secret'
+
+
+def test_signature_is_valid_only_for_its_method_and_path():
+    header = sign_profile_request(SECRET, 'POST', '/_dash-update-component')
+    assert verify_profile_signature(SECRET, header, 'POST', '/_dash-update-component')
+    assert not verify_profile_signature(SECRET, header, 'GET', '/_dash-update-component')
+    assert not verify_profile_signature(SECRET, header, 'POST', '/_admin/profiles')
+    assert not verify_profile_signature('other-secret', header, 'POST', '/_dash-update-component')
+
+
+def test_admin_route_signature_does_not_open_other_admin_routes():
+    header = sign_profile_request(SECRET, 'GET', '/_admin/profiles')
+    assert verify_profile_signature(SECRET, header, 'get', '/_admin/profiles')
+    assert not verify_profile_signature(SECRET, header, 'GET', '/_admin/profiles/20260101T000000-0123abcd.collapsed')
+
+
+def test_expired_and_malformed_signatures_are_rejected():
+    stale = sign_profile_request(SECRET, 'GET', '/_admin/profiles', timestamp=time.time() - 301)
+    assert not verify_profile_signature(SECRET, stale, 'GET', '/_admin/profiles')
+    for header in (None, '', 'no-dot', 'abc.def'):
+        assert not verify_profile_signature(SECRET, header, 'GET', '/_admin/profiles')
@@ -0,0 +1,33 @@
+# tests/test_sentence_dedup_utils.py
+
+import numpy as np
+import pandas as pd
+
+from src.utils.sentence_dedup_utils import find_near_duplicate_sentence_clusters
+
+
+def _clusters_by_id(df_sentences):
+    df_clusters = find_near_duplicate_sentence_clusters(df_sentences)
+    return df_clusters.set_index('sentence_id')[['cluster_id', 'cluster_size']].to_dict('index')
+
+
+def test_blank_and_null_sentences_stay_singletons():
+    df_sentences = pd.DataFrame({
+        'sentence_id': [1, 2, 3, 4, 5, 6],
+        'sentence_cleaned': ['', '', None, np.nan, '  ', '\t\n'],
+    })
+    clusters = _clusters_by_id(df_sentences)
+    for sentence_id in df_sentences['sentence_id']:
+        assert clusters[sentence_id] == {'cluster_id': sentence_id, 'cluster_size': 1}
+
+
+def test_duplicates_still_cluster_next_to_blank_sentences():
+    text = 'the delegation supports the proposal on capacity building and confidence building measures'
+    df_sentences = pd.DataFrame({
+        'sentence_id': [10, 11, 12, 13, 14],
+        'sentence_cleaned': [text, '', text, None, 'an unrelated remark about the agenda of the next session'],
+    })
+    clusters = _clusters_by_id(df_sentences)
+    assert clusters[10] == clusters[12] == {'cluster_id': 10, 'cluster_size': 2}
+    for sentence_id in (11, 13, 14):
+        assert clusters[sentence_id] == {'cluster_id': sentence_id, 'cluster_size': 1}
@@ -0,0 +1,111 @@
+# tests/test_sentence_similarity_utils.py
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import sentence_similarity_utils
+from src.utils.sentence_similarity_utils import SentenceTfidfIndex, tokenize_for_tfidf
+
+WORDS = ['cyber', 'norms', 'states', 'capacity', 'building', 'security', 'critical', 'infrastructure',
+         'confidence', 'measures', 'international', 'law', 'sovereignty', 'attribution', 'ransomware']
+SPEAKERS = ['ARG', 'BRA', 'CHN', 'DEU', 'EGY']
+
+
+def _make_sentences(n_sentences, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'sentence_id': np.arange(1, n_sentences + 1),
+        'sentence_cleaned': [' '.join(rng.choice(WORDS, size=rng.integers(1, 9))) for _ in range(n_sentences)],
+        'speaker': rng.choice(SPEAKERS, size=n_sentences),
+        'session_number': rng.integers(1, 4, size=n_sentences),
+    })
+
+
+def _dense_cosine(df_sentences, query_text):
+    """Brute-force TF-IDF cosine with the same weighting as the index, one dense row per sentence."""
+    counts = [Counter(tokenize_for_tfidf(t)) for t in df_sentences['sentence_cleaned']]
+    terms = sorted({term for c in counts for term in c})
+    column = {term: i for i, term in enumerate(terms)}
+    tf = np.zeros((len(counts), len(terms)))
+    for row, c in enumerate(counts):
+        for term, count in c.items():
+            tf[row, column[term]] = 1.0 + np.log(count)
+    idf = np.log((1.0 + len(counts)) / (1.0 + (tf > 0).sum(axis=0))) + 1.0
+    docs = tf * idf
+    query = np.zeros(len(terms))
+    for term, count in Counter(t for t in tokenize_for_tfidf(query_text) if t in column).items():
+        query[column[term]] = (1.0 + np.log(count)) * idf[column[term]]
+    query /= np.linalg.norm(query)
+    return docs @ query / np.linalg.norm(docs, axis=1)
+
+
+def _expected_top_k_scores(scores, top_k, mask=None):
+    scores = np.where(mask, scores, 0.0) if mask is not None else scores
+    scores = np.sort(scores)[::-1]
+    return scores[scores > 0][:top_k]
+
+
+def _assert_matches_dense(df_result, df_sentences, dense_scores, expected_scores):
+    # Tied sentences may come back in either order: compare the scores rank by rank, then check
+    # that each returned sentence really has the score reported for it.
+    np.testing.assert_allclose(df_result['similarity'].to_numpy(), expected_scores, rtol=1e-5)
+    dense_by_id = pd.Series(dense_scores, index=df_sentences['sentence_id'])
+    np.testing.assert_allclose(dense_by_id.loc[df_result['sentence_id']].to_numpy(), df_result['similarity'].to_numpy(), rtol=1e-5)
+
+
+@pytest.fixture
+def df_sentences():
+    return _make_sentences(300)
+
+
+def _build_in_segments(index_dir, df_sentences, n_segments):
+    index = SentenceTfidfIndex(index_dir)
+    for block_positions in np.array_split(np.arange(len(df_sentences)), n_segments):
+        index.add_sentences(df_sentences.iloc[block_positions])
+    return index
+
+
+def test_top_k_matches_dense_cosine(tmp_path, df_sentences):
+    index = _build_in_segments(tmp_path / 'index', df_sentences, n_segments=3)
+    assert len(index.segments) == 3
+
+    query_text = 'critical infrastructure ransomware attribution'
+    dense_scores = _dense_cosine(df_sentences, query_text)
+    _assert_matches_dense(index.query(query_text, top_k=15), df_sentences, dense_scores,
+                          _expected_top_k_scores(dense_scores, top_k=15))
+
+
+def test_filter_masks_match_dense_cosine(tmp_path, df_sentences):
+    index = _build_in_segments(tmp_path / 'index', df_sentences, n_segments=2)
+    query_text = 'capacity building norms'
+    dense_scores = _dense_cosine(df_sentences, query_text)
+
+    mask = (df_sentences['speaker'].isin(['BRA', 'EGY']) & (df_sentences['session_number'] == 2)).to_numpy()
+    df_result = index.query(query_text, top_k=10, speakers=['BRA', 'EGY'], session_numbers=[2])
+    _assert_matches_dense(df_result, df_sentences, dense_scores, _expected_top_k_scores(dense_scores, top_k=10, mask=mask))
+    assert len(df_result) == 10
+    assert set(df_result['sentence_id']) <= set(df_sentences.loc[mask, 'sentence_id'])
+
+    # Cached masks must not leak into an unfiltered query.
+    _assert_matches_dense(index.query(query_text, top_k=10), df_sentences, dense_scores,
+                          _expected_top_k_scores(dense_scores, top_k=10))
+
+
+def test_segment_merge_keeps_scores_and_reloads(tmp_path, df_sentences, monkeypatch):
+    monkeypatch.setattr(sentence_similarity_utils, 'MAX_SEGMENTS_BEFORE_MERGE', 3)
+    index_dir = tmp_path / 'index'
+    index = _build_in_segments(index_dir, df_sentences, n_segments=4)
+    assert len(index.segments) == 1
+    assert sorted(p.name for p in index_dir.iterdir() if p.is_dir()) == index.segment_names
+
+    query_text = 'international law sovereignty'
+    dense_scores = _dense_cosine(df_sentences, query_text)
+    expected_scores = _expected_top_k_scores(dense_scores, top_k=20)
+    _assert_matches_dense(index.query(query_text, top_k=20), df_sentences, dense_scores, expected_scores)
+
+    reloaded = SentenceTfidfIndex.load(index_dir)
+    assert reloaded.last_sentence_id == df_sentences['sentence_id'].max()
+    _assert_matches_dense(reloaded.query(query_text, top_k=20), df_sentences, dense_scores, expected_scores)
@@ -0,0 +1,47 @@
+# tests/test_shared_frames.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.shared_frames import share_frames
+
+
+def _is_memmap_backed(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+@pytest.fixture
+def attached(tmp_path):
+    df = pd.DataFrame({
+        'P_US': np.linspace(0.0, 1.0, 50),
+        'TotalMentions': np.arange(50, dtype=np.int64),
+        'ngram': [f"ngram {i}" for i in range(50)],
+        'P_Russia': np.linspace(1.0, 0.0, 50),
+    })
+    return df, share_frames({'items': df}, tmp_path / 'shared_frames', data_version='v1')['items']
+
+
+def test_numeric_columns_are_memmap_backed(attached):
+    df, df_attached = attached
+    assert list(df_attached.columns) == list(df.columns) and (df_attached.dtypes == df.dtypes).all()
+    for col in df.columns:
+        np.testing.assert_array_equal(np.asarray(df_attached[col]), np.asarray(df[col]))
+    for col in ('P_US', 'TotalMentions', 'P_Russia'):
+        assert _is_memmap_backed(df_attached[col].to_numpy()), f"{col} was copied into private memory"
+
+
+def test_reads_do_not_consolidate_the_memmapped_columns(attached):
+    # Block consolidation would copy the numeric columns into one private 2-D block.
+    _, df_attached = attached
+    df_attached.loc[df_attached['P_US'] > 0.5, ['P_US', 'P_Russia']].sum()
+    df_attached[['P_US', 'TotalMentions']].to_numpy()
+    df_attached.groupby('ngram')['TotalMentions'].sum()
+    df_attached.copy().values
+    df_attached.describe()
+    for col in ('P_US', 'TotalMentions', 'P_Russia'):
+        assert _is_memmap_backed(df_attached[col].to_numpy()), f"{col} was consolidated into private memory"
@@ -0,0 +1,178 @@
+# benchmarks/benchmark_migration.py
+#
+# End-to-end throughput of migrate_to_supabase.py against the local mock Supabase server
+# (benchmarks/mock_supabase_server.py), for each way the script can send the data:
+#     streaming  one table and one batch at a time, fixed-size batches, rows keyset-streamed from SQLite
+#     parallel   --table-workers tables per dependency level and --insert-workers batches in flight, fixed-size batches
+#     adaptive   parallel, with batch sizes tuned from observed latency (the script's default configuration)
+# Run from the python-svc/migration/ directory (needs the packages in requirements.txt):
+#     python -m benchmarks.benchmark_migration --db ../../data/oewg_analysis_dash.db
+#     python -m benchmarks.benchmark_migration --modes parallel adaptive --latency-ms 80 --error-rate 0.02 --json results.json
+#
+# Each mode runs the unmodified script in a subprocess, configured only through environment
+# variables, with SUPABASE_URL pointing at the mock and a fresh sink, checkpoint and rejects file,
+# so the timings cover everything a real run does except the network. The sink is then checked
+# against SQLite: every table must hold its source rows less the rows the script rejected.
+# Exits with status 1 when a mode fails or its sink does not match.
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.mock_supabase_server import start_mock_server
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MIGRATION_DIR = Path(__file__).resolve().parent.parent
+MIGRATION_SCRIPT = MIGRATION_DIR / 'migrate_to_supabase.py'
+# Any JWT-shaped key passes the Supabase client's format check; the mock does not check it.
+MOCK_SUPABASE_KEY = 'mock.service.role'
+MB = 1024 * 1024
+
+
+def mode_environments(table_workers, insert_workers, target_seconds):
+    """Environment overrides of each benchmarked mode, in report order."""
+    return {
+        'streaming': {'MIGRATION_TABLE_WORKERS': '1', 'MIGRATION_INSERT_WORKERS': '1', 'MIGRATION_BATCH_TARGET_SECONDS': '0'},
+        'parallel': {'MIGRATION_TABLE_WORKERS': str(table_workers), 'MIGRATION_INSERT_WORKERS': str(insert_workers),
+                     'MIGRATION_BATCH_TARGET_SECONDS': '0'},
+        'adaptive': {'MIGRATION_TABLE_WORKERS': str(table_workers), 'MIGRATION_INSERT_WORKERS': str(insert_workers),
+                     'MIGRATION_BATCH_TARGET_SECONDS': str(target_seconds)},
+    }
+
+
+def source_row_counts(db_file, tables):
+    connection = sqlite3.connect(f"file:{Path(db_file).resolve()}?mode=ro", uri=True)
+    try:
+        existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {table: connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables if table in existing}
+    finally:
+        connection.close()
+
+
+def rejected_row_counts(rejects_file):
+    counts = {}
+    if Path(rejects_file).exists():
+        with open(rejects_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                table = json.loads(line)['table']
+                counts[table] = counts.get(table, 0) + 1
+    return counts
+
+
+def run_mode(name, overrides, server, db_file, expected_rows, work_dir, timeout):
+    """
+    Runs the migration script once against server with the mode's environment overrides.
+
+    Returns:
+        Dict with the mode, wall-clock seconds, rows in the sink, rejected rows, the mock's request
+        and byte counters, rows/s and MB/s (request bodies), 'mismatches' (tables whose sink count
+        is not their source count less their rejected rows) and 'error' (None if the run completed).
+    """
+    server.sink.clear()
+    server.reset_stats()
+    rejects_file = Path(work_dir) / f'{name}_rejects.jsonl'
+    env = {**os.environ, **overrides,
+           'SUPABASE_URL': server.url, 'SUPABASE_KEY': MOCK_SUPABASE_KEY, 'SQLITE_DB_PATH': str(Path(db_file).resolve()),
+           'MIGRATION_BACKEND': 'rest', 'MIGRATION_MODE': 'full',
+           'MIGRATION_CHECKPOINT_FILE': str(Path(work_dir) / f'{name}_checkpoint.json'),
+           'MIGRATION_REJECTS_FILE': str(rejects_file),
+           # Injected rejects are expected; only a rejected batch or a real error should stop the run.
+           'MIGRATION_MAX_REJECTED_ROWS': str(sum(expected_rows.values()))}
+    logger.warning(f"Running mode '{name}' ({', '.join(f'{k}={v}' for k, v in overrides.items())}) ...")
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, str(MIGRATION_SCRIPT)], cwd=MIGRATION_DIR, env=env,
+                             capture_output=True, text=True, timeout=timeout)
+    seconds = time.perf_counter() - started
+
+    # The script logs a halt instead of exiting with an error status.
+    output = process.stdout + process.stderr
+    error = None
+    if process.returncode != 0 or 'completed successfully' not in output:
+        error = next((line for line in reversed(output.splitlines()) if 'ERROR' in line), f"exit status {process.returncode}")
+    sink_rows = server.sink.row_counts()
+    rejected = rejected_row_counts(rejects_file)
+    mismatches = {table: {'source': count, 'sink': sink_rows.get(table, 0), 'rejected': rejected.get(table, 0)}
+                  for table, count in expected_rows.items() if sink_rows.get(table, 0) != count - rejected.get(table, 0)}
+    stats = dict(server.stats)
+    return {
+        'mode': name, 'seconds': round(seconds, 2), 'rows': sum(sink_rows.values()), 'rejected': sum(rejected.values()),
+        'requests': stats['requests'], 'request_mb': round(stats['request_bytes'] / MB, 2),
+        'response_mb': round(stats['response_bytes'] / MB, 2), 'max_request_kb': round(stats['max_request_bytes'] / 1024, 1),
+        'injected_errors': stats['injected_errors'], 'rows_per_second': round(sum(sink_rows.values()) / seconds, 1),
+        'mb_per_second': round(stats['request_bytes'] / MB / seconds, 3),
+        'mismatches': mismatches, 'error': error, 'environment': overrides,
+    }
+
+
+def print_report(results):
+    print(f"\n{'mode':<12}{'seconds':>9}{'rows':>10}{'rows/s':>10}{'MB sent':>9}{'MB/s':>8}{'requests':>10}"
+          f"{'avg KB':>8}{'max KB':>8}{'errors':>8}{'rejected':>10}  status")
+    for r in results:
+        average_kb = r['request_mb'] * 1024 / r['requests'] if r['requests'] else 0.0
+        status = f"ERROR: {r['error']}" if r['error'] else (f"MISMATCH in {len(r['mismatches'])} tables" if r['mismatches'] else 'ok')
+        print(f"{r['mode']:<12}{r['seconds']:>9.1f}{r['rows']:>10,}{r['rows_per_second']:>10,.0f}{r['request_mb']:>9.1f}"
+              f"{r['mb_per_second']:>8.2f}{r['requests']:>10,}{average_kb:>8.0f}{r['max_request_kb']:>8.0f}"
+              f"{r['injected_errors']:>8}{r['rejected']:>10}  {status}")
+    baseline = next((r for r in results if not r['error']), None)
+    if baseline:
+        for r in results:
+            if r is not baseline and not r['error']:
+                print(f"{r['mode']} vs {baseline['mode']}: {baseline['seconds'] / max(r['seconds'], 1e-9):.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark migrate_to_supabase.py end to end against a local mock Supabase server.")
+    parser.add_argument('--db', type=Path, help="SQLite database to migrate (default: the script's SQLITE_DB_PATH).")
+    parser.add_argument('--modes', nargs='+', choices=['streaming', 'parallel', 'adaptive'], default=['streaming', 'parallel', 'adaptive'])
+    parser.add_argument('--table-workers', type=int, default=4, help="MIGRATION_TABLE_WORKERS for the parallel and adaptive modes.")
+    parser.add_argument('--insert-workers', type=int, default=8, help="MIGRATION_INSERT_WORKERS for the parallel and adaptive modes.")
+    parser.add_argument('--target-seconds', type=float, default=2.0, help="MIGRATION_BATCH_TARGET_SECONDS for the adaptive mode.")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Mock latency per request.")
+    parser.add_argument('--ms-per-mb', type=float, default=100.0, help="Mock latency per MB of request body.")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Mock latency varies by +/- this fraction.")
+    parser.add_argument('--max-concurrent', type=int, default=16, help="Requests the mock serves at once.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with a retryable statement timeout.")
+    parser.add_argument('--reject-rate', type=float, default=0.0, help="Fraction of rows always rejected by a check constraint.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the mock's latency jitter and injected errors.")
+    parser.add_argument('--timeout', type=float, default=3600.0, help="Seconds after which a mode's run is abandoned.")
+    parser.add_argument('--json', type=Path, help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    # Imported here, not at module level: the script loads .env and configures logging on import.
+    sys.path.insert(0, str(MIGRATION_DIR))
+    import migrate_to_supabase as migration
+
+    db_path = args.db or migration.SQLITE_DB_PATH
+    expected = source_row_counts(db_path, migration.TABLES_TO_MIGRATE)
+    logger.warning(f"Benchmarking {sum(expected.values()):,} rows in {len(expected)} tables from {db_path}.")
+    environments = mode_environments(args.table_workers, args.insert_workers, args.target_seconds)
+    mock_server = start_mock_server(latency_ms=args.latency_ms, ms_per_mb=args.ms_per_mb, jitter=args.jitter,
+                                    max_concurrent=args.max_concurrent, error_rate=args.error_rate,
+                                    reject_rate=args.reject_rate, seed=args.seed)
+    try:
+        with tempfile.TemporaryDirectory(prefix='benchmark_migration_') as tmp_dir:
+            mode_results = [run_mode(mode, environments[mode], mock_server, db_path, expected, tmp_dir, args.timeout)
+                            for mode in args.modes]
+    finally:
+        mock_server.shutdown()
+        mock_server.server_close()
+
+    print(f"\nMock server: {args.latency_ms:g} ms + {args.ms_per_mb:g} ms/MB per request (+/-{args.jitter:.0%}), "
+          f"{args.max_concurrent} concurrent, error rate {args.error_rate:g}, reject rate {args.reject_rate:g}")
+    print_report(mode_results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'database': str(db_path), 'rows': sum(expected.values()), 'mock': {
+                'latency_ms': args.latency_ms, 'ms_per_mb': args.ms_per_mb, 'jitter': args.jitter, 'max_concurrent': args.max_concurrent,
+                'error_rate': args.error_rate, 'reject_rate': args.reject_rate, 'seed': args.seed}, 'modes': mode_results}, f, indent=2)
+    if any(r['error'] or r['mismatches'] for r in mode_results):
+        sys.exit(1)
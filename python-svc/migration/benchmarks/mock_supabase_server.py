@@ -0,0 +1,372 @@
+# benchmarks/mock_supabase_server.py
+#
+# Local stand-in for a Supabase project's REST API (PostgREST), for exercising migrate_to_supabase.py
+# without a live project. Implements what the migration's client calls send:
+#     POST   /rest/v1/<table>[?on_conflict=a,b]    insert / upsert (Prefer: resolution=merge-duplicates)
+#     DELETE /rest/v1/<table>?<col>=in.(...)        delete by key (or=(and(a.eq.1,b.eq."x"),...) for composite keys)
+# Rows go to an SQLite sink (in memory by default); tables and columns are created as rows arrive.
+# Run from the python-svc/migration/ directory:
+#     python -m benchmarks.mock_supabase_server --port 54321 --latency-ms 50 --sink /tmp/mock_sink.db
+#     SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=mock.service.role python migrate_to_supabase.py
+#
+# Latency is latency_ms plus ms_per_mb for each MB of request body, with +/- jitter, and at most
+# max_concurrent requests are served at once (the rest queue), so batch size and concurrency
+# matter as they do against a real project. Error injection: error_rate of requests fail with a
+# statement timeout (HTTP 500, SQLSTATE 57014, which the migration retries), and reject_rate of
+# rows, picked by a hash of their content so the same rows fail every time, make any request
+# containing them fail with a check constraint violation (HTTP 400, SQLSTATE 23514).
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+REST_PREFIX = '/rest/v1/'
+MB = 1024 * 1024
+_NUMBER = re.compile(r'-?\d+(\.\d+)?([eE][-+]?\d+)?$')
+
+
+class PostgrestError(Exception):
+    """An error answered as PostgREST does: HTTP status and a JSON body with code, message, details, hint."""
+
+    def __init__(self, status, code, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {'code': code, 'message': message, 'details': details, 'hint': None}
+
+
+def split_top_level(text):
+    """Splits a PostgREST list on commas outside double quotes and parentheses."""
+    parts, current, depth, in_quotes, escaped = [], [], 0, False, False
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == '\\' and in_quotes:
+            current.append(char)
+            escaped = True
+        elif char == '"':
+            current.append(char)
+            in_quotes = not in_quotes
+        elif char in '()' and not in_quotes:
+            depth += 1 if char == '(' else -1
+            current.append(char)
+        elif char == ',' and depth == 0 and not in_quotes:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    if current or parts:
+        parts.append(''.join(current))
+    return parts
+
+
+def parse_literal(text):
+    """A PostgREST filter literal: "quoted" strings (backslash escapes), bare numbers, anything else as text."""
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', text[1:-1])
+    if _NUMBER.match(text):
+        return float(text) if any(c in text for c in '.eE') else int(text)
+    return text
+
+
+def parse_condition(column, operator_and_value):
+    """(SQL condition, params) for one column filter such as in.(1,2) or eq."x"."""
+    operator, _, value = operator_and_value.partition('.')
+    if operator == 'eq':
+        return f'"{column}" = ?', [parse_literal(value)]
+    if operator == 'in':
+        if not (value.startswith('(') and value.endswith(')')):
+            raise PostgrestError(400, 'PGRST100', f'failed to parse filter ({operator_and_value})')
+        values = [parse_literal(v) for v in split_top_level(value[1:-1])]
+        return f'"{column}" IN ({", ".join("?" * len(values))})', values
+    raise PostgrestError(400, 'PGRST100', f'operator not supported by the mock server ({operator})')
+
+
+def parse_logic_tree(text):
+    """(SQL condition, params) for an or/and tree such as (and(a.eq.1,b.eq."x"),and(...))."""
+    if text.startswith(('and(', 'or(')):
+        joiner, inner = ('AND', text[4:-1]) if text.startswith('and(') else ('OR', text[3:-1])
+    elif text.startswith('(') and text.endswith(')'):
+        return parse_logic_tree('or' + text)
+    else:
+        column, _, rest = text.partition('.')
+        return parse_condition(column, rest)
+    conditions, params = [], []
+    for part in split_top_level(inner):
+        condition, part_params = parse_logic_tree(part)
+        conditions.append(f'({condition})')
+        params.extend(part_params)
+    return f' {joiner} '.join(conditions), params
+
+
+def filters_to_sql(query_pairs):
+    """WHERE clause and params from a request's horizontal filters (column=op.value, or=(...), and=(...))."""
+    conditions, params = [], []
+    for name, value in query_pairs:
+        if name in ('select', 'on_conflict', 'columns', 'order', 'limit', 'offset'):
+            continue
+        if name in ('or', 'and'):
+            condition, condition_params = parse_logic_tree(name + value)
+        else:
+            condition, condition_params = parse_condition(name, value)
+        conditions.append(f'({condition})')
+        params.extend(condition_params)
+    return ' AND '.join(conditions), params
+
+
+def quoted_list(columns):
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+def to_sqlite_value(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+class SqliteSink:
+    """Thread-safe SQLite store for the mock; tables, columns and conflict indexes are created on demand."""
+
+    def __init__(self, path=':memory:'):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.columns = {}
+        self.conflict_indexes = set()
+
+    def _ensure_table(self, table_name, columns, conflict_columns):
+        known = self.columns.get(table_name)
+        if known is None:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({quoted_list(columns)})')
+            known = self.columns[table_name] = [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table_name}")')]
+        for column in columns:
+            if column not in known:
+                self.conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{column}"')
+                known.append(column)
+        if conflict_columns and (table_name, tuple(conflict_columns)) not in self.conflict_indexes:
+            index_name = f'{table_name}__{"_".join(conflict_columns)}__conflict'
+            self.conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{index_name}" ON "{table_name}" ({quoted_list(conflict_columns)})')
+            self.conflict_indexes.add((table_name, tuple(conflict_columns)))
+
+    def insert(self, table_name, rows, conflict_columns=None, resolution=None):
+        """Inserts rows in one transaction; resolution is None (plain insert), 'merge-duplicates' or 'ignore-duplicates'."""
+        if not rows:
+            return
+        if not all(isinstance(row, dict) for row in rows):
+            raise PostgrestError(400, 'PGRST102', 'Expected a JSON object or an array of objects')
+        columns = list(rows[0])
+        if any(set(row) != set(columns) for row in rows):
+            raise PostgrestError(400, 'PGRST102', 'All object keys must match')
+        statement = f'INSERT INTO "{table_name}" ({quoted_list(columns)}) VALUES ({", ".join("?" * len(columns))})'
+        if resolution and conflict_columns:
+            conflict = quoted_list(conflict_columns)
+            updates = [c for c in columns if c not in conflict_columns]
+            if resolution == 'merge-duplicates' and updates:
+                statement += f' ON CONFLICT ({conflict}) DO UPDATE SET ' + ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+            else:
+                statement += f' ON CONFLICT ({conflict}) DO NOTHING'
+        with self.lock:
+            self._ensure_table(table_name, columns, conflict_columns)
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany(statement, [[to_sqlite_value(row[c]) for c in columns] for row in rows])
+            except sqlite3.IntegrityError as e:
+                self.conn.execute('ROLLBACK')
+                raise PostgrestError(409, '23505', f'duplicate key value violates unique constraint: {e}')
+            self.conn.execute('COMMIT')
+
+    def delete(self, table_name, where, params):
+        """Deletes matching rows and returns them as dicts."""
+        with self.lock:
+            if table_name not in self.columns and not self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone():
+                return []
+            cursor = self.conn.execute(f'DELETE FROM "{table_name}" WHERE {where} RETURNING *', params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def row_counts(self):
+        with self.lock:
+            tables = [row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            return {table: self.conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+
+    def clear(self):
+        with self.lock:
+            for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                self.conn.execute(f'DROP TABLE "{table}"')
+            self.columns.clear()
+            self.conflict_indexes.clear()
+
+
+class MockSupabaseServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer with the mock's configuration, sink and counters. Start it with
+    serve_forever() (e.g. on a background thread) and stop it with shutdown().
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address=('127.0.0.1', 0), sink=None, latency_ms=50.0, ms_per_mb=100.0, jitter=0.2,
+                 max_concurrent=16, error_rate=0.0, reject_rate=0.0, seed=None):
+        super().__init__(address, MockPostgrestHandler)
+        self.sink = sink or SqliteSink()
+        self.latency_ms = latency_ms
+        self.ms_per_mb = ms_per_mb
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reject_rate = reject_rate
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.rng = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {'requests': 0, 'request_bytes': 0, 'response_bytes': 0, 'rows_written': 0, 'rows_deleted': 0,
+                          'injected_errors': 0, 'rejected_requests': 0, 'max_request_bytes': 0}
+
+    def count(self, **increments):
+        with self.stats_lock:
+            for name, value in increments.items():
+                if name == 'max_request_bytes':
+                    self.stats[name] = max(self.stats[name], value)
+                else:
+                    self.stats[name] += value
+
+    def simulated_latency(self, body_bytes):
+        base = (self.latency_ms + self.ms_per_mb * body_bytes / MB) / 1000.0
+        with self.stats_lock:
+            factor = self.rng.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+            inject_error = self.rng.random() < self.error_rate
+        return base * factor, inject_error
+
+    def is_rejected_row(self, row):
+        """Whether a row is one of the reject_rate rows that always fail (chosen by content hash)."""
+        if self.reject_rate <= 0:
+            return False
+        digest = hashlib.blake2b(json.dumps(row, sort_keys=True, default=str).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') / 2 ** 64 < self.reject_rate
+
+
+class MockPostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, as the Supabase client reuses pooled connections
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status, payload=None):
+        body = b'' if payload is None else json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(response_bytes=len(body))
+
+    def _handle(self, handler):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.server.count(requests=1, request_bytes=len(body), max_request_bytes=len(body))
+        url = urlsplit(self.path)
+        if not url.path.startswith(REST_PREFIX) or '/' in url.path[len(REST_PREFIX):]:
+            self._send_json(404, {'code': 'PGRST125', 'message': f'Invalid path {url.path}', 'details': None, 'hint': None})
+            return
+        table_name = unquote(url.path[len(REST_PREFIX):])
+        prefer = {p.strip().partition('=')[0]: p.strip().partition('=')[2] for p in self.headers.get('Prefer', '').split(',') if p.strip()}
+        delay, inject_error = self.server.simulated_latency(len(body))
+        with self.server.slots:
+            time.sleep(delay)
+            try:
+                if inject_error:
+                    self.server.count(injected_errors=1)
+                    raise PostgrestError(500, '57014', 'canceling statement due to statement timeout (injected by mock server)')
+                status, payload = handler(table_name, parse_qsl(url.query, keep_blank_values=True), body)
+            except PostgrestError as e:
+                self._send_json(e.status, e.body)
+                return
+            except sqlite3.Error as e:
+                self._send_json(500, {'code': 'XX000', 'message': f'mock sink error: {e}', 'details': None, 'hint': None})
+                return
+        self._send_json(status, payload if prefer.get('return') == 'representation' else None)
+
+    def _insert(self, table_name, query_pairs, body):
+        try:
+            rows = json.loads(body or b'[]')
+        except json.JSONDecodeError as e:
+            raise PostgrestError(400, 'PGRST102', f'Empty or invalid json: {e}')
+        rows = rows if isinstance(rows, list) else [rows]
+        bad_rows = [row for row in rows if self.server.is_rejected_row(row)]
+        if bad_rows:
+            self.server.count(rejected_requests=1)
+            raise PostgrestError(400, '23514', f'new row for relation "{table_name}" violates check constraint "mock_rejected_row"',
+                                 f'Failing row contains {json.dumps(bad_rows[0], default=str)[:200]}.')
+        query = dict(query_pairs)
+        prefer = self.headers.get('Prefer', '')
+        resolution = next((r for r in ('merge-duplicates', 'ignore-duplicates') if f'resolution={r}' in prefer), None)
+        conflict_columns = [c.strip() for c in query['on_conflict'].split(',')] if query.get('on_conflict') else None
+        self.server.sink.insert(table_name, rows, conflict_columns, resolution)
+        self.server.count(rows_written=len(rows))
+        return 201, rows
+
+    def _delete(self, table_name, query_pairs, body):
+        where, params = filters_to_sql(query_pairs)
+        if not where:
+            raise PostgrestError(400, '21000', 'DELETE requires a WHERE clause')
+        deleted = self.server.sink.delete(table_name, where, params)
+        self.server.count(rows_deleted=len(deleted))
+        return 200, deleted
+
+    def do_POST(self):
+        self._handle(self._insert)
+
+    def do_DELETE(self):
+        self._handle(self._delete)
+
+
+def start_mock_server(**options):
+    """Starts a MockSupabaseServer on a background thread and returns it (call shutdown() when done)."""
+    server = MockSupabaseServer(**options)
+    threading.Thread(target=server.serve_forever, name='mock-supabase', daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the Supabase REST (PostgREST) insert/upsert/delete endpoints.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--sink', default=':memory:', help="SQLite file that receives the rows (default: in memory).")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Fixed latency per request.")
+    parser.add_argument('--ms-per-mb', type=float, default=100.0, help="Extra latency per MB of request body.")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Latency varies uniformly by +/- this fraction.")
+    parser.add_argument('--max-concurrent', type=int, default=16, help="Requests served at once; the rest wait.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with a (retryable) statement timeout.")
+    parser.add_argument('--reject-rate', type=float, default=0.0, help="Fraction of rows always rejected with a check constraint violation.")
+    parser.add_argument('--seed', type=int, help="Random seed for latency jitter and injected errors.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    mock_server = MockSupabaseServer((args.host, args.port), SqliteSink(args.sink), args.latency_ms, args.ms_per_mb, args.jitter,
+                                     args.max_concurrent, args.error_rate, args.reject_rate, args.seed)
+    logger.info(f"Mock Supabase REST API on {mock_server.url} (sink {args.sink}). Use SUPABASE_URL={mock_server.url} "
+                f"and any JWT-shaped SUPABASE_KEY, e.g. mock.service.role. Ctrl+C to stop.")
+    try:
+        mock_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock_server.server_close()
+        logger.info(f"Stats: {json.dumps(mock_server.stats)}")
+        logger.info(f"Rows in sink: {json.dumps(mock_server.sink.row_counts())}")
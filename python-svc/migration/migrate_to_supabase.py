@@ -1,13 +1,35 @@
 # migrate_to_supabase.py
 
 import os
+import json
+import time
+import hashlib
+import random
+import struct
 import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, time as time_of_day, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from dotenv import load_dotenv
 from pathlib import Path
 import sqlite3
 from supabase import create_client, Client
 from tqdm import tqdm
 
+try:  # Installed with supabase; only used to recognise network errors worth retrying
+    import httpx
+except ImportError:
+    httpx = None
+
+try:  # Only needed for MIGRATION_BACKEND=postgres and MIGRATION_MODE=verify
+    import psycopg
+    from psycopg import sql
+except ImportError:
+    psycopg = None
+
 # --- Configuration & Setup ---
 
 # Configure logging
@@ -25,57 +47,165 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 DEFAULT_SQLITE_PATH = Path(__file__).parent.parent.parent / "data" / "oewg_analysis_dash.db"
 SQLITE_DB_PATH = Path(os.getenv("SQLITE_DB_PATH", DEFAULT_SQLITE_PATH)).resolve()
 
-# Batch size for inserting data
-BATCH_SIZE = 500
+# "rest" inserts through the Supabase API; "postgres" bulk loads with COPY over a direct
+# PostgreSQL connection (POSTGRES_DSN, e.g. the project's "Direct connection" string).
+MIGRATION_BACKEND = os.getenv("MIGRATION_BACKEND", "rest").lower()
+POSTGRES_DSN = os.getenv("POSTGRES_DSN")
+POSTGRES_SCHEMA = os.getenv("POSTGRES_SCHEMA", "public")
+# COPY format for the postgres backend. "text" lets PostgreSQL parse every value into the column
+# type; "binary" is faster but needs SQLite values already of the column's type (e.g. not TIME as text).
+COPY_FORMAT = os.getenv("MIGRATION_COPY_FORMAT", "text").lower()
 
-# The order is important to respect foreign key constraints.
-TABLES_TO_MIGRATE = [
-    # Level 0 (no dependencies)
-    'bert_models',
-    'country',
-    'intervention',
-    'oewg_ngram_filter_phrases',
-    'oewg_ngrams_to_use',
-    'oewg_ngram_statistics',
-    'oewg_ngram_community_frequencies',
-    'oewg_ngram_cluster_from_shared_sentences',
-    'user_settings',
+# Batches are sized by their serialised JSON size rather than a row count, so a batch of
+# two-integer rows and a batch of full speeches take about as long to send. Each table starts at
+# BATCH_INITIAL_BYTES and its size is steered towards batches taking BATCH_TARGET_SECONDS, within
+# BATCH_MIN_BYTES..BATCH_MAX_BYTES and at most BATCH_MAX_ROWS rows. A target of 0 turns the
+# tuning off: every batch is then BATCH_INITIAL_BYTES.
+BATCH_TARGET_SECONDS = float(os.getenv("MIGRATION_BATCH_TARGET_SECONDS", 2.0))
+BATCH_INITIAL_BYTES = 256 * 1024
+BATCH_MIN_BYTES = 16 * 1024
+BATCH_MAX_BYTES = int(os.getenv("MIGRATION_BATCH_MAX_BYTES", 4 * 1024 * 1024))
+BATCH_MAX_ROWS = 5000
 
-    # Level 1 (dependencies on level 0)
-    'bert_topic_definition',
-    'oewg_topics',
-    'speech_sentence',
-    'wic_fellow_attendance_record',
-    'intervention_cleaned_words',
-    'intervention_photo',
-    'intervention_alternative_gender_source',
-    'analysis_ngram_community_stats',
-    'oewg_ngram_usefulness_ai_rating',
-    'analysis_ngram_clustering_silhouette_by_sentence',
-    'bert_speaker_pairwise_distance',
+# Transient failures (network errors, timeouts, 429/5xx, deadlocks) are retried up to
+# MAX_RETRIES times with full-jitter exponential backoff: a random wait of up to
+# RETRY_BASE_SECONDS * 2**attempt, capped at RETRY_MAX_SECONDS.
+MAX_RETRIES = int(os.getenv("MIGRATION_MAX_RETRIES", 5))
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+# HTTP statuses and SQLSTATE classes (08 connection, 40 rollback, 53 resources, 57 operator
+# intervention such as statement timeouts) treated as transient.
+TRANSIENT_HTTP_STATUSES = {"408", "429", "500", "502", "503", "504"}
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")
 
-    # Level 2 (dependencies on level 1)
-    'oewg_ngrams_to_topic_names',
-    'analysis_ai_labelled_topic_community_stats',
-    'sentence_topic_ai_classification_pivoted',
-    'junc_sentence_id_to_ngram_id',
-    'analysis_bert_labelled_topic_community_stats',
-    'bert_speaker_avg_topic_probability',
-    'bert_topic_keywords',
+# Rows rejected by the database for their data (SQLSTATE classes 22 data exception and 23 integrity
+# constraint violation) are isolated by splitting the failing batch in half until single rows
+# remain, and written to this JSON Lines file instead of halting. Any other error (missing table or
+# column, authentication) halts. So does a batch in which every row is rejected, or more than
+# MAX_REJECTED_ROWS rejects in one run: both point at a schema or ordering problem, not bad rows.
+REJECTS_FILE = Path(os.getenv("MIGRATION_REJECTS_FILE", Path(__file__).parent / "migration_rejects.jsonl")).resolve()
+REJECTABLE_SQLSTATE_CLASSES = ("22", "23")
+MAX_REJECTED_ROWS = int(os.getenv("MIGRATION_MAX_REJECTED_ROWS", 1000))
 
-    # Level 3 (dependencies on level 2)
-    'oewg_ngram_sentence_samples',
-    'sentence_topic_ai_classification_unpivoted',
+# Rows read from SQLite per keyset page. Together with the batch limits this bounds memory use,
+# whatever the size of the table.
+FETCH_SIZE = 5000
+
+# "full" pushes every row; "delta" only pushes rows inserted, updated or deleted since the last
+# sync, found by comparing each row's content hash with the hashes recorded in MANIFEST_FILE when
+# rows were pushed (REST backend only). A delta sync with no manifest yet pushes everything once.
+# "verify" writes nothing: it compares the SQLite tables with the target over POSTGRES_DSN.
+MIGRATION_MODE = os.getenv("MIGRATION_MODE", "full").lower()
+MANIFEST_FILE = Path(os.getenv("MIGRATION_MANIFEST_FILE", Path(__file__).parent / "migration_manifest.db")).resolve()
+# Deleted keys go in the DELETE request's query string; keep it well below common URL limits.
+DELETE_FILTER_MAX_CHARS = 4000
 
+# Verification (MIGRATION_MODE=verify): each table is split into primary key ranges of
+# VERIFY_RANGE_ROWS source rows, and a row count and hash sum per range are computed on both
+# sides, the target's by the server. Ranges that differ are split VERIFY_SPLIT_FACTOR ways until
+# they hold at most VERIFY_LEAF_ROWS rows, which are then compared row by row.
+VERIFY_RANGE_ROWS = int(os.getenv("MIGRATION_VERIFY_RANGE_ROWS", 10000))
+VERIFY_SPLIT_FACTOR = 16
+VERIFY_LEAF_ROWS = 100
+# Missing, extra and different keys listed per table in the report file (all are counted).
+VERIFY_MAX_REPORTED_KEYS = 1000
+VERIFY_REPORT_FILE = Path(os.getenv("MIGRATION_VERIFY_REPORT_FILE", Path(__file__).parent / "migration_verify_report.json")).resolve()
+
+# Progress file for resuming an interrupted migration: the last primary key committed to Supabase
+# per table. Removed once a migration completes; delete it by hand to start over from scratch.
+CHECKPOINT_FILE = Path(os.getenv("MIGRATION_CHECKPOINT_FILE", Path(__file__).parent / "migration_checkpoint.json")).resolve()
+
+# Concurrency: tables of the same dependency level are migrated in parallel by up to
+# MIGRATION_TABLE_WORKERS threads, and batch inserts (across all tables) run on up to
+# MIGRATION_INSERT_WORKERS threads sharing the Supabase client's HTTP connection pool.
+# Setting both to 1 gives the original one-table, one-batch-at-a-time behaviour.
+TABLE_WORKERS = int(os.getenv("MIGRATION_TABLE_WORKERS", 4))
+INSERT_WORKERS = int(os.getenv("MIGRATION_INSERT_WORKERS", 8))
+
+# Batches of one table in flight at once. Bounds memory for large tables (each waiting batch
+# holds up to BATCH_MAX_BYTES of rows).
+MAX_BATCHES_IN_FLIGHT_PER_TABLE = INSERT_WORKERS
+
+# Tables grouped into foreign key dependency levels. Every table only references tables of
+# earlier levels, so the tables within a level can be migrated concurrently; a level starts
+# once the previous one has completed.
+TABLE_LEVELS = [
+    # Level 0 (no dependencies)
+    [
+        'bert_models',
+        'country',
+        'intervention',
+        'oewg_ngram_filter_phrases',
+        'oewg_ngrams_to_use',
+        'oewg_ngram_statistics',
+        'oewg_ngram_community_frequencies',
+        'oewg_ngram_cluster_from_shared_sentences',
+        'user_settings',
+    ],
+    # Level 1 (dependencies on level 0)
+    [
+        'bert_topic_definition',
+        'oewg_topics',
+        'speech_sentence',
+        'wic_fellow_attendance_record',
+        'intervention_cleaned_words',
+        'intervention_photo',
+        'intervention_alternative_gender_source',
+        'analysis_ngram_community_stats',
+        'oewg_ngram_usefulness_ai_rating',
+        'analysis_ngram_clustering_silhouette_by_sentence',
+        'bert_speaker_pairwise_distance',
+    ],
+    # Level 2 (dependencies on level 1)
+    [
+        'oewg_ngrams_to_topic_names',
+        'analysis_ai_labelled_topic_community_stats',
+        'sentence_topic_ai_classification_pivoted',
+        'junc_sentence_id_to_ngram_id',
+        'analysis_bert_labelled_topic_community_stats',
+        'bert_speaker_avg_topic_probability',
+        'bert_topic_keywords',
+    ],
+    # Level 3 (dependencies on level 2)
+    [
+        'oewg_ngram_sentence_samples',
+        'sentence_topic_ai_classification_unpivoted',
+    ],
     # Level 4 (dependencies on multiple levels)
-    'bert_sentence_topic_probabilities',
+    [
+        'bert_sentence_topic_probabilities',
+    ],
 ]
 
+# The order is important to respect foreign key constraints.
+TABLES_TO_MIGRATE = [table_name for level in TABLE_LEVELS for table_name in level]
+
 # --- Validation ---
 
 def validate_config():
     """Validate that all necessary configurations are set."""
-    if not SUPABASE_URL or not SUPABASE_KEY:
+    if MIGRATION_BACKEND not in ("rest", "postgres"):
+        logger.error(f"Unknown MIGRATION_BACKEND '{MIGRATION_BACKEND}'; use 'rest' or 'postgres'.")
+        return False
+    if MIGRATION_MODE not in ("full", "delta", "verify"):
+        logger.error(f"Unknown MIGRATION_MODE '{MIGRATION_MODE}'; use 'full', 'delta' or 'verify'.")
+        return False
+    if MIGRATION_MODE == "delta" and MIGRATION_BACKEND != "rest":
+        logger.error("MIGRATION_MODE=delta is only supported with the rest backend.")
+        return False
+    # Verification aggregates on the server, which needs SQL access whatever the backend.
+    needs_postgres = MIGRATION_BACKEND == "postgres" or MIGRATION_MODE == "verify"
+    if needs_postgres:
+        if not POSTGRES_DSN:
+            logger.error("POSTGRES_DSN must be set in the .env file for the postgres backend and for MIGRATION_MODE=verify.")
+            return False
+        if psycopg is None:
+            logger.error("The postgres backend and MIGRATION_MODE=verify need psycopg: pip install 'psycopg[binary]'.")
+            return False
+    if MIGRATION_BACKEND == "postgres" and COPY_FORMAT not in ("text", "binary"):
+        logger.error(f"Unknown MIGRATION_COPY_FORMAT '{COPY_FORMAT}'; use 'text' or 'binary'.")
+        return False
+    if not needs_postgres and (not SUPABASE_URL or not SUPABASE_KEY):
         logger.error("Supabase URL and Key must be set in the .env file.")
         logger.error("Please copy .env.example to .env and fill in your credentials.")
         return False
@@ -109,90 +239,1345 @@ def get_supabase_client() -> Client:
         logger.error(f"Error initializing Supabase client: {e}")
         return None
 
+def get_postgres_connection():
+    """Open an autocommit connection to the target PostgreSQL database (postgres backend)."""
+    try:
+        conn = psycopg.connect(POSTGRES_DSN, autocommit=True)
+        logger.info(f"Successfully connected to PostgreSQL: {conn.info.host}:{conn.info.port}/{conn.info.dbname}")
+        return conn
+    except psycopg.Error as e:
+        logger.error(f"Error connecting to PostgreSQL: {e}")
+        return None
+
 # --- Data Migration Functions ---
 
-def migrate_table(sqlite_conn, supabase_client, table_name):
+class MigrationCheckpoint:
+    """
+    Per-table progress of a migration, saved to a JSON file after every committed batch:
+    {"sqlite_db": ..., "tables": {name: {"last_key": [...], "rows": n, "complete": bool}}}.
+
+    A checkpoint written for a different SQLite database is ignored. Safe to share between the
+    table worker threads.
+    """
+
+    def __init__(self, path, sqlite_db_path):
+        self.path = Path(path)
+        self.sqlite_db_path = str(sqlite_db_path)
+        self.tables = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("sqlite_db") == self.sqlite_db_path:
+                self.tables = saved.get("tables", {})
+                complete = sum(1 for state in self.tables.values() if state.get("complete"))
+                logger.info(f"Resuming from checkpoint {self.path}: {complete} tables complete, "
+                            f"{len(self.tables) - complete} partially migrated.")
+            else:
+                logger.warning(f"Ignoring checkpoint {self.path}: it was written for {saved.get('sqlite_db')}.")
+
+    def table_state(self, table_name):
+        with self._lock:
+            return dict(self.tables.get(table_name, {}))
+
+    def record_progress(self, table_name, last_key, rows):
+        self._update(table_name, {"last_key": list(last_key), "rows": rows, "complete": False})
+
+    def mark_complete(self, table_name):
+        self._update(table_name, {"complete": True})
+
+    def remove(self):
+        with self._lock:
+            self.tables = {}
+            self.path.unlink(missing_ok=True)
+
+    def _update(self, table_name, changes):
+        with self._lock:
+            self.tables.setdefault(table_name, {}).update(changes)
+            # Write-then-rename, so an interrupted run never leaves a truncated checkpoint.
+            temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"sqlite_db": self.sqlite_db_path, "tables": self.tables}, f, indent=2)
+            os.replace(temp_path, self.path)
+
+def get_primary_key_columns(table_info_rows):
+    """Primary key column names, in key order, from PRAGMA table_info rows."""
+    return [row[1] for row in sorted(table_info_rows, key=lambda row: row[5]) if row[5]]
+
+def key_predicate(key_columns, operator=">"):
+    """SQL condition comparing the key with a given key, by default selecting the rows after it (a row value for composite keys)."""
+    quoted = [f'"{c}"' for c in key_columns]
+    if len(quoted) == 1:
+        return f"{quoted[0]} {operator} ?"
+    return f"({', '.join(quoted)}) {operator} ({', '.join('?' * len(quoted))})"
+
+def iter_rows_by_key(sqlite_conn, table_name, columns, key_columns, after_key=None, page_size=FETCH_SIZE):
+    """
+    Yield the rows of table_name in key order, starting after after_key, one keyset page
+    (WHERE key > last ORDER BY key LIMIT page_size) at a time. Each page is a primary key
+    index range scan, so resuming deep into a large table costs no more than starting it.
+    """
+    select_cols_str = ", ".join([f'"{c}"' for c in columns])
+    order_by = ", ".join([f'"{c}"' for c in key_columns])
+    first_page_sql = f'SELECT {select_cols_str} FROM "{table_name}" ORDER BY {order_by} LIMIT ?'
+    next_page_sql = f'SELECT {select_cols_str} FROM "{table_name}" WHERE {key_predicate(key_columns)} ORDER BY {order_by} LIMIT ?'
+    last_key = list(after_key) if after_key else None
+    while True:
+        # fetchall() exhausts each page's cursor, so nothing is left open between pages (or if the
+        # consumer stops early, e.g. on an insert error).
+        if last_key is None:
+            rows = sqlite_conn.execute(first_page_sql, (page_size,)).fetchall()
+        else:
+            rows = sqlite_conn.execute(next_page_sql, (*last_key, page_size)).fetchall()
+        if not rows:
+            return
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_key = [rows[-1][c] for c in key_columns]
+
+def rows_to_dicts(rows, columns):
+    """Yield each sqlite3.Row as a {column: value} dict, ready for the Supabase client."""
+    for row in rows:
+        yield {col: row[col] for col in columns}
+
+def batched(items, batch_size):
+    """Yield lists of up to batch_size consecutive items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# Reused encoders: json.dumps() builds a new encoder per call whenever options are given.
+_KEY_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+_CONTENT_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def row_key(row, key_columns):
+    """A row's primary key as compact JSON, the manifest's key."""
+    return _KEY_ENCODER.encode([row[c] for c in key_columns])
+
+def row_hash(row):
+    """128-bit content hash of a row dict (column order and dict order do not matter)."""
+    return hashlib.blake2b(_CONTENT_ENCODER.encode(row).encode("utf-8"), digest_size=16).digest()
+
+class SyncManifest:
+    """
+    Content hashes of the rows last pushed to the target, per table and primary key, in a SQLite
+    file (MANIFEST_FILE). A row is only recorded once the target has committed it, so an
+    interrupted sync just pushes the unrecorded rows again next time.
+
+    The manifest belongs to one target: if it was written for another SUPABASE_URL it is cleared,
+    so the next delta sync pushes everything. Each thread opens its own connection with connect().
+    """
+
+    def __init__(self, path, target):
+        self.path = Path(path)
+        with self.connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS manifest_meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pushed_rows (
+                    table_name TEXT NOT NULL,
+                    row_key TEXT NOT NULL,
+                    row_hash BLOB NOT NULL,
+                    PRIMARY KEY (table_name, row_key)
+                ) WITHOUT ROWID
+            """)
+            recorded_target = conn.execute("SELECT value FROM manifest_meta WHERE name = 'target'").fetchone()
+            if recorded_target is not None and recorded_target[0] != target:
+                logger.warning(f"Manifest {self.path} was written for another target; clearing it, so every row is pushed.")
+                conn.execute("DELETE FROM pushed_rows")
+            conn.execute("INSERT OR REPLACE INTO manifest_meta (name, value) VALUES ('target', ?)", (target,))
+        conn.close()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def pushed_hashes(conn, table_name, keys):
+        """{row_key: row_hash} for those of keys already pushed."""
+        found = {}
+        for start in range(0, len(keys), 900):
+            chunk = keys[start:start + 900]
+            placeholders = ", ".join("?" * len(chunk))
+            found.update(conn.execute(f"SELECT row_key, row_hash FROM pushed_rows WHERE table_name = ? AND row_key IN ({placeholders})",
+                                      (table_name, *chunk)))
+        return found
+
+    @staticmethod
+    def record_pushed(conn, table_name, key_hashes):
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO pushed_rows (table_name, row_key, row_hash) VALUES (?, ?, ?)",
+                             [(table_name, key, hash_) for key, hash_ in key_hashes])
+
+    @staticmethod
+    def forget(conn, table_name, keys):
+        with conn:
+            conn.executemany("DELETE FROM pushed_rows WHERE table_name = ? AND row_key = ?", [(table_name, key) for key in keys])
+
+    @staticmethod
+    def removed_keys(conn, table_name, current_keys):
+        """Keys pushed earlier that are not in current_keys (an iterable of row_key strings), in manifest order."""
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_keys (row_key TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM temp.current_keys")
+        conn.executemany("INSERT OR IGNORE INTO temp.current_keys (row_key) VALUES (?)", ((key,) for key in current_keys))
+        removed = [row[0] for row in conn.execute(
+            "SELECT row_key FROM pushed_rows WHERE table_name = ? AND row_key NOT IN (SELECT row_key FROM temp.current_keys)",
+            (table_name,))]
+        conn.execute("DELETE FROM temp.current_keys")
+        conn.commit()
+        return removed
+
+def changed_rows(rows, table_name, key_columns, manifest_conn, pending_hashes, counts, progress):
+    """
+    Yield the rows (dicts) whose content hash differs from the manifest's, i.e. new or updated
+    since the last sync, remembering each one's hash in pending_hashes[row_key] until its batch is
+    committed. Unchanged rows only advance progress. Rows are compared FETCH_SIZE at a time.
+    """
+    for chunk in batched(rows, FETCH_SIZE):
+        keys = [row_key(row, key_columns) for row in chunk]
+        pushed = SyncManifest.pushed_hashes(manifest_conn, table_name, keys)
+        unchanged = 0
+        for row, key in zip(chunk, keys):
+            content_hash = row_hash(row)
+            previous_hash = pushed.get(key)
+            if previous_hash == content_hash:
+                unchanged += 1
+                continue
+            counts["updated" if previous_hash is not None else "inserted"] += 1
+            pending_hashes[key] = content_hash
+            yield row
+        counts["unchanged"] += unchanged
+        progress.update(unchanged)
+
+def postgrest_literal(value):
+    """A key value as a PostgREST filter literal; strings are double-quoted so commas, dots and parentheses are safe."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+def key_filter(key_columns, key_values):
+    """PostgREST condition matching one primary key (for a composite key, inside an or=(...) filter)."""
+    if len(key_columns) == 1:
+        return postgrest_literal(key_values[0])
+    return "and(" + ",".join(f"{column}.eq.{postgrest_literal(value)}" for column, value in zip(key_columns, key_values)) + ")"
+
+def delete_keys(supabase_client, table_name, key_columns, keys, result):
+    """Deletes the rows with the given row_key strings, in requests whose filters stay under DELETE_FILTER_MAX_CHARS."""
+    def send(chunk_keys, conditions):
+        def execute():
+            request = supabase_client.table(table_name).delete()
+            if len(key_columns) == 1:
+                request = request.filter(key_columns[0], "in", f"({','.join(conditions)})")
+            elif hasattr(request, "or_"):
+                request = request.or_(",".join(conditions))
+            else:  # postgrest-py before 0.11 (supabase 1.0.x) has no or_(); send the parameter it would add
+                request.params = request.params.add("or", f"({','.join(conditions)})")
+            return request.execute()
+        execute_with_retries(table_name, "deleting", len(chunk_keys), execute, result)
+        result["deleted_keys"].extend(chunk_keys)
+
+    chunk_keys, conditions, length = [], [], 0
+    for key in keys:
+        condition = key_filter(key_columns, json.loads(key))
+        if conditions and length + len(condition) + 1 > DELETE_FILTER_MAX_CHARS:
+            send(chunk_keys, conditions)
+            chunk_keys, conditions, length = [], [], 0
+        chunk_keys.append(key)
+        conditions.append(condition)
+        length += len(condition) + 1
+    if conditions:
+        send(chunk_keys, conditions)
+
+def delete_removed_rows(sqlite_conn, supabase_client, table_name, manifest, abort_event=None):
+    """
+    Delta sync, first pass: deletes from the target the rows of table_name that were pushed
+    before (according to the manifest) but no longer exist in SQLite, and forgets them. Run over
+    the dependency levels in reverse, so referencing rows go before the rows they reference.
+
+    Returns:
+        Number of rows deleted.
+    """
+    table_info = sqlite_conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+    key_columns = get_primary_key_columns(table_info)
+    if not key_columns:
+        return 0
+    if abort_event is not None and abort_event.is_set():
+        raise MigrationAborted(f"Sync of '{table_name}' stopped because another table failed.")
+    manifest_conn = manifest.connect()
+    try:
+        current_keys = (row_key(row, key_columns) for row in iter_rows_by_key(sqlite_conn, table_name, key_columns, key_columns))
+        removed = SyncManifest.removed_keys(manifest_conn, table_name, current_keys)
+        if not removed:
+            return 0
+        logger.info(f"Deleting {len(removed)} rows removed from '{table_name}' since the last sync...")
+        result = {"retries": 0, "deleted_keys": []}
+        try:
+            delete_keys(supabase_client, table_name, key_columns, removed, result)
+        finally:
+            SyncManifest.forget(manifest_conn, table_name, result["deleted_keys"])
+        return len(removed)
+    except Exception as e:
+        logger.error(f"FATAL: Error deleting removed rows from '{table_name}': {e}")
+        raise
+    finally:
+        manifest_conn.close()
+
+def delete_removed_rows_in_worker(supabase_client, table_name, manifest, abort_event):
+    """Runs delete_removed_rows on its own SQLite connection."""
+    sqlite_conn = get_sqlite_connection()
+    if sqlite_conn is None:
+        raise RuntimeError(f"Could not open the SQLite database for '{table_name}'.")
+    try:
+        return delete_removed_rows(sqlite_conn, supabase_client, table_name, manifest, abort_event)
+    finally:
+        sqlite_conn.close()
+
+class MigrationAborted(Exception):
+    """Raised in a table worker when another table of the migration has already failed."""
+
+class AdaptiveBatchSizer:
+    """
+    Batch size in serialised bytes for one table, tuned from observed latency: after each clean
+    batch (no retries or splits) the size moves towards what would have taken target_seconds at
+    the observed throughput, by at most a factor of 2 per step, within min_bytes..max_bytes.
+    With target_seconds 0 the size stays at initial_bytes.
+    """
+
+    def __init__(self, initial_bytes=BATCH_INITIAL_BYTES, min_bytes=BATCH_MIN_BYTES, max_bytes=BATCH_MAX_BYTES,
+                 target_seconds=BATCH_TARGET_SECONDS):
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.target_seconds = target_seconds
+        self.batch_bytes = min(max(initial_bytes, min_bytes), max_bytes)
+
+    def observe(self, payload_bytes, seconds):
+        if payload_bytes <= 0 or seconds <= 0 or self.target_seconds <= 0:
+            return
+        ideal_bytes = payload_bytes / seconds * self.target_seconds
+        factor = min(max(ideal_bytes / self.batch_bytes, 0.5), 2.0)
+        self.batch_bytes = int(min(max(self.batch_bytes * factor, self.min_bytes), self.max_bytes))
+
+def serialised_size(row):
+    """Approximate size of a row in the JSON request body."""
+    return len(json.dumps(row, default=str)) + 1
+
+def batched_by_size(rows, sizer, max_rows=BATCH_MAX_ROWS):
+    """
+    Yield (batch, payload bytes) with batches filled up to sizer.batch_bytes (read as each batch
+    starts, so later batches follow the sizer) and max_rows. A single row larger than the limit
+    becomes a batch on its own.
+    """
+    batch, batch_bytes, limit = [], 2, sizer.batch_bytes
+    for row in rows:
+        row_bytes = serialised_size(row)
+        if batch and (batch_bytes + row_bytes > limit or len(batch) >= max_rows):
+            yield batch, batch_bytes
+            batch, batch_bytes, limit = [], 2, sizer.batch_bytes
+        batch.append(row)
+        batch_bytes += row_bytes
+    if batch:
+        yield batch, batch_bytes
+
+def is_transient_error(error):
+    """Whether an error from the Supabase client is worth retrying as-is (network, timeout, overload, deadlock)."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    code = str(getattr(error, "code", "") or "")
+    return code in TRANSIENT_HTTP_STATUSES or code.startswith(TRANSIENT_SQLSTATE_CLASSES)
+
+def is_row_data_error(error):
+    """
+    Whether an error from the Supabase client blames the rows sent (SQLSTATE class 22 or 23, as
+    PostgREST passes it through in a 400 response) rather than the request, schema or credentials.
+    PostgREST's own codes (PGRST...) and bare HTTP statuses are not row errors.
+    """
+    code = str(getattr(error, "code", "") or "")
+    return len(code) == 5 and code.startswith(REJECTABLE_SQLSTATE_CLASSES)
+
+class TooManyRejectedRows(Exception):
+    """Raised when rejected rows suggest a systematic failure rather than a few bad rows."""
+
+class RejectsLog:
+    """
+    Appends rejected rows to a JSON Lines file ({"table", "row", "error"} per line); thread-safe.
+    Raises TooManyRejectedRows once more than max_rows rows have been written.
+    """
+
+    def __init__(self, path, max_rows=None):
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, table_name, row, error):
+        line = json.dumps({"table": table_name, "row": row, "error": str(error)}, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.count += 1
+            count = self.count
+        if self.max_rows is not None and count > self.max_rows:
+            raise TooManyRejectedRows(f"More than {self.max_rows} rows rejected (MIGRATION_MAX_REJECTED_ROWS); see {self.path}.")
+
+def execute_with_retries(table_name, action, n_rows, execute, result):
+    """Runs execute(), retrying transient errors with jittered exponential backoff (counted in result['retries'])."""
+    attempt = 0
+    while True:
+        try:
+            return execute()
+        except Exception as e:
+            if attempt >= MAX_RETRIES or not is_transient_error(e):
+                raise
+            delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+            attempt += 1
+            result["retries"] += 1
+            logger.warning(f"Transient error {action} {n_rows} rows of '{table_name}' "
+                           f"(attempt {attempt}/{MAX_RETRIES}): {e}. Retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+def upsert_isolating_rejects(supabase_client, table_name, rows, on_conflict, result, rejects):
+    """
+    Upserts rows; if the database rejects the batch for its data, splits it in half and retries each
+    half, down to single rows, which are written to rejects (and listed in result['rejected_rows']).
+    Any other error, and any error when rejects is None, is re-raised.
+    """
+    try:
+        execute_with_retries(table_name, "upserting", len(rows),
+                             lambda: supabase_client.table(table_name).upsert(rows, on_conflict=on_conflict).execute(), result)
+    except Exception as e:
+        if rejects is None or not is_row_data_error(e):
+            raise
+        result["splits"] += 1
+        if len(rows) == 1:
+            logger.warning(f"Rejected row in '{table_name}' (written to {rejects.path}): {e}")
+            rejects.write(table_name, rows[0], e)
+            result["rejected"] += 1
+            result["rejected_rows"].append(rows[0])
+            return
+        middle = len(rows) // 2
+        upsert_isolating_rejects(supabase_client, table_name, rows[:middle], on_conflict, result, rejects)
+        upsert_isolating_rejects(supabase_client, table_name, rows[middle:], on_conflict, result, rejects)
+
+def upsert_batch(supabase_client, table_name, batch, key_columns, payload_bytes=0, rejects=None):
+    """
+    Upsert one batch on its primary key. Returns {'rows', 'bytes', 'seconds', 'retries', 'splits',
+    'rejected', 'rejected_rows'}. Any error that is neither retried away nor isolated to rejected rows is logged and
+    re-raised to halt the migration.
+    """
+    result = {"rows": len(batch), "bytes": payload_bytes, "seconds": 0.0, "retries": 0, "splits": 0, "rejected": 0, "rejected_rows": []}
+    started = time.perf_counter()
+    try:
+        # Upserting rather than inserting makes resending rows after an interruption harmless.
+        upsert_isolating_rejects(supabase_client, table_name, batch, ",".join(key_columns), result, rejects)
+        if len(batch) > 1 and result["rejected"] == len(batch):
+            raise TooManyRejectedRows(f"All {len(batch)} rows of the batch were rejected; see {rejects.path}.")
+    except Exception as e:
+        logger.error(f"FATAL: Error upserting batch for '{table_name}': {e}")
+        logger.error(f"Halting migration. Problematic batch starts with: {batch[0] if batch else 'N/A'}")
+        raise  # Re-raise the exception to halt the entire migration
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def format_throughput(stats):
+    """'rows, MB, seconds (rows/s, MB/s)' for a table's migration stats."""
+    seconds = max(stats["seconds"], 1e-9)
+    text = f"{stats['rows']} rows in {stats['seconds']:.1f}s ({stats['rows'] / seconds:,.0f} rows/s"
+    if stats.get("bytes") is not None:
+        megabytes = stats["bytes"] / (1024 * 1024)
+        text += f", {megabytes:.1f} MB at {megabytes / seconds:.2f} MB/s"
+    return text + ")"
+
+def migrate_table(sqlite_conn, supabase_client, table_name, insert_executor=None, abort_event=None, checkpoint=None, rejects=None,
+                  manifest=None):
     """
     A generic function to migrate data from a table, assuming table and column names match.
     PKs are preserved from SQLite. This function is designed to be "all or nothing"
     and will raise an exception on the first error, halting the migration.
+
+    Rows are streamed in primary key order (keyset page -> dict -> batch) and upserted on the
+    primary key, so only one page and a bounded number of batches are held in memory at a time.
+    Batches are sized in bytes by an AdaptiveBatchSizer. With an insert_executor, up to
+    MAX_BATCHES_IN_FLIGHT_PER_TABLE batches are upserted concurrently; without one, batches are
+    upserted one after another. abort_event (set when another table failed) stops the table
+    between batches.
+
+    With a checkpoint, the table restarts after the last key recorded there (or is skipped when
+    complete), and the key of each batch is recorded once it and every batch before it are
+    committed. With rejects, rows the database refuses are logged there instead of halting.
+
+    With a manifest (delta sync), only rows whose content hash differs from the one recorded when
+    they were last pushed are sent, and the hashes of each committed batch are recorded.
+
+    Returns:
+        Stats dict ('rows', 'bytes', 'seconds', 'retries', 'rejected'; with a manifest also
+        'inserted', 'updated', 'unchanged') for this run, or None if the table was skipped.
     """
     logger.info(f"--- Starting migration for '{table_name}' table ---")
     cursor = sqlite_conn.cursor()
+    in_flight = {}  # future -> batch sequence number
+    manifest_conn = manifest.connect() if manifest else None
 
     try:
+        state = checkpoint.table_state(table_name) if checkpoint else {}
+        if state.get("complete"):
+            logger.info(f"Skipping '{table_name}': already migrated according to the checkpoint.")
+            return None
+
         # Get column names from SQLite
         cursor.execute(f'PRAGMA table_info("{table_name}")')
-        columns = [row[1] for row in cursor.fetchall()]
+        table_info = cursor.fetchall()
+        columns = [row[1] for row in table_info]
         if not columns:
             logger.warning(f"Table '{table_name}' not found or has no columns in SQLite DB. Skipping.")
-            return
-
-        select_cols_str = ", ".join([f'"{c}"' for c in columns])
-        cursor.execute(f"SELECT {select_cols_str} FROM \"{table_name}\"")
+            return None
+        key_columns = get_primary_key_columns(table_info)
+        if not key_columns:
+            raise ValueError(f"Table '{table_name}' has no primary key; it cannot be read in key order or upserted.")
 
-        rows = cursor.fetchall()
-        if not rows:
+        after_key = state.get("last_key")
+        rows_done = state.get("rows", 0) if after_key else 0
+        if after_key:
+            cursor.execute(f'SELECT COUNT(*) FROM "{table_name}" WHERE {key_predicate(key_columns)}', after_key)
+        else:
+            cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"')
+        remaining_rows = cursor.fetchone()[0]
+        stats = {"rows": 0, "bytes": 0, "seconds": 0.0, "retries": 0, "rejected": 0}
+        if manifest:
+            stats.update({"inserted": 0, "updated": 0, "unchanged": 0})
+        if not remaining_rows:
             logger.info(f"No data to migrate for '{table_name}'.")
-            return
+            if checkpoint:
+                checkpoint.mark_complete(table_name)
+            return stats
 
-        items_to_insert = []
-        for row in rows:
-            item = {col: row[col] for col in columns}
-            items_to_insert.append(item)
+        if after_key:
+            logger.info(f"Resuming '{table_name}' after key {after_key}: {remaining_rows} items left ({rows_done} already migrated).")
+        sizer = AdaptiveBatchSizer()
+        verb = "Comparing" if manifest else "Upserting"
+        logger.info(f"{verb} {remaining_rows} items {'with' if manifest else 'into'} '{table_name}' in batches of about {sizer.batch_bytes // 1024} KB "
+                    f"(adapted towards {sizer.target_seconds:g}s per batch)...")
+        started = time.perf_counter()
 
-        if not items_to_insert:
-            logger.info(f"No transformed data to migrate for '{table_name}'.")
-            return
+        # Batches can finish out of order; the checkpoint only advances over the unbroken run of
+        # committed batches, so a resumed run never skips a batch that did not make it.
+        batch_last_keys = {}
+        batch_rows = {}
+        batch_hashes = {}  # delta sync: sequence -> [(row_key, row_hash)] to record once committed
+        pending_hashes = {}
+        committed = set()
+        next_to_record = 0
 
-        logger.info(f"Inserting {len(items_to_insert)} items into '{table_name}' in batches of {BATCH_SIZE}...")
-        for i in tqdm(range(0, len(items_to_insert), BATCH_SIZE), desc=f"Inserting into {table_name}"):
-            batch = items_to_insert[i:i + BATCH_SIZE]
-            try:
-                # Using insert directly. Any errors will be caught and will halt the script.
-                supabase_client.table(table_name).insert(batch).execute()
-            except Exception as e:
-                logger.error(f"FATAL: Error inserting batch for '{table_name}': {e}")
-                logger.error(f"Halting migration. Problematic batch starts with: {batch[0] if batch else 'N/A'}")
-                raise  # Re-raise the exception to halt the entire migration
+        def record_committed(sequence, result):
+            nonlocal next_to_record, rows_done
+            # Only the rows the target accepted count as migrated.
+            stats["rows"] += result["rows"] - result["rejected"]
+            for key in ("bytes", "retries", "rejected"):
+                stats[key] += result[key]
+            if not (result["retries"] or result["splits"]):
+                sizer.observe(result["bytes"], result["seconds"])
+            if manifest:
+                # Rejected rows stay unrecorded, so the next sync tries them again.
+                rejected_keys = {row_key(row, key_columns) for row in result["rejected_rows"]}
+                SyncManifest.record_pushed(manifest_conn, table_name,
+                                           [(key, hash_) for key, hash_ in batch_hashes.pop(sequence) if key not in rejected_keys])
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            progress.update(result["rows"])
+            progress.set_postfix(batch_kb=sizer.batch_bytes // 1024, mb_s=f"{stats['bytes'] / elapsed / (1024 * 1024):.2f}",
+                                 retries=stats["retries"], rejected=stats["rejected"])
+            committed.add(sequence)
+            last_key = None
+            while next_to_record in committed:
+                committed.discard(next_to_record)
+                last_key = batch_last_keys.pop(next_to_record)
+                rows_done += batch_rows.pop(next_to_record)
+                next_to_record += 1
+            if checkpoint and last_key is not None:
+                checkpoint.record_progress(table_name, last_key, rows_done)
+
+        with tqdm(total=rows_done + remaining_rows, initial=rows_done, unit="rows", desc=f"{verb} {table_name}") as progress:
+            rows = rows_to_dicts(iter_rows_by_key(sqlite_conn, table_name, columns, key_columns, after_key), columns)
+            if manifest:
+                rows = changed_rows(rows, table_name, key_columns, manifest_conn, pending_hashes, stats, progress)
+            for sequence, (batch, payload_bytes) in enumerate(batched_by_size(rows, sizer)):
+                if abort_event is not None and abort_event.is_set():
+                    raise MigrationAborted(f"Migration of '{table_name}' stopped because another table failed.")
+                batch_last_keys[sequence] = [batch[-1][c] for c in key_columns]
+                batch_rows[sequence] = len(batch)
+                if manifest:
+                    batch_hashes[sequence] = [(key, pending_hashes.pop(key)) for key in (row_key(row, key_columns) for row in batch)]
+                if insert_executor is None:
+                    record_committed(sequence, upsert_batch(supabase_client, table_name, batch, key_columns, payload_bytes, rejects))
+                    continue
+                if len(in_flight) >= MAX_BATCHES_IN_FLIGHT_PER_TABLE:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record_committed(in_flight.pop(future), future.result())
+                in_flight[insert_executor.submit(upsert_batch, supabase_client, table_name, batch, key_columns, payload_bytes, rejects)] = sequence
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record_committed(in_flight.pop(future), future.result())
 
-        logger.info(f"✅ Successfully finished migration for '{table_name}'.")
+        stats["seconds"] = time.perf_counter() - started
+        if checkpoint:
+            checkpoint.mark_complete(table_name)
+        if manifest:
+            logger.info(f"'{table_name}': {stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged rows.")
+        logger.info(f"✅ Successfully finished migration for '{table_name}': {format_throughput(stats)}, "
+                    f"{stats['retries']} retries, {stats['rejected']} rejected rows.")
+        return stats
 
+    except MigrationAborted:
+        raise
     except sqlite3.OperationalError as e:
         logger.error(f"FATAL: Error accessing table '{table_name}' in SQLite: {e}. Halting migration.")
         raise
     except Exception as e:
         logger.error(f"FATAL: An unexpected error occurred during migration of '{table_name}': {e}")
         raise
+    finally:
+        # After an error, drop the batches not yet started and let the running ones finish.
+        for future in in_flight:
+            future.cancel()
+        wait(in_flight)
+        cursor.close()
+        if manifest_conn is not None:
+            manifest_conn.close()
+
+def migrate_table_in_worker(supabase_client, table_name, insert_executor, abort_event, checkpoint, rejects=None, manifest=None):
+    """Runs migrate_table on its own SQLite connection (sqlite3 connections are per thread)."""
+    sqlite_conn = get_sqlite_connection()
+    if sqlite_conn is None:
+        raise RuntimeError(f"Could not open the SQLite database for '{table_name}'.")
+    try:
+        return migrate_table(sqlite_conn, supabase_client, table_name, insert_executor, abort_event, checkpoint, rejects, manifest)
+    finally:
+        sqlite_conn.close()
+
+def get_target_columns(pg_cursor, schema, table_name):
+    """(column name, type oid, type name) of a PostgreSQL table, in column order; empty if the table does not exist."""
+    pg_cursor.execute("""
+        SELECT a.attname, a.atttypid, t.typname
+        FROM pg_attribute a
+        JOIN pg_type t ON t.oid = a.atttypid
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s AND c.relkind = 'r' AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum
+    """, (schema, table_name))
+    return pg_cursor.fetchall()
+
+def get_secondary_indexes(pg_cursor, schema, table_name):
+    """(index name, CREATE INDEX statement) of the indexes not backing a constraint (PK, UNIQUE, EXCLUDE)."""
+    pg_cursor.execute("""
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = %s AND t.relname = %s
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = x.indexrelid)
+    """, (schema, table_name))
+    return pg_cursor.fetchall()
+
+def sync_serial_sequences(pg_cursor, schema, table_name):
+    """Moves the sequences of serial/identity columns past the copied ids, so later inserts don't collide."""
+    pg_cursor.execute("""
+        SELECT a.attname, pg_get_serial_sequence(format('%%I.%%I', %s::text, %s::text), a.attname)
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s AND a.attnum > 0 AND NOT a.attisdropped
+    """, (schema, table_name, schema, table_name))
+    for column, sequence in [row for row in pg_cursor.fetchall() if row[1]]:
+        pg_cursor.execute(sql.SQL("SELECT setval(%s, COALESCE(MAX({}), 0) + 1, false) FROM {}").format(
+            sql.Identifier(column), sql.Identifier(schema, table_name)), (sequence,))
+
+def copy_table(sqlite_conn, pg_conn, table_name, abort_event=None, checkpoint=None, copy_format=COPY_FORMAT, schema=POSTGRES_SCHEMA):
+    """
+    Bulk loads a table into PostgreSQL with COPY ... FROM STDIN, assuming table and column names
+    match (columns case-insensitively, as unquoted PostgreSQL names are folded to lower case).
+    PKs are preserved from SQLite.
+
+    The whole load is one transaction on pg_conn (which must be in autocommit mode): the target
+    must be empty, its secondary indexes are dropped, the rows are streamed in primary key order,
+    the indexes are rebuilt and serial sequences moved past the copied ids. A failure rolls all of
+    it back, so a rerun starts the table again; the checkpoint only records completed tables.
+    ANALYZE runs after the commit so the planner sees the new data.
+
+    Returns:
+        Stats dict ('rows', 'seconds'; 'bytes' is None as COPY sizes are not measured), or None if
+        the table was skipped.
+    """
+    logger.info(f"--- Starting COPY for '{table_name}' table ---")
+    if checkpoint and checkpoint.table_state(table_name).get("complete"):
+        logger.info(f"Skipping '{table_name}': already migrated according to the checkpoint.")
+        return None
+    table_identifier = sql.Identifier(schema, table_name)
+
+    try:
+        table_info = sqlite_conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        columns = [row[1] for row in table_info]
+        if not columns:
+            logger.warning(f"Table '{table_name}' not found or has no columns in SQLite DB. Skipping.")
+            return None
+        key_columns = get_primary_key_columns(table_info)
+        if not key_columns:
+            raise ValueError(f"Table '{table_name}' has no primary key; it cannot be read in key order.")
+        started = time.perf_counter()
+        total_rows = sqlite_conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+        with pg_conn.transaction(), pg_conn.cursor() as pg_cursor:
+            target_columns = {name.lower(): (name, type_oid) for name, type_oid, _ in get_target_columns(pg_cursor, schema, table_name)}
+            if not target_columns:
+                raise ValueError(f"Table '{schema}.{table_name}' does not exist in PostgreSQL.")
+            missing = [c for c in columns if c.lower() not in target_columns]
+            if missing:
+                raise ValueError(f"Columns {missing} of '{table_name}' do not exist in '{schema}.{table_name}'.")
+            pg_cursor.execute(sql.SQL("SELECT EXISTS (SELECT 1 FROM {})").format(table_identifier))
+            if pg_cursor.fetchone()[0]:
+                raise RuntimeError(f"'{schema}.{table_name}' already contains rows; COPY only loads into empty tables.")
+            if not total_rows:
+                logger.info(f"No data to migrate for '{table_name}'.")
+            else:
+                indexes = get_secondary_indexes(pg_cursor, schema, table_name)
+                for index_name, _ in indexes:
+                    pg_cursor.execute(sql.SQL("DROP INDEX {}").format(sql.Identifier(schema, index_name)))
+
+                copy_statement = sql.SQL("COPY {} ({}) FROM STDIN{}").format(
+                    table_identifier,
+                    sql.SQL(", ").join(sql.Identifier(target_columns[c.lower()][0]) for c in columns),
+                    sql.SQL(" (FORMAT BINARY)" if copy_format == "binary" else ""))
+                logger.info(f"Copying {total_rows} items into '{table_name}' ({copy_format} format, "
+                            f"{len(indexes)} secondary indexes dropped for the load)...")
+                with tqdm(total=total_rows, unit="rows", desc=f"Copying into {table_name}") as progress, \
+                     pg_cursor.copy(copy_statement) as copy:
+                    if copy_format == "binary":
+                        copy.set_types([target_columns[c.lower()][1] for c in columns])
+                    rows = iter_rows_by_key(sqlite_conn, table_name, columns, key_columns)
+                    for chunk in batched(rows, FETCH_SIZE):
+                        if abort_event is not None and abort_event.is_set():
+                            raise MigrationAborted(f"Migration of '{table_name}' stopped because another table failed.")
+                        for row in chunk:
+                            copy.write_row(tuple(row))
+                        progress.update(len(chunk))
+
+                for index_name, index_definition in indexes:
+                    logger.info(f"Rebuilding index '{index_name}' on '{table_name}'...")
+                    pg_cursor.execute(index_definition)
+                sync_serial_sequences(pg_cursor, schema, table_name)
+
+        with pg_conn.cursor() as pg_cursor:
+            pg_cursor.execute(sql.SQL("ANALYZE {}").format(table_identifier))
+        if checkpoint:
+            checkpoint.mark_complete(table_name)
+        stats = {"rows": total_rows, "bytes": None, "seconds": time.perf_counter() - started, "retries": 0, "rejected": 0}
+        logger.info(f"✅ Successfully finished migration for '{table_name}': {format_throughput(stats)}.")
+        return stats
+
+    except MigrationAborted:
+        raise
+    except sqlite3.OperationalError as e:
+        logger.error(f"FATAL: Error accessing table '{table_name}' in SQLite: {e}. Halting migration.")
+        raise
+    except Exception as e:
+        logger.error(f"FATAL: An unexpected error occurred during COPY of '{table_name}': {e}")
+        raise
+
+def copy_table_in_worker(postgres_dsn, table_name, abort_event, checkpoint):
+    """Runs copy_table on its own SQLite and PostgreSQL connections."""
+    sqlite_conn = get_sqlite_connection()
+    if sqlite_conn is None:
+        raise RuntimeError(f"Could not open the SQLite database for '{table_name}'.")
+    try:
+        with psycopg.connect(postgres_dsn, autocommit=True) as pg_conn:
+            return copy_table(sqlite_conn, pg_conn, table_name, abort_event, checkpoint)
+    finally:
+        sqlite_conn.close()
+
+def migrate_levels(migrate_one_table, table_levels=TABLE_LEVELS, table_workers=TABLE_WORKERS):
+    """
+    Migrates table_levels in order, the tables of each level concurrently, by calling
+    migrate_one_table(table_name, abort_event) on up to table_workers threads. The next level
+    starts only once every table of the current one has completed. On the first failure
+    abort_event is set, so the remaining tables stop between batches, and the error is re-raised.
+
+    Returns:
+        {table_name: what migrate_one_table returned}, in migration order.
+    """
+    results = {}
+    abort_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=table_workers, thread_name_prefix="table") as table_executor:
+        for level_number, tables in enumerate(table_levels):
+            logger.info(f"=== Level {level_number}: migrating {len(tables)} tables ({min(table_workers, len(tables))} at a time) ===")
+            futures = {table_executor.submit(migrate_one_table, table_name, abort_event): table_name for table_name in tables}
+            first_error = None
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue  # Tables cancelled after the first failure never ran.
+                    error = future.exception()
+                    if error is None:
+                        results[futures[future]] = future.result()
+                    elif first_error is None and not isinstance(error, MigrationAborted):
+                        first_error = error
+                        abort_event.set()
+                        for waiting in pending:
+                            waiting.cancel()
+            if first_error is not None:
+                raise first_error
+            logger.info(f"=== Level {level_number} complete ===")
+    return {table_name: results[table_name] for tables in table_levels for table_name in tables if table_name in results}
+
+def migrate_levels_rest(supabase_client, checkpoint=None, table_levels=TABLE_LEVELS, table_workers=TABLE_WORKERS, insert_workers=INSERT_WORKERS,
+                        rejects=None, manifest=None):
+    """migrate_levels through the Supabase API, batch inserts shared out over insert_workers threads."""
+    with ThreadPoolExecutor(max_workers=insert_workers, thread_name_prefix="insert") as insert_executor:
+        return migrate_levels(
+            lambda table_name, abort_event: migrate_table_in_worker(supabase_client, table_name, insert_executor, abort_event, checkpoint,
+                                                                    rejects, manifest),
+            table_levels, table_workers)
+
+def sync_levels_rest(supabase_client, manifest, table_levels=TABLE_LEVELS, table_workers=TABLE_WORKERS, insert_workers=INSERT_WORKERS,
+                     rejects=None):
+    """
+    Delta sync through the Supabase API: deletes removed rows level by level in reverse dependency
+    order, then pushes new and updated rows level by level. Returns migrate_levels_rest's stats with
+    each table's 'deleted' count added.
+    """
+    logger.info("--- Deleting rows removed since the last sync ---")
+    deleted = migrate_levels(
+        lambda table_name, abort_event: delete_removed_rows_in_worker(supabase_client, table_name, manifest, abort_event),
+        list(reversed(table_levels)), table_workers)
+    logger.info("--- Pushing new and updated rows ---")
+    table_stats = migrate_levels_rest(supabase_client, None, table_levels, table_workers, insert_workers, rejects, manifest)
+    for table_name, stats in table_stats.items():
+        if stats:
+            stats["deleted"] = deleted.get(table_name, 0)
+    return table_stats
+
+def format_table_report(table_stats):
+    """One line per migrated table with its throughput (and, for a delta sync, its changes), slowest first."""
+    delta = any("inserted" in stats for stats in table_stats.values())
+    header = f"{'table':<50}{'rows':>11}{'MB':>9}{'seconds':>9}{'rows/s':>10}{'MB/s':>8}{'retries':>9}{'rejected':>10}"
+    lines = [header + (f"{'new':>9}{'updated':>9}{'deleted':>9}{'unchanged':>11}" if delta else "")]
+    for table_name, stats in sorted(table_stats.items(), key=lambda item: item[1]["seconds"], reverse=True):
+        seconds = max(stats["seconds"], 1e-9)
+        megabytes = f"{stats['bytes'] / (1024 * 1024):.1f}" if stats.get("bytes") is not None else "-"
+        mb_per_second = f"{stats['bytes'] / (1024 * 1024) / seconds:.2f}" if stats.get("bytes") is not None else "-"
+        line = (f"{table_name:<50}{stats['rows']:>11}{megabytes:>9}{stats['seconds']:>9.1f}{stats['rows'] / seconds:>10,.0f}"
+                f"{mb_per_second:>8}{stats['retries']:>9}{stats['rejected']:>10}")
+        if delta:
+            line += (f"{stats.get('inserted', 0):>9}{stats.get('updated', 0):>9}{stats.get('deleted', 0):>9}"
+                     f"{stats.get('unchanged', 0):>11}")
+        lines.append(line)
+    return "\n".join(lines)
+
+def migrate_levels_postgres(postgres_dsn, checkpoint=None, table_levels=TABLE_LEVELS, table_workers=TABLE_WORKERS):
+    """migrate_levels with COPY over direct PostgreSQL connections (one per table worker)."""
+    return migrate_levels(
+        lambda table_name, abort_event: copy_table_in_worker(postgres_dsn, table_name, abort_event, checkpoint),
+        table_levels, table_workers)
+
+# --- Verification ---
+
+# Target column types compared by a canonical text form (see canonical_value); any other type is
+# compared as its PostgreSQL text output against str() of the SQLite value.
+_TEXT_KEY_TYPES = ("text", "varchar", "bpchar")
+_NULL_MARKER = "\\N"
+_JSONB_ESCAPES = {'"': '\\"', "\\": "\\\\", "\b": "\\b", "\f": "\\f", "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+def canonical_value(value, type_name, time_zone=timezone.utc):
+    """
+    Text form of a SQLite value once stored in a PostgreSQL column of type type_name, equal to
+    what target_canonical_sql computes on the server: floats as their IEEE 754 bytes in hex (text
+    output differs between Python and PostgreSQL for some doubles), times and timestamps with
+    microseconds (timestamptz in UTC; naive source values are read in time_zone, the server's
+    TimeZone, as they were when loaded), json and jsonb as jsonb prints them (jsonb_text). Values
+    that cannot be converted keep their str() form, so they show up as different rows.
+    """
+    if value is None:
+        return None
+    try:
+        if type_name in ("int2", "int4", "int8"):
+            return str(int(value))
+        if type_name == "float8":
+            return struct.pack(">d", float(value)).hex()
+        if type_name == "float4":
+            return struct.pack(">f", float(value)).hex()
+        if type_name == "numeric":
+            return format(Decimal(str(value)).normalize(), "f")
+        if type_name == "bool":
+            if isinstance(value, str):
+                value = value.strip().lower() in ("t", "true", "y", "yes", "on", "1")
+            return "true" if value else "false"
+        if type_name == "time":
+            parsed = time_of_day.fromisoformat(str(value))
+            return f"{parsed:%H:%M:%S}.{parsed.microsecond:06d}"
+        if type_name == "date":
+            return date.fromisoformat(str(value)).isoformat()
+        if type_name == "timestamp":
+            parsed = datetime.fromisoformat(str(value))
+            return f"{parsed:%Y-%m-%d %H:%M:%S}.{parsed.microsecond:06d}"
+        if type_name == "timestamptz":
+            parsed = datetime.fromisoformat(str(value))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=time_zone)
+            parsed = parsed.astimezone(timezone.utc)
+            return f"{parsed:%Y-%m-%d %H:%M:%S}.{parsed.microsecond:06d}"
+        if type_name == "bytea" and isinstance(value, bytes):
+            return "\\x" + value.hex()
+        if type_name in ("json", "jsonb"):
+            return jsonb_text(json.loads(value, parse_int=Decimal, parse_float=Decimal, parse_constant=_reject_json_constant))
+    except (ValueError, TypeError, OverflowError, ArithmeticError):
+        pass
+    return str(value)
+
+def _reject_json_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+def _jsonb_string(text):
+    """A string as jsonb's text output escapes it: only quotes, backslashes and control characters."""
+    escaped = []
+    for char in text:
+        if char in _JSONB_ESCAPES:
+            escaped.append(_JSONB_ESCAPES[char])
+        elif char < " ":
+            escaped.append(f"\\u{ord(char):04x}")
+        else:
+            escaped.append(char)
+    return '"' + "".join(escaped) + '"'
+
+def jsonb_text(value):
+    """
+    A parsed JSON value (numbers as Decimal) in the text form of PostgreSQL's jsonb output, i.e.
+    what target_canonical_sql reads as column::jsonb::text: object keys shorter first, then
+    bytewise, the last of duplicate keys kept; ", " and ": " separators; numbers as numeric prints
+    them (scale kept, exponent expanded).
+    """
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, Decimal):
+        text = format(value, "f")
+        return text.lstrip("-") if value.is_zero() else text
+    if isinstance(value, str):
+        return _jsonb_string(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(jsonb_text(item) for item in value) + "]"
+    keys = sorted(value, key=lambda key: (len(key.encode("utf-8")), key.encode("utf-8")))
+    return "{" + ", ".join(f"{_jsonb_string(key)}: {jsonb_text(value[key])}" for key in keys) + "}"
+
+def sqlite_key_value(value, time_zone=timezone.utc):
+    """
+    A key value read from PostgreSQL (by psycopg) in the form SQLite holds it, so that keys found in
+    the target can bound ranges on both sides: numerics as int or float, UUIDs as text, dates and
+    times as ISO text (timestamps with a space, as sqlite3 stores datetimes; timestamptz values in
+    time_zone and without offset, like the naive source values canonical_value reads in it).
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(time_zone).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+    if isinstance(value, (date, time_of_day)):
+        return value.isoformat()
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return value
+
+def target_canonical_sql(column_name, type_name):
+    """PostgreSQL expression giving canonical_value's text form of a column."""
+    column = sql.Identifier(column_name)
+    if type_name in ("float8", "float4"):
+        return sql.SQL("encode({}({}), 'hex')").format(sql.SQL(f"{type_name}send"), column)
+    if type_name == "numeric":
+        return sql.SQL("trim_scale({})::text").format(column)
+    if type_name == "time":
+        return sql.SQL("to_char({}, 'HH24:MI:SS.US')").format(column)
+    if type_name == "date":
+        return sql.SQL("to_char({}, 'YYYY-MM-DD')").format(column)
+    if type_name == "timestamp":
+        return sql.SQL("to_char({}, 'YYYY-MM-DD HH24:MI:SS.US')").format(column)
+    if type_name == "timestamptz":
+        return sql.SQL("to_char({} AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS.US')").format(column)
+    if type_name in ("json", "jsonb"):
+        return sql.SQL("{}::jsonb::text").format(column)
+    return sql.SQL("{}::text").format(column)
+
+def canonical_row_text(values):
+    """Canonical values joined unambiguously: each as length:text, NULL as \\N."""
+    return "".join(_NULL_MARKER if value is None else f"{len(value)}:{value}" for value in values)
+
+def hash_prefix_value(row_md5):
+    """First 60 bits of an md5 hex digest, the per-row term of a range's hash sum."""
+    return int(row_md5[:15], 16)
+
+class TableVerifier:
+    """
+    Compares a table in SQLite with its copy in PostgreSQL by primary key range, without moving
+    the rows. Each row is reduced to the md5 of its values in a canonical text form both sides can
+    produce, and a range's digest is (row count, sum of the first 60 bits of its row hashes): the
+    sum does not depend on row order, so the server computes the target's digest in one aggregate
+    query and only two numbers cross the network per range.
+
+    Ranges are half-open key intervals (low, high], None meaning unbounded, so together they cover
+    the whole key space and rows that only exist in the target are found too. Text key columns
+    are compared with COLLATE "C" in PostgreSQL, which orders like SQLite's default BINARY
+    collation (in a database with another collation the primary key index cannot serve these
+    range conditions, so text-keyed tables are scanned once per range).
+    """
+
+    def __init__(self, sqlite_conn, pg_conn, table_name, schema=POSTGRES_SCHEMA, time_zone=timezone.utc):
+        self.sqlite_conn = sqlite_conn
+        self.pg_conn = pg_conn
+        self.table_name = table_name
+        self.time_zone = time_zone
+
+        table_info = sqlite_conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        self.columns = [row[1] for row in table_info]
+        if not self.columns:
+            raise ValueError(f"Table '{table_name}' not found or has no columns in SQLite DB.")
+        self.key_columns = get_primary_key_columns(table_info)
+        if not self.key_columns:
+            raise ValueError(f"Table '{table_name}' has no primary key; it cannot be compared by key range.")
+        with pg_conn.cursor() as pg_cursor:
+            target_columns = {name.lower(): (name, type_name) for name, _, type_name in get_target_columns(pg_cursor, schema, table_name)}
+        if not target_columns:
+            raise ValueError(f"Table '{schema}.{table_name}' does not exist in PostgreSQL.")
+        missing = [c for c in self.columns if c.lower() not in target_columns]
+        if missing:
+            raise ValueError(f"Columns {missing} of '{table_name}' do not exist in '{schema}.{table_name}'.")
+        self.types = [target_columns[c.lower()][1] for c in self.columns]
+        self.key_types = [target_columns[c.lower()][1] for c in self.key_columns]
+        self.key_positions = [self.columns.index(c) for c in self.key_columns]
+
+        select_cols_str = ", ".join([f'"{c}"' for c in self.columns])
+        self._source_order_by = ", ".join([f'"{c}"' for c in self.key_columns])
+        self._source_select = f'SELECT {select_cols_str} FROM "{table_name}"'
+        self._source_key_select = f'SELECT {self._source_order_by} FROM "{table_name}"'
+
+        target_names = [target_columns[c.lower()][0] for c in self.columns]
+        target_key_names = [target_names[i] for i in self.key_positions]
+        self._target_table = sql.Identifier(schema, table_name)
+        self._target_keys = [
+            sql.SQL('{} COLLATE "C"').format(sql.Identifier(name)) if type_name in _TEXT_KEY_TYPES else sql.Identifier(name)
+            for name, type_name in zip(target_key_names, self.key_types)]
+        self._target_key_list = sql.SQL(", ").join(sql.Identifier(name) for name in target_key_names)
+        self._target_order_by = sql.SQL(", ").join(self._target_keys)
+        self._target_canonical_keys = sql.SQL(", ").join(
+            target_canonical_sql(name, type_name) for name, type_name in zip(target_key_names, self.key_types))
+        self._target_row_md5 = sql.SQL("md5({})").format(sql.SQL(" || ").join(
+            sql.SQL("CASE WHEN {value} IS NULL THEN {null} ELSE length({value}) || ':' || {value} END").format(
+                value=target_canonical_sql(name, type_name), null=sql.Literal(_NULL_MARKER))
+            for name, type_name in zip(target_names, self.types)))
+
+    # Range conditions
+
+    def _source_where(self, low, high):
+        conditions, params = [], []
+        if low is not None:
+            conditions.append(key_predicate(self.key_columns, ">"))
+            params.extend(low)
+        if high is not None:
+            conditions.append(key_predicate(self.key_columns, "<="))
+            params.extend(high)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def _target_key_condition(self, operator):
+        if len(self._target_keys) == 1:
+            return sql.SQL("{} {} %s").format(self._target_keys[0], sql.SQL(operator))
+        return sql.SQL("({}) {} ({})").format(
+            sql.SQL(", ").join(self._target_keys), sql.SQL(operator), sql.SQL(", ").join(sql.SQL("%s") for _ in self._target_keys))
+
+    def _target_where(self, low, high):
+        conditions, params = [], []
+        if low is not None:
+            conditions.append(self._target_key_condition(">"))
+            params.extend(low)
+        if high is not None:
+            conditions.append(self._target_key_condition("<="))
+            params.extend(high)
+        if not conditions:
+            return sql.SQL(""), params
+        return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions), params
+
+    # Per-side primitives
+
+    def source_row_md5(self, row):
+        values = [canonical_value(value, type_name, self.time_zone) for value, type_name in zip(row, self.types)]
+        return hashlib.md5(canonical_row_text(values).encode("utf-8")).hexdigest()
+
+    def source_key(self, row):
+        return tuple(canonical_value(row[i], type_name, self.time_zone) for i, type_name in zip(self.key_positions, self.key_types))
+
+    def source_digest(self, low, high):
+        """(row count, hash sum) of a key range in SQLite."""
+        where, params = self._source_where(low, high)
+        count, total = 0, 0
+        for row in self.sqlite_conn.execute(self._source_select + where, params):
+            count += 1
+            total += hash_prefix_value(self.source_row_md5(row))
+        return count, total
+
+    def target_digest(self, low, high):
+        """(row count, hash sum) of a key range in PostgreSQL, aggregated by the server."""
+        where, params = self._target_where(low, high)
+        query = sql.SQL("SELECT count(*), COALESCE(sum(('x' || left({}, 15))::bit(60)::bigint), 0) FROM {}{}").format(
+            self._target_row_md5, self._target_table, where)
+        with self.pg_conn.cursor() as pg_cursor:
+            pg_cursor.execute(query, params)
+            count, total = pg_cursor.fetchone()
+        return count, int(total)
+
+    def source_split_points(self, low, high, step):
+        """Every step-th key of a range in SQLite (each a keyset step along the primary key index)."""
+        points, current = [], low
+        while True:
+            where, params = self._source_where(current, high)
+            row = self.sqlite_conn.execute(
+                f"{self._source_key_select}{where} ORDER BY {self._source_order_by} LIMIT 1 OFFSET ?", (*params, step - 1)).fetchone()
+            if row is None:
+                return points
+            current = tuple(row)
+            points.append(current)
+
+    def target_split_points(self, low, high, step):
+        """Every step-th key of a range in PostgreSQL, for ranges where the target holds more rows."""
+        points, current = [], low
+        with self.pg_conn.cursor() as pg_cursor:
+            while True:
+                where, params = self._target_where(current, high)
+                pg_cursor.execute(sql.SQL("SELECT {} FROM {}{} ORDER BY {} LIMIT 1 OFFSET %s").format(
+                    self._target_key_list, self._target_table, where, self._target_order_by), (*params, step - 1))
+                row = pg_cursor.fetchone()
+                if row is None:
+                    return points
+                # The points also bound source ranges, and sqlite3 cannot bind Decimal or UUID values.
+                current = tuple(sqlite_key_value(value, self.time_zone) for value in row)
+                points.append(current)
+
+    def source_row_hashes(self, low, high):
+        """{canonical key: row md5} of a range in SQLite."""
+        where, params = self._source_where(low, high)
+        return {self.source_key(row): self.source_row_md5(row) for row in self.sqlite_conn.execute(self._source_select + where, params)}
+
+    def target_row_hashes(self, low, high):
+        """{canonical key: row md5} of a range in PostgreSQL."""
+        where, params = self._target_where(low, high)
+        with self.pg_conn.cursor() as pg_cursor:
+            pg_cursor.execute(sql.SQL("SELECT {}, {} FROM {}{}").format(
+                self._target_canonical_keys, self._target_row_md5, self._target_table, where), params)
+            return {tuple(row[:-1]): row[-1] for row in pg_cursor.fetchall()}
+
+    # Comparison
+
+    def compare_rows(self, low, high, result, max_reported_keys=VERIFY_MAX_REPORTED_KEYS):
+        """Compares a (small) range row by row, adding its missing, extra and different keys to result."""
+        source, target = self.source_row_hashes(low, high), self.target_row_hashes(low, high)
+        result["rows_compared"] += len(source)
+        mismatches = {
+            "missing": [key for key in source if key not in target],
+            "extra": [key for key in target if key not in source],
+            "different": [key for key, row_md5 in source.items() if key in target and target[key] != row_md5],
+        }
+        for kind, keys in mismatches.items():
+            result[kind] += len(keys)
+            room = max_reported_keys - len(result[f"{kind}_keys"])
+            result[f"{kind}_keys"].extend(dict(zip(self.key_columns, key)) for key in keys[:room])
+
+    def verify(self, range_rows=VERIFY_RANGE_ROWS, split_factor=VERIFY_SPLIT_FACTOR, leaf_rows=VERIFY_LEAF_ROWS,
+               max_reported_keys=VERIFY_MAX_REPORTED_KEYS):
+        """
+        Compares the whole table: digests of ranges of range_rows source rows, then, for ranges
+        that differ, of split_factor sub-ranges (cut at the keys of whichever side holds more rows),
+        down to ranges of at most leaf_rows rows on both sides, which are compared row by row.
+
+        Returns:
+            Dict with the row counts of both sides, 'ranges' (digests compared), 'rows_compared'
+            (rows fetched for row-by-row comparison), the numbers of 'missing' (only in SQLite),
+            'extra' (only in PostgreSQL) and 'different' rows, the first max_reported_keys keys of
+            each, and 'seconds'.
+        """
+        started = time.perf_counter()
+        result = {"source_rows": 0, "target_rows": 0, "ranges": 0, "rows_compared": 0,
+                  "missing": 0, "extra": 0, "different": 0, "missing_keys": [], "extra_keys": [], "different_keys": []}
+        points = self.source_split_points(None, None, range_rows)
+        # (low, high, whether the range is one of the top-level ranges that partition the table)
+        pending = [(low, high, True) for low, high in zip([None] + points, points + [None])]
+        total_rows = self.sqlite_conn.execute(f'SELECT COUNT(*) FROM "{self.table_name}"').fetchone()[0]
+        with tqdm(total=total_rows, unit="rows", desc=f"Verifying {self.table_name}") as progress:
+            while pending:
+                low, high, top_level = pending.pop()
+                source, target = self.source_digest(low, high), self.target_digest(low, high)
+                result["ranges"] += 1
+                if top_level:
+                    result["source_rows"] += source[0]
+                    result["target_rows"] += target[0]
+                    progress.update(source[0])
+                if source == target:
+                    continue
+                larger = max(source[0], target[0])
+                if larger <= leaf_rows:
+                    self.compare_rows(low, high, result, max_reported_keys)
+                    continue
+                step = -(-larger // split_factor)
+                split_points = self.source_split_points if source[0] >= target[0] else self.target_split_points
+                points = split_points(low, high, step)
+                # Split points lie inside (low, high], so each sub-range holds at most step rows of
+                # the side it was cut by, and the drill-down ends.
+                pending.extend((sub_low, sub_high, False) for sub_low, sub_high in zip([low] + points, points + [high]))
+        result["seconds"] = time.perf_counter() - started
+        return result
+
+def verify_table_in_worker(postgres_dsn, table_name, schema=POSTGRES_SCHEMA):
+    """Runs TableVerifier.verify on its own SQLite and PostgreSQL connections."""
+    sqlite_conn = get_sqlite_connection()
+    if sqlite_conn is None:
+        raise RuntimeError(f"Could not open the SQLite database for '{table_name}'.")
+    try:
+        with psycopg.connect(postgres_dsn, autocommit=True) as pg_conn:
+            time_zone_name = pg_conn.execute("SHOW TimeZone").fetchone()[0]
+            try:
+                time_zone = ZoneInfo(time_zone_name)
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning(f"Unknown server TimeZone '{time_zone_name}'; reading naive timestamps as UTC.")
+                time_zone = timezone.utc
+            return TableVerifier(sqlite_conn, pg_conn, table_name, schema, time_zone).verify()
+    finally:
+        sqlite_conn.close()
+
+def verify_tables(postgres_dsn, tables=TABLES_TO_MIGRATE, table_workers=TABLE_WORKERS):
+    """
+    Verifies tables on up to table_workers threads. Unlike a migration, a failing table does not
+    stop the others: its result is {'error': message}.
+
+    Returns:
+        {table name: TableVerifier.verify result or error dict}, in the order of tables.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=table_workers, thread_name_prefix="verify") as executor:
+        futures = {table_name: executor.submit(verify_table_in_worker, postgres_dsn, table_name) for table_name in tables}
+        for table_name, future in futures.items():
+            try:
+                results[table_name] = future.result()
+            except Exception as e:
+                logger.error(f"Could not verify '{table_name}': {e}")
+                results[table_name] = {"error": str(e)}
+    return results
+
+def format_verify_report(results):
+    """One line per verified table, tables that differ or failed first."""
+    header = (f"{'table':<50}{'status':>10}{'source':>11}{'target':>11}{'missing':>9}{'extra':>9}{'different':>11}"
+              f"{'ranges':>8}{'compared':>10}{'seconds':>9}")
+    lines = [header]
+    def status(result):
+        if "error" in result:
+            return "ERROR"
+        return "DIFFERS" if result["missing"] or result["extra"] or result["different"] else "OK"
+    for table_name, result in sorted(results.items(), key=lambda item: status(item[1]) == "OK"):
+        if "error" in result:
+            lines.append(f"{table_name:<50}{'ERROR':>10}  {result['error']}")
+            continue
+        lines.append(f"{table_name:<50}{status(result):>10}{result['source_rows']:>11}{result['target_rows']:>11}{result['missing']:>9}"
+                     f"{result['extra']:>9}{result['different']:>11}{result['ranges']:>8}{result['rows_compared']:>10}"
+                     f"{result['seconds']:>9.1f}")
+    return "\n".join(lines)
 
 # --- Main Execution ---
 
+def verify_main():
+    """Compares every table with the target (MIGRATION_MODE=verify) and writes the mismatched keys to VERIFY_REPORT_FILE."""
+    logger.info(f"Verifying {len(TABLES_TO_MIGRATE)} tables against PostgreSQL in ranges of {VERIFY_RANGE_ROWS} rows "
+                f"({TABLE_WORKERS} tables at a time). Nothing is written to the target.")
+    results = verify_tables(POSTGRES_DSN)
+    with open(VERIFY_REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"sqlite_db": str(SQLITE_DB_PATH), "tables": results}, f, indent=2, default=str)
+    logger.info("Verification:\n" + format_verify_report(results))
+    failed = [table_name for table_name, result in results.items()
+              if "error" in result or result["missing"] or result["extra"] or result["different"]]
+    if failed:
+        logger.error(f"❌ {len(failed)} tables differ or could not be verified: {', '.join(failed)}. "
+                     f"Mismatched keys are listed in {VERIFY_REPORT_FILE}.")
+    else:
+        logger.info("🎉 Source and target match for every table! 🎉")
+
 def main():
     """Main function to orchestrate the migration process."""
     if not validate_config():
         return
+    if MIGRATION_MODE == "verify":
+        verify_main()
+        return
 
     sqlite_conn = get_sqlite_connection()
-    supabase_client = get_supabase_client()
+    if MIGRATION_BACKEND == "postgres":
+        target_conn = get_postgres_connection()
+    else:
+        target_conn = get_supabase_client()
 
-    if not sqlite_conn or not supabase_client:
+    if not sqlite_conn or not target_conn:
         logger.error("Aborting migration due to connection errors.")
         return
+    # Only used to check the databases open; each table worker opens its own connections.
+    sqlite_conn.close()
 
     try:
         logger.info("Starting data migration for all tables. The script will halt on the first error.")
-        for table_name in tqdm(TABLES_TO_MIGRATE, desc="Total Migration Progress"):
-            migrate_table(sqlite_conn, supabase_client, table_name)
+        # A delta sync resumes from its manifest; the checkpoint belongs to full migrations only, and
+        # a delta run must not pick up or remove one left by an interrupted full migration.
+        checkpoint = MigrationCheckpoint(CHECKPOINT_FILE, SQLITE_DB_PATH) if MIGRATION_MODE == "full" else None
+        if MIGRATION_BACKEND == "postgres":
+            target_conn.close()
+            logger.info(f"Backend: PostgreSQL COPY ({COPY_FORMAT} format), {TABLE_WORKERS} tables per level.")
+            table_stats = migrate_levels_postgres(POSTGRES_DSN, checkpoint)
+        else:
+            logger.info(f"Concurrency: {TABLE_WORKERS} tables per level, {INSERT_WORKERS} batch inserts at a time.")
+            rejects = RejectsLog(REJECTS_FILE, max_rows=MAX_REJECTED_ROWS)
+            if MIGRATION_MODE == "delta":
+                logger.info(f"Delta sync against the manifest {MANIFEST_FILE}.")
+                table_stats = sync_levels_rest(target_conn, SyncManifest(MANIFEST_FILE, SUPABASE_URL), rejects=rejects)
+            else:
+                table_stats = migrate_levels_rest(target_conn, checkpoint, rejects=rejects)
+            if rejects.count:
+                logger.warning(f"{rejects.count} rows were rejected by the database; see {REJECTS_FILE}.")
+        if checkpoint:
+            checkpoint.remove()
+        table_stats = {table_name: stats for table_name, stats in table_stats.items() if stats}
+        if table_stats:
+            logger.info("Per-table throughput:\n" + format_table_report(table_stats))
 
-        logger.info("🎉 Full migration completed successfully! 🎉")
+        if MIGRATION_MODE == "delta":
+            logger.info("🎉 Delta sync completed successfully! 🎉")
+        else:
+            logger.info("🎉 Full migration completed successfully! 🎉")
         logger.info("Please remember to regenerate your Supabase types for the frontend if you haven't already.")
 
     except Exception as e:
         logger.error(f"MIGRATION HALTED due to an unrecoverable error: {e}")
-    finally:
-        if sqlite_conn:
-            sqlite_conn.close()
-            logger.info("SQLite connection closed.")
+        if MIGRATION_MODE == "delta":
+            logger.error(f"Rows already pushed are recorded in {MANIFEST_FILE}; run the sync again to push the rest.")
+        else:
+            logger.error(f"Progress is saved in {CHECKPOINT_FILE}; run the script again to resume.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,198 @@
+# tests/test_migrate_to_supabase.py
+#
+# migrate_to_supabase.py against the local mock Supabase server (benchmarks/mock_supabase_server.py).
+# Run from the python-svc/migration/ directory (needs the packages in requirements.txt):
+#     python -m pytest -q tests
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from postgrest.exceptions import APIError
+from supabase import create_client
+
+import migrate_to_supabase as migration
+from benchmarks.mock_supabase_server import start_mock_server
+
+MOCK_SUPABASE_KEY = "mock.service.role"
+TABLE_NAME = "speech_sentence"
+ROW_COUNT = 60
+PADDING = "x" * 900  # about 1 KB per row, so the small batches below hold a few rows each
+
+
+@pytest.fixture
+def mock_server():
+    server = start_mock_server(latency_ms=1.0, ms_per_mb=0.0, jitter=0.0, max_concurrent=8)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def supabase_client(mock_server):
+    return create_client(mock_server.url, MOCK_SUPABASE_KEY)
+
+
+@pytest.fixture
+def source_db(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f'CREATE TABLE "{TABLE_NAME}" (id INTEGER PRIMARY KEY, sentence TEXT, padding TEXT)')
+    conn.executemany(f'INSERT INTO "{TABLE_NAME}" VALUES (?, ?, ?)',
+                     [(i, f"sentence {i}", PADDING) for i in range(1, ROW_COUNT + 1)])
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Batches of about 4 KB (4 rows) that do not adapt, so a table spans many batches."""
+    original_sizer = migration.AdaptiveBatchSizer
+    monkeypatch.setattr(migration, "AdaptiveBatchSizer",
+                        lambda: original_sizer(initial_bytes=4096, min_bytes=1024, target_seconds=0))
+
+
+def reject_rows_with_ids(server, ids):
+    """Makes the mock answer any request containing one of these rows with a check constraint violation (SQLSTATE 23514)."""
+    server.is_rejected_row = lambda row: row.get("id") in ids
+
+
+def sink_rows(server):
+    with server.sink.lock:
+        return {row[0]: (row[1], row[2]) for row in server.sink.conn.execute(
+            f'SELECT id, sentence, padding FROM "{TABLE_NAME}" ORDER BY id')}
+
+
+def source_rows(conn):
+    return {row["id"]: (row["sentence"], row["padding"]) for row in conn.execute(f'SELECT * FROM "{TABLE_NAME}"')}
+
+
+def test_resume_after_failed_batch_restarts_after_contiguous_batches(mock_server, supabase_client, source_db, small_batches, tmp_path):
+    db_path, conn = source_db
+    checkpoint_path = tmp_path / "checkpoint.json"
+    reject_rows_with_ids(mock_server, {23})
+
+    with ThreadPoolExecutor(max_workers=4) as insert_executor:
+        with pytest.raises(APIError):
+            migration.migrate_table(conn, supabase_client, TABLE_NAME, insert_executor=insert_executor,
+                                    checkpoint=migration.MigrationCheckpoint(checkpoint_path, db_path))
+
+    # Later batches may have been committed too, but the checkpoint stops before the failed one.
+    state = json.loads(checkpoint_path.read_text())["tables"][TABLE_NAME]
+    assert not state["complete"]
+    last_key = state["last_key"][0]
+    assert last_key == 20  # rows 21-24 were the failed batch
+    assert state["rows"] == last_key
+    assert set(range(1, last_key + 1)) <= set(sink_rows(mock_server))
+    assert 23 not in sink_rows(mock_server)
+
+    reject_rows_with_ids(mock_server, set())
+    mock_server.reset_stats()
+    resumed_checkpoint = migration.MigrationCheckpoint(checkpoint_path, db_path)
+    stats = migration.migrate_table(conn, supabase_client, TABLE_NAME, checkpoint=resumed_checkpoint)
+
+    assert stats["rows"] == ROW_COUNT - last_key
+    assert mock_server.stats["rows_written"] == ROW_COUNT - last_key
+    assert resumed_checkpoint.table_state(TABLE_NAME)["complete"]
+    assert sink_rows(mock_server) == source_rows(conn)
+
+
+def test_rejected_batch_is_bisected_down_to_the_bad_row(mock_server, supabase_client, source_db, tmp_path):
+    _, conn = source_db
+    batch = [dict(row) for row in conn.execute(f'SELECT * FROM "{TABLE_NAME}" WHERE id <= 16 ORDER BY id')]
+    reject_rows_with_ids(mock_server, {13})
+    rejects = migration.RejectsLog(tmp_path / "rejects.jsonl", max_rows=10)
+
+    result = migration.upsert_batch(supabase_client, TABLE_NAME, batch, ["id"], rejects=rejects)
+
+    assert result["rejected_rows"] == [batch[12]]
+    assert result["rejected"] == 1
+    assert result["splits"] == 5  # 16 -> 8 -> 4 -> 2 -> 1 rows
+    assert mock_server.stats["requests"] == 9  # the full batch, then two halves at each of four levels
+    assert sorted(sink_rows(mock_server)) == [i for i in range(1, 17) if i != 13]
+    logged = [json.loads(line) for line in (tmp_path / "rejects.jsonl").read_text().splitlines()]
+    assert [(entry["table"], entry["row"]["id"]) for entry in logged] == [(TABLE_NAME, 13)]
+    assert "mock_rejected_row" in logged[0]["error"]
+
+
+def test_delta_sync_sends_inserts_updates_and_deletes_only(mock_server, supabase_client, source_db, tmp_path):
+    _, conn = source_db
+    manifest = migration.SyncManifest(tmp_path / "manifest.db", mock_server.url)
+    first_stats = migration.migrate_table(conn, supabase_client, TABLE_NAME, manifest=manifest)
+    assert (first_stats["inserted"], first_stats["updated"], first_stats["unchanged"]) == (ROW_COUNT, 0, 0)
+
+    conn.execute(f'UPDATE "{TABLE_NAME}" SET sentence = ? WHERE id = 5', ("sentence 5, edited",))
+    conn.execute(f'DELETE FROM "{TABLE_NAME}" WHERE id = 7')
+    conn.execute(f'INSERT INTO "{TABLE_NAME}" VALUES (?, ?, ?)', (ROW_COUNT + 1, "new sentence", PADDING))
+    conn.commit()
+    mock_server.reset_stats()
+
+    assert migration.delete_removed_rows(conn, supabase_client, TABLE_NAME, manifest) == 1
+    stats = migration.migrate_table(conn, supabase_client, TABLE_NAME, manifest=manifest)
+
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (1, 1, ROW_COUNT - 2)
+    assert mock_server.stats["rows_deleted"] == 1
+    assert mock_server.stats["rows_written"] == 2
+    assert sink_rows(mock_server) == source_rows(conn)
+
+    # Once recorded, nothing is sent again.
+    mock_server.reset_stats()
+    assert migration.delete_removed_rows(conn, supabase_client, TABLE_NAME, manifest) == 0
+    stats = migration.migrate_table(conn, supabase_client, TABLE_NAME, manifest=manifest)
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 0, ROW_COUNT)
+    assert mock_server.stats["requests"] == 0
+
+
+@pytest.mark.parametrize("source_text, expected", [
+    ('{"b":1,"aa":[1.50,1e2,-0,"x\\ny"],"a":null}', '{"a": null, "b": 1, "aa": [1.50, 100, 0, "x\\ny"]}'),
+    ('{"a": 1, "a": 2}', '{"a": 2}'),
+    ('{"é": "\\u00e9/\\u0001", "z": true}', '{"z": true, "é": "é/\\u0001"}'),
+    ('[1.0e-2, 2.5E+1, false]', '[0.010, 25, false]'),
+])
+def test_json_values_take_jsonb_text_form(source_text, expected):
+    assert migration.canonical_value(source_text, "jsonb") == expected
+    assert migration.canonical_value(source_text, "json") == expected
+
+
+def test_target_key_values_bind_and_order_in_sqlite():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (amount NUMERIC, uid TEXT, created TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)", [
+        (10, "00000000-0000-0000-0000-000000000001", "2024-01-01 09:00:00"),
+        (12.5, "00000000-0000-0000-0000-000000000002", "2024-01-01 10:00:00"),
+        (20, "00000000-0000-0000-0000-000000000003", "2024-01-01 11:30:00.250000"),
+    ])
+    # As psycopg returns them for numeric, uuid and timestamptz keys (the session in UTC+1).
+    amount = migration.sqlite_key_value(Decimal("12.50"))
+    uid = migration.sqlite_key_value(UUID("00000000-0000-0000-0000-000000000002"))
+    created = migration.sqlite_key_value(datetime(2024, 1, 1, 11, 0, tzinfo=timezone(timedelta(hours=1))))
+
+    assert (amount, uid, created) == (12.5, "00000000-0000-0000-0000-000000000002", "2024-01-01 10:00:00")
+    assert migration.sqlite_key_value(Decimal("20")) == 20
+    assert conn.execute("SELECT count(*) FROM t WHERE amount <= ?", (amount,)).fetchone()[0] == 2
+    assert conn.execute("SELECT count(*) FROM t WHERE uid > ?", (uid,)).fetchone()[0] == 1
+    assert conn.execute("SELECT count(*) FROM t WHERE created <= ?", (created,)).fetchone()[0] == 2
+
+
+def test_delta_sync_leaves_a_full_migration_checkpoint_alone(mock_server, source_db, tmp_path, monkeypatch, caplog):
+    db_path, _ = source_db
+    checkpoint_path = tmp_path / "checkpoint.json"
+    checkpoint_text = json.dumps({"sqlite_db": str(db_path), "tables": {TABLE_NAME: {"last_key": [20], "rows": 20, "complete": False}}})
+    checkpoint_path.write_text(checkpoint_text)
+    for name, value in {"MIGRATION_MODE": "delta", "MIGRATION_BACKEND": "rest", "SUPABASE_URL": mock_server.url,
+                        "SUPABASE_KEY": MOCK_SUPABASE_KEY, "SQLITE_DB_PATH": db_path, "CHECKPOINT_FILE": checkpoint_path,
+                        "MANIFEST_FILE": tmp_path / "manifest.db", "REJECTS_FILE": tmp_path / "rejects.jsonl"}.items():
+        monkeypatch.setattr(migration, name, value)
+
+    with caplog.at_level("INFO"):
+        migration.main()
+
+    assert "Delta sync completed successfully" in caplog.text
+    assert "Resuming from checkpoint" not in caplog.text
+    assert checkpoint_path.read_text() == checkpoint_text